@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+"""
+Analyze translation_quality_results.csv in bounded memory.
+
+The results file mixes ranking rows (good/bad/best/unknown) and comparison
+rows ('better' and 'worse'; each 'better' column beats each 'worse' one) in
+the same translation columns. A comparison row with k 'better' and m 'worse'
+columns (a text several models produced) holds k x m verdicts that share one
+win, 1/(k*m) each, as in the leaderboard and the adaptive pair model. The
+file is read in fixed-size chunks of rows; each chunk is classified and
+encoded into small NumPy arrays, and only per-corpus count tables are kept:
+
+- rank distributions and good-or-best / best rates per model
+- comparison win rates and a pairwise win matrix per model
+- Bradley-Terry scores (centered log-strengths) fitted to the win matrix
+
+Confidence intervals use a Poisson bootstrap: every replicate weights each
+results row by a Poisson(1) draw, shared by all the judgments and verdicts
+the row holds, since they are not independent. Replicates are accumulated
+chunk by chunk on a process pool without holding the rows. With --keep latest (the
+default) a question saved more than once counts only its last row, matching
+the in-app leaderboard; the first pass spills the encoded chunks to a
+temporary folder so the CSV is parsed once.
+
+Usage:
+    python analyze_results.py translation_quality_results.csv --workers 4 -o analysis.json
+"""
+
+import argparse
+import csv
+import json
+import os
+import shutil
+import sys
+import tempfile
+import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from operator import itemgetter
+
+import numpy as np
+
+RESULTS_PATH = 'translation_quality_results.csv'
+# evaluator and file_id are added by consolidate_results.py
+METADATA_COLUMNS = {'source', 'source_lang', 'corpus_type', 'evaluator', 'file_id'}
+# A question is one source in one corpus, per evaluator in consolidated files
+QUESTION_COLUMNS = ('evaluator', 'source', 'corpus_type')
+RANK_LABELS = ('good', 'bad', 'best', 'unknown')  # Codes 1-4; 0 is blank
+N_CODES = len(RANK_LABELS) + 1
+DEFAULT_CHUNK_ROWS = 100000
+DEFAULT_BOOTSTRAP = 200
+KEEP_MODES = ('latest', 'all')
+
+
+def iter_row_chunks(path, chunk_rows):
+    """Yield the header, then lists of up to chunk_rows data rows."""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        yield header
+        while True:
+            chunk = list(islice(reader, chunk_rows))
+            if not chunk:
+                return
+            yield chunk
+
+
+class ChunkParser:
+    """Encodes chunks of results rows as NumPy arrays, with corpus codes shared across chunks."""
+    
+    def __init__(self, header):
+        self.width = len(header)
+        self.columns = [col for col in header if col not in METADATA_COLUMNS]
+        self.key_indices = [header.index(col) for col in QUESTION_COLUMNS if col in header]
+        self.corpus_index = header.index('corpus_type') if 'corpus_type' in header else None
+        self.corpora = {}  # corpus_type -> code
+        self.questions = {}  # (evaluator, source, corpus_type) -> question id
+        indices = [header.index(col) for col in self.columns]
+        getter = itemgetter(*indices)
+        self._cells = getter if len(indices) > 1 else (lambda row: (getter(row),))
+    
+    def corpus_code(self, corpus_type):
+        code = self.corpora.get(corpus_type)
+        if code is None:
+            code = self.corpora[corpus_type] = len(self.corpora)
+        return code
+    
+    def question_id(self, key):
+        question = self.questions.get(key)
+        if question is None:
+            question = self.questions[key] = len(self.questions)
+        return question
+    
+    def parse(self, rows, start):
+        """Classify and encode rows; start is the file row number of rows[0]."""
+        n = len(rows)
+        n_columns = len(self.columns)
+        # Pad short rows (such as a torn last line) to the header width
+        rows = [row if len(row) >= self.width else row + [''] * (self.width - len(row)) for row in rows]
+        # Rank and verdict labels are at most 7 characters; longer text cannot match any of them
+        cells = np.array([self._cells(row) for row in rows], dtype='U8').reshape(n, n_columns)
+        
+        codes = np.zeros((n, n_columns), dtype=np.int8)
+        for code, label in enumerate(RANK_LABELS, 1):
+            codes[cells == label] = code
+        better = cells == 'better'
+        worse = cells == 'worse'
+        n_better = better.sum(axis=1)
+        n_worse = worse.sum(axis=1)
+        is_comparison = (n_better + n_worse) > 0
+        is_pair = (n_better >= 1) & (n_worse >= 1)
+        is_rank = ~is_comparison & (codes > 0).any(axis=1)
+        
+        if self.corpus_index is None:
+            corpus = np.zeros(n, dtype=np.int32)
+        else:
+            corpus = np.fromiter((self.corpus_code(row[self.corpus_index]) for row in rows), dtype=np.int32, count=n)
+        key_indices = self.key_indices
+        keys = np.fromiter((self.question_id(tuple([row[i] for i in key_indices])) for row in rows),
+                           dtype=np.uint64, count=n)
+        row_numbers = np.arange(start, start + n, dtype=np.int64)
+        
+        rank = np.flatnonzero(is_rank)
+        pair_rows = np.flatnonzero(is_pair)
+        # One verdict per (better column, worse column) of a comparison row
+        verdict_rows, winner, loser = np.nonzero(better[pair_rows][:, :, None] & worse[pair_rows][:, None, :])
+        pair = pair_rows[verdict_rows]
+        # The verdicts of one comparison row share a single win
+        verdict_weight = 1.0 / (n_better[pair] * n_worse[pair])
+        winner = winner.astype(np.int32)
+        loser = loser.astype(np.int32)
+        # Each pair of models is its own question: key = question id x pairs + pair id
+        pair_id = (np.minimum(winner, loser).astype(np.uint64) * np.uint64(n_columns)
+                   + np.maximum(winner, loser).astype(np.uint64))
+        return {
+            'rank_codes': codes[rank],
+            'rank_corpus': corpus[rank],
+            'rank_keys': keys[rank],
+            'rank_rows': row_numbers[rank],
+            'pair_winner': winner,
+            'pair_loser': loser,
+            'pair_corpus': corpus[pair],
+            'pair_keys': keys[pair] * np.uint64(n_columns * n_columns) + pair_id,
+            'pair_rows': row_numbers[pair],
+            'pair_weight': verdict_weight,
+            'skipped': np.int64(n - len(rank) - len(pair_rows)),
+        }
+
+
+def keep_latest(chunk, latest_rank, latest_pair):
+    """Drop rows superseded by a later save of the same question."""
+    rank_latest = np.fromiter((latest_rank[key] for key in chunk['rank_keys'].tolist()),
+                              dtype=np.int64, count=len(chunk['rank_keys']))
+    pair_latest = np.fromiter((latest_pair[key] for key in chunk['pair_keys'].tolist()),
+                              dtype=np.int64, count=len(chunk['pair_keys']))
+    rank_keep = rank_latest == chunk['rank_rows']
+    pair_keep = pair_latest == chunk['pair_rows']
+    kept = dict(chunk)
+    for name in ('rank_codes', 'rank_corpus', 'rank_keys', 'rank_rows'):
+        kept[name] = chunk[name][rank_keep]
+    for name in ('pair_winner', 'pair_loser', 'pair_corpus', 'pair_keys', 'pair_rows', 'pair_weight'):
+        kept[name] = chunk[name][pair_keep]
+    kept['superseded'] = np.int64(len(rank_keep) - rank_keep.sum() + len(pair_keep) - pair_keep.sum())
+    return kept
+
+
+def chunk_indices(chunk, n_columns):
+    """
+    Flat (corpus, column, code) and (corpus, winner, loser) cell indices of a
+    chunk's judgments, with the ranking row of each judgment and the
+    comparison row (numbered within the chunk) of each verdict.
+    """
+    judgment_rows, judgment_columns = np.nonzero(chunk['rank_codes'])
+    rank_flat = ((chunk['rank_corpus'][judgment_rows].astype(np.int64) * n_columns + judgment_columns) * N_CODES
+                 + chunk['rank_codes'][judgment_rows, judgment_columns])
+    _, verdict_rows = np.unique(chunk['pair_rows'], return_inverse=True)
+    pair_flat = ((chunk['pair_corpus'].astype(np.int64) * n_columns + chunk['pair_winner']) * n_columns
+                 + chunk['pair_loser'])
+    return judgment_rows.astype(np.int32), rank_flat, verdict_rows.astype(np.int32), pair_flat
+
+
+def count_tables(rank_flat, pair_flat, n_corpora, n_columns, rank_weights=None, pair_weights=None):
+    """Rank counts (corpora, columns, codes) and wins (corpora, winner, loser)."""
+    rank = np.bincount(rank_flat, weights=rank_weights, minlength=n_corpora * n_columns * N_CODES)
+    pair = np.bincount(pair_flat, weights=pair_weights, minlength=n_corpora * n_columns * n_columns)
+    return rank.reshape(n_corpora, n_columns, N_CODES), pair.reshape(n_corpora, n_columns, n_columns)
+
+
+def bootstrap_chunk(job):
+    """
+    Poisson-bootstrap count tables for one chunk: arrays of shape (replicates, corpora, ...).
+    
+    Each replicate draws one weight per ranking row and one per comparison
+    row; every judgment or verdict takes the weight of the row it came from.
+    """
+    (seed, chunk_number, replicates, n_corpora, n_columns, judgment_rows, n_rank, rank_flat,
+     verdict_rows, n_comparisons, pair_flat, pair_weight) = job
+    rng = np.random.default_rng([seed, chunk_number])
+    rank = np.empty((replicates, n_corpora, n_columns, N_CODES), dtype=np.float32)
+    pair = np.empty((replicates, n_corpora, n_columns, n_columns), dtype=np.float32)
+    for b in range(replicates):
+        row_weights = rng.poisson(1.0, n_rank)
+        comparison_weights = rng.poisson(1.0, n_comparisons)
+        rank[b], pair[b] = count_tables(rank_flat, pair_flat, n_corpora, n_columns,
+                                        row_weights[judgment_rows], comparison_weights[verdict_rows] * pair_weight)
+    return rank, pair
+
+
+def _accumulate(total, part):
+    """Add part to total, growing the corpus axis of total when new corpora have appeared."""
+    part = part.astype(np.float64)
+    if total is None:
+        return part
+    corpus_axis = part.ndim - 3
+    extra = part.shape[corpus_axis] - total.shape[corpus_axis]
+    if extra > 0:
+        padding = [(0, 0)] * total.ndim
+        padding[corpus_axis] = (0, extra)
+        total = np.pad(total, padding)
+    total[(slice(None),) * corpus_axis + (slice(0, part.shape[corpus_axis]),)] += part
+    return total
+
+
+def _run_jobs(jobs, workers):
+    """Run bootstrap jobs in order, keeping at most 2 * workers in flight."""
+    if workers <= 1:
+        yield from map(bootstrap_chunk, jobs)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for job in jobs:
+            pending.append(executor.submit(bootstrap_chunk, job))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def fit_bradley_terry(wins, prior=0.5, iterations=1000, tolerance=1e-9):
+    """
+    Centered log-strengths from win matrices of shape (..., columns, columns).
+    
+    Uses the minorization-maximization updates of Hunter (2004), batched over
+    leading axes. prior adds that many virtual games per model, split evenly
+    across its opponents, so models that never won or never lost stay finite.
+    """
+    n_columns = wins.shape[-1]
+    if n_columns < 2:
+        return np.zeros(wins.shape[:-1])
+    wins = wins + (prior / (n_columns - 1)) * (1.0 - np.eye(n_columns))
+    games = wins + np.swapaxes(wins, -1, -2)
+    total_wins = wins.sum(axis=-1)
+    strength = np.ones(wins.shape[:-1])
+    for _ in range(iterations):
+        denominator = (games / (strength[..., :, None] + strength[..., None, :])).sum(axis=-1)
+        updated = total_wins / denominator
+        updated /= np.exp(np.log(updated).mean(axis=-1, keepdims=True))
+        converged = np.max(np.abs(np.log(updated) - np.log(strength))) < tolerance
+        strength = updated
+        if converged:
+            break
+    return np.log(strength)
+
+
+def table_statistics(rank_counts, wins):
+    """Per-model statistics from count tables with any leading axes (..., columns, ...)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ranked = rank_counts[..., 1:].sum(axis=-1)
+        won = wins.sum(axis=-1)
+        lost = wins.sum(axis=-2)
+        bt_score = fit_bradley_terry(wins)
+        bt_score = np.where(won + lost > 0, bt_score, np.nan)
+        return {
+            'ranked': ranked,
+            'distribution': rank_counts[..., 1:] / ranked[..., None],
+            'good_or_best_rate': (rank_counts[..., 1] + rank_counts[..., 3]) / ranked,
+            'best_rate': rank_counts[..., 3] / ranked,
+            'wins': won,
+            'losses': lost,
+            'win_rate': won / (won + lost),
+            'bt_score': bt_score,
+        }
+
+
+def _number(value):
+    value = float(value)
+    if np.isnan(value):
+        return None
+    return int(value) if value.is_integer() and abs(value) < 2 ** 53 else round(value, 6)
+
+
+def model_report(columns, stats, intervals=None, index=()):
+    """Report entries for each model from table_statistics output (selecting a corpus with index)."""
+    report = {}
+    for i, col in enumerate(columns):
+        at = index + (i,)
+        entry = {
+            'ranked': _number(stats['ranked'][at]),
+            'distribution': {label: _number(stats['distribution'][at + (k,)]) for k, label in enumerate(RANK_LABELS)},
+        }
+        for name in ('good_or_best_rate', 'best_rate', 'wins', 'losses', 'win_rate', 'bt_score'):
+            entry[name] = _number(stats[name][at])
+            if intervals is not None and name in intervals:
+                entry[name + '_ci'] = [_number(intervals[name][0][at]), _number(intervals[name][1][at])]
+        report[col] = entry
+    return report
+
+
+def confidence_intervals(rank_replicates, pair_replicates, confidence):
+    """Percentile intervals for the rates and scores over bootstrap replicates (first axis)."""
+    replicate_stats = table_statistics(rank_replicates, pair_replicates)
+    tail = (1 - confidence) / 2 * 100
+    intervals = {}
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # All-NaN slices for models never judged
+        for name in ('good_or_best_rate', 'best_rate', 'win_rate', 'bt_score'):
+            low, high = np.nanpercentile(replicate_stats[name], [tail, 100 - tail], axis=0)
+            intervals[name] = (low, high)
+    return intervals
+
+
+def analyze(path=RESULTS_PATH, chunk_rows=DEFAULT_CHUNK_ROWS, workers=1, bootstrap=DEFAULT_BOOTSTRAP,
+            seed=0, keep='latest', confidence=0.95):
+    """Analyze a results file and return a JSON-serializable report."""
+    if keep not in KEEP_MODES:
+        raise ValueError(f"Unknown keep mode: {keep}")
+    chunks = iter_row_chunks(path, chunk_rows)
+    header = next(chunks, None)
+    if header is None:
+        raise ValueError(f"{path} is empty")
+    parser = ChunkParser(header)
+    columns = parser.columns
+    n_columns = len(columns)
+    totals = {'rows': 0, 'skipped': 0, 'superseded': 0, 'rank_judgments': 0, 'comparisons': 0}
+    spill_dir = None
+    
+    def parsed_chunks():
+        start = 0
+        for rows in chunks:
+            yield parser.parse(rows, start)
+            start += len(rows)
+            totals['rows'] = start
+    
+    def spilled_chunks():
+        # First pass: parse once, remember each question's last row, spill the encoded chunks
+        latest_rank = {}
+        latest_pair = {}
+        paths = []
+        for number, chunk in enumerate(parsed_chunks()):
+            latest_rank.update(zip(chunk['rank_keys'].tolist(), chunk['rank_rows'].tolist()))
+            latest_pair.update(zip(chunk['pair_keys'].tolist(), chunk['pair_rows'].tolist()))
+            chunk_path = os.path.join(spill_dir, f"chunk_{number:06d}.npz")
+            np.savez(chunk_path, **chunk)
+            paths.append(chunk_path)
+        # Second pass: keep only the last row of each question
+        for chunk_path in paths:
+            with np.load(chunk_path) as data:
+                chunk = {name: data[name] for name in data.files}
+            os.remove(chunk_path)
+            yield keep_latest(chunk, latest_rank, latest_pair)
+    
+    rank_counts = None
+    wins = None
+    rank_replicates = None
+    pair_replicates = None
+    
+    def jobs():
+        nonlocal rank_counts, wins
+        for number, chunk in enumerate(spilled_chunks() if keep == 'latest' else parsed_chunks()):
+            totals['skipped'] += int(chunk['skipped'])
+            totals['superseded'] += int(chunk.get('superseded', 0))
+            totals['rank_judgments'] += len(chunk['rank_rows'])
+            n_corpora = max(len(parser.corpora), 1)
+            judgment_rows, rank_flat, verdict_rows, pair_flat = chunk_indices(chunk, n_columns)
+            n_comparisons = int(verdict_rows.max()) + 1 if len(verdict_rows) else 0
+            totals['comparisons'] += n_comparisons
+            chunk_rank, chunk_wins = count_tables(rank_flat, pair_flat, n_corpora, n_columns,
+                                                  pair_weights=chunk['pair_weight'])
+            rank_counts = _accumulate(rank_counts, chunk_rank)
+            wins = _accumulate(wins, chunk_wins)
+            if bootstrap > 0:
+                yield (seed, number, bootstrap, n_corpora, n_columns, judgment_rows, len(chunk['rank_rows']),
+                       rank_flat, verdict_rows, n_comparisons, pair_flat, chunk['pair_weight'])
+    
+    try:
+        if keep == 'latest':
+            spill_dir = tempfile.mkdtemp(prefix='analyze_results_')
+        for chunk_rank, chunk_wins in _run_jobs(jobs(), workers):
+            rank_replicates = _accumulate(rank_replicates, chunk_rank)
+            pair_replicates = _accumulate(pair_replicates, chunk_wins)
+    finally:
+        if spill_dir is not None:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+    
+    corpora = sorted(parser.corpora, key=parser.corpora.get)
+    n_corpora = max(len(corpora), 1)
+    if rank_counts is None:
+        rank_counts = np.zeros((n_corpora, n_columns, N_CODES))
+        wins = np.zeros((n_corpora, n_columns, n_columns))
+    
+    def pad_corpora(table, axis):
+        extra = n_corpora - table.shape[axis]
+        if extra <= 0:
+            return table
+        padding = [(0, 0)] * table.ndim
+        padding[axis] = (0, extra)
+        return np.pad(table, padding)
+    
+    rank_counts = pad_corpora(rank_counts, 0)
+    wins = pad_corpora(wins, 0)
+    overall = table_statistics(rank_counts.sum(axis=0), wins.sum(axis=0))
+    by_corpus = table_statistics(rank_counts, wins)
+    overall_intervals = corpus_intervals = None
+    if rank_replicates is not None:
+        rank_replicates = pad_corpora(rank_replicates, 1)
+        pair_replicates = pad_corpora(pair_replicates, 1)
+        overall_intervals = confidence_intervals(rank_replicates.sum(axis=1), pair_replicates.sum(axis=1), confidence)
+        corpus_intervals = confidence_intervals(rank_replicates, pair_replicates, confidence)
+    
+    return {
+        'config': {'results': path, 'chunk_rows': chunk_rows, 'bootstrap': bootstrap, 'seed': seed,
+                   'keep': keep, 'confidence': confidence},
+        'totals': totals,
+        'columns': columns,
+        'corpora': corpora,
+        'overall': model_report(columns, overall, overall_intervals),
+        'by_corpus': {
+            corpus: model_report(columns, by_corpus, corpus_intervals, (k,))
+            for k, corpus in enumerate(corpora)
+        },
+    }
+
+
+def print_report(report):
+    totals = report['totals']
+    print(f"{totals['rows']} rows: {totals['rank_judgments']} rankings, {totals['comparisons']} comparisons "
+          f"({totals['superseded']} superseded, {totals['skipped']} skipped)")
+    
+    def fmt(entry, name):
+        value = entry[name]
+        if value is None:
+            return '-'
+        text = f"{value:.0%}" if name.endswith('rate') else f"{value:+.2f}"
+        interval = entry.get(name + '_ci')
+        if interval and None not in interval:
+            low, high = interval
+            text += f" [{low:.0%}, {high:.0%}]" if name.endswith('rate') else f" [{low:+.2f}, {high:+.2f}]"
+        return text
+    
+    models = sorted(report['overall'].items(),
+                    key=lambda item: -(item[1]['bt_score'] if item[1]['bt_score'] is not None else -np.inf))
+    print(f"  {'model':<30} {'ranked':>7}  {'good/best':<18} {'win rate':<18} {'BT score':<22}")
+    for col, entry in models:
+        print(f"  {col:<30} {entry['ranked']:>7}  {fmt(entry, 'good_or_best_rate'):<18} "
+              f"{fmt(entry, 'win_rate'):<18} {fmt(entry, 'bt_score'):<22}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze survey results: rank distributions, win rates, "
+                                                 "Bradley-Terry scores and bootstrap confidence intervals.")
+    parser.add_argument('results', nargs='?', default=RESULTS_PATH, help=f"Results CSV (default: {RESULTS_PATH})")
+    parser.add_argument('-o', '--output', default='analysis.json', help="JSON report (default: analysis.json)")
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS,
+                        help=f"Rows read per chunk (default: {DEFAULT_CHUNK_ROWS})")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Processes for the bootstrap (default: CPU count)")
+    parser.add_argument('--bootstrap', type=int, default=DEFAULT_BOOTSTRAP,
+                        help=f"Bootstrap replicates, 0 to skip intervals (default: {DEFAULT_BOOTSTRAP})")
+    parser.add_argument('--confidence', type=float, default=0.95, help="Interval coverage (default: 0.95)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--keep', choices=KEEP_MODES, default='latest',
+                        help="Count only the last save of each question, or every row (default: latest)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not os.path.exists(args.results):
+        print(f"{args.results} not found!")
+        return 1
+    report = analyze(args.results, args.chunk_rows, args.workers, args.bootstrap, args.seed, args.keep, args.confidence)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print_report(report)
+    print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for merge_csv.merge_csv_folder.
+
+Generates a synthetic folder of *_translation_comparison_<corpus>.csv files,
+then times and memory-profiles each merge mode on the same inputs. Every run
+happens in a fresh subprocess so peak RSS is not polluted by earlier runs.
+Results are written as JSON so runs can be compared across commits.
+
+Example:
+    python benchmark_merge.py --sources 20000 --translators 8 --corpora 4 --shuffled \\
+        --modes serial streaming parallel any --workers 4 --repeat 3 --output bench.json
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import merge_csv
+
+# Mode name -> merge_csv_folder keyword arguments ("workers" is filled in from --workers)
+MODES = {
+    'serial': {},
+    'streaming': {'streaming': True},
+    'parallel': {'workers': None},
+    'streaming-parallel': {'streaming': True, 'workers': None},
+    'any': {'grouping': 'any'},
+    'any-spill': {'grouping': 'any', 'memory_budget': 4 * 1024 * 1024},
+    'incremental-noop': {'incremental': True},
+}
+
+_WORDS = (
+    "the of and to in stock fish survey assessment biomass recruitment model estimate "
+    "index catch mortality growth spawning abundance trend area season data sample "
+    "le la les des du et pour dans poisson relevé évaluation biomasse recrutement modèle"
+).split()
+
+
+def _random_text(rng, length):
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(_WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)
+
+
+def generate_dataset(folder, sources=1000, translators=5, corpora=2, text_length=120, shuffled=False, seed=0):
+    """
+    Write synthetic comparison CSVs to folder and return the number of input rows.
+    
+    Each corpus file holds `sources` source texts with one row per translator.
+    With shuffled=True the rows of each file are shuffled so sources are no
+    longer contiguous (only 'any' grouping handles that correctly).
+    """
+    rng = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    translator_names = [f"model_{i:02d}" for i in range(translators)]
+    fieldnames = ['source', 'target', 'source_lang', 'other_lang', 'translator_name', 'translated_text']
+    total_rows = 0
+    
+    for corpus in range(corpora):
+        corpus_type = f"corpus{corpus}"
+        rows = []
+        for i in range(sources):
+            source_lang = rng.choice(('en', 'fr'))
+            source = f"[{corpus_type}:{i}] " + _random_text(rng, text_length)
+            target = _random_text(rng, text_length)
+            for name in translator_names:
+                rows.append((source, target, source_lang, 'fr' if source_lang == 'en' else 'en', name,
+                             _random_text(rng, text_length)))
+        if shuffled:
+            rng.shuffle(rows)
+        
+        file_path = os.path.join(folder, f"synthetic_translation_comparison_{corpus_type}.csv")
+        with open(file_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(fieldnames)
+            writer.writerows(rows)
+        total_rows += len(rows)
+    
+    return total_rows
+
+
+def _peak_rss_kb(who):
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def measure(folder, output_path, mode_kwargs, use_tracemalloc=False):
+    """Run one merge in this process and return its measurements."""
+    if mode_kwargs.get('incremental'):
+        # Populate the manifest first so the timed run is a no-change re-merge
+        with contextlib.redirect_stdout(io.StringIO()):
+            merge_csv.merge_csv_folder(folder, output_path, **mode_kwargs)
+    
+    if use_tracemalloc:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        merge_csv.merge_csv_folder(folder, output_path, **mode_kwargs)
+    wall = time.perf_counter() - start
+    
+    result = {
+        'wall_s': wall,
+        'peak_rss_kb': _peak_rss_kb(resource.RUSAGE_SELF) if resource else None,
+        'children_peak_rss_kb': _peak_rss_kb(resource.RUSAGE_CHILDREN) if resource else None,
+        'tracemalloc_peak_bytes': None,
+        'output_bytes': os.path.getsize(output_path),
+    }
+    if use_tracemalloc:
+        result['tracemalloc_peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def run_mode(folder, work_dir, mode, workers, use_tracemalloc):
+    """Measure one mode in a fresh interpreter."""
+    mode_kwargs = dict(MODES[mode])
+    if 'workers' in mode_kwargs:
+        mode_kwargs['workers'] = workers
+    output_path = os.path.join(work_dir, f"merged_{mode}.csv")
+    job = {'folder': folder, 'output_path': output_path, 'mode_kwargs': mode_kwargs, 'tracemalloc': use_tracemalloc}
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--measure', json.dumps(job)],
+        check=True, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def summarize(results):
+    """Median wall time and worst peak memory per mode."""
+    summary = {}
+    for mode in dict.fromkeys(r['mode'] for r in results):
+        runs = [r for r in results if r['mode'] == mode]
+        rss = [r['peak_rss_kb'] for r in runs if r['peak_rss_kb'] is not None]
+        traced = [r['tracemalloc_peak_bytes'] for r in runs if r['tracemalloc_peak_bytes'] is not None]
+        summary[mode] = {
+            'median_wall_s': statistics.median(r['wall_s'] for r in runs),
+            'median_rows_per_s': statistics.median(r['rows_per_s'] for r in runs),
+            'max_peak_rss_kb': max(rss) if rss else None,
+            'max_tracemalloc_peak_bytes': max(traced) if traced else None,
+        }
+    return summary
+
+
+def compare(summary, baseline_path, max_regression):
+    """Print wall-time ratios against a previous results file; return the modes that regressed."""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)['summary']
+    regressed = []
+    print(f"\nCompared with {baseline_path}:")
+    for mode, stats in summary.items():
+        if mode not in baseline:
+            continue
+        ratio = stats['median_wall_s'] / baseline[mode]['median_wall_s']
+        flag = ''
+        if ratio > 1 + max_regression:
+            regressed.append(mode)
+            flag = '  REGRESSION'
+        print(f"  {mode:<20} {ratio:6.2f}x wall time{flag}")
+    return regressed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark merge_csv on synthetic translation comparison data.")
+    parser.add_argument('--sources', type=int, default=5000, help="Source texts per corpus (default: 5000)")
+    parser.add_argument('--translators', type=int, default=6, help="Translator rows per source (default: 6)")
+    parser.add_argument('--corpora', type=int, default=4, help="Corpus files to generate (default: 4)")
+    parser.add_argument('--text-length', type=int, default=150, help="Approximate characters per text (default: 150)")
+    parser.add_argument('--shuffled', action='store_true', help="Shuffle rows so sources are not contiguous")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=['serial', 'streaming', 'parallel'])
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Workers for parallel modes")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per mode (default: 3)")
+    parser.add_argument('--tracemalloc', action='store_true', help="Also record the tracemalloc peak (slower)")
+    parser.add_argument('--data-dir', default=None, help="Keep the generated inputs here instead of a temp dir")
+    parser.add_argument('--output', default='bench_results.json', help="Results file (default: bench_results.json)")
+    parser.add_argument('--compare', default=None, metavar='RESULTS', help="Previous results file to compare against")
+    parser.add_argument('--max-regression', type=float, default=0.2,
+                        help="Allowed slowdown versus --compare before exiting non-zero (default: 0.2)")
+    parser.add_argument('--measure', default=None, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    
+    if args.measure:
+        job = json.loads(args.measure)
+        print(json.dumps(measure(job['folder'], job['output_path'], job['mode_kwargs'], job['tracemalloc'])))
+        return 0
+    
+    work_dir = tempfile.mkdtemp(prefix='bench_merge_')
+    try:
+        folder = args.data_dir or os.path.join(work_dir, 'inputs')
+        print(f"Generating {args.corpora} corpora x {args.sources} sources x {args.translators} translators "
+              f"({'shuffled' if args.shuffled else 'contiguous'}) in {folder}...")
+        input_rows = generate_dataset(folder, args.sources, args.translators, args.corpora,
+                                      args.text_length, args.shuffled, args.seed)
+        input_bytes = sum(os.path.getsize(os.path.join(folder, name)) for name in os.listdir(folder))
+        print(f"  {input_rows} rows, {input_bytes / 1e6:.1f} MB")
+        
+        results = []
+        for mode in args.modes:
+            for repeat in range(args.repeat):
+                result = run_mode(folder, work_dir, mode, args.workers, args.tracemalloc)
+                result.update(mode=mode, repeat=repeat, rows_per_s=input_rows / result['wall_s'])
+                results.append(result)
+                rss = f"{result['peak_rss_kb'] / 1024:.0f} MB" if result['peak_rss_kb'] else 'n/a'
+                print(f"  {mode:<20} run {repeat + 1}: {result['wall_s']:.3f} s, "
+                      f"{result['rows_per_s']:,.0f} rows/s, peak RSS {rss}")
+        
+        summary = summarize(results)
+        report = {
+            'config': {key: value for key, value in vars(args).items() if key not in ('measure', 'compare')},
+            'input': {'rows': input_rows, 'bytes': input_bytes},
+            'machine': {
+                'platform': platform.platform(),
+                'python': platform.python_version(),
+                'cpu_count': os.cpu_count(),
+            },
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'summary': summary,
+            'results': results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+        
+        if args.compare and compare(summary, args.compare, args.max_regression):
+            return 1
+        return 0
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
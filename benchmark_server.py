@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Load generator for survey_server.py.
+
+Starts a server in a subprocess on a free local port (over a synthetic
+merged dataset unless --data is given), then runs many simulated evaluators
+as asyncio tasks, each on its own keep-alive connection: take the next item,
+judge it at random, save it, repeat. Reports judgments per second and the
+latency percentiles of /next and /results, and checks that every
+acknowledged result was stored.
+
+Example:
+    python benchmark_server.py --evaluators 50 --duration 10 --comparison-share 0.5 --output server_bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import signal
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import benchmark_merge
+import merge_csv
+
+RANKS = ('good', 'bad', 'best', 'unknown')
+
+
+def percentiles(samples):
+    """p50/p95/p99/max of latency samples in seconds, as milliseconds."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    cuts = statistics.quantiles(ordered, n=100, method='inclusive') if len(ordered) > 1 else ordered * 99
+    return {
+        'count': len(ordered),
+        'p50_ms': cuts[49] * 1000,
+        'p95_ms': cuts[94] * 1000,
+        'p99_ms': cuts[98] * 1000,
+        'max_ms': ordered[-1] * 1000,
+    }
+
+
+def prepare_data(work_dir, sources, translators, corpora):
+    """Generate comparison CSVs and merge them the way merge_csv.py does; returns the merged CSV."""
+    folder = os.path.join(work_dir, 'inputs')
+    benchmark_merge.generate_dataset(folder, sources, translators, corpora, text_length=200)
+    output = os.path.join(work_dir, 'merged_translation_data.csv')
+    merge_csv.merge_csv_folder(folder, output, streaming=True)
+    return output
+
+
+def start_server(data_path, db_path, batch_size):
+    """Run survey_server.py on a free port; returns (process, port)."""
+    server_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'survey_server.py')
+    process = subprocess.Popen(
+        [sys.executable, server_script, '--port', '0', '--db', db_path, '--data', data_path,
+         '--data-sqlite', data_path + '.none', '--batch-size', str(batch_size)],
+        stdout=subprocess.PIPE, text=True)
+    for line in process.stdout:
+        print(f"  server: {line.rstrip()}")
+        if line.startswith('Serving'):
+            return process, int(line.rsplit(':', 1)[1])
+    raise RuntimeError("survey_server.py exited before it started serving")
+
+
+def stop_server(process):
+    """Stop the server the way Ctrl+C would, so queued results are committed."""
+    if os.name == 'posix':
+        process.send_signal(signal.SIGINT)
+    else:
+        process.terminate()
+    output, _ = process.communicate(timeout=60)
+    for line in output.splitlines():
+        print(f"  server: {line}")
+
+
+class Connection:
+    """Minimal HTTP/1.1 JSON client on one keep-alive asyncio connection."""
+    
+    def __init__(self, reader, writer, host):
+        self.reader = reader
+        self.writer = writer
+        self.host = host
+    
+    @classmethod
+    async def open(cls, host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer, host)
+    
+    async def request(self, method, path, body=None):
+        data = json.dumps(body).encode('utf-8') if body is not None else b''
+        self.writer.write((f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                           f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n").encode('latin-1')
+                          + data)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if not line.strip():
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+        payload = json.loads(await self.reader.readexactly(length)) if length else {}
+        return status, payload
+    
+    def close(self):
+        self.writer.close()
+
+
+def judge(item, rng):
+    """Random judgments for an item, as the app would send them."""
+    if 'translations' in item:
+        return {col: rng.choice(RANKS) for col, _ in item['translations'] if rng.random() < 0.8} or \
+            {item['translations'][0][0]: 'good'}
+    (col_a, _), (col_b, _) = item['pair']
+    return {col_a: 'better', col_b: 'worse'} if rng.random() < 0.5 else {col_a: 'worse', col_b: 'better'}
+
+
+async def evaluator(name, host, port, deadline, stats, args, seed):
+    """One simulated evaluator: next, judge, save, until the deadline or the judgment budget is spent."""
+    rng = random.Random(seed)
+    conn = await Connection.open(host, port)
+    try:
+        while time.perf_counter() < deadline and stats['judgments'] < args.judgments:
+            tab = 'comparison' if rng.random() < args.comparison_share else 'ranking'
+            started = time.perf_counter()
+            status, item = await conn.request('POST', '/next', {
+                'tab': tab, 'source_lang': None, 'corpus_type': None,
+                'pair_mode': 'adaptive' if args.adaptive else 'random'})
+            stats['next'].append(time.perf_counter() - started)
+            if status != 200:
+                stats['errors'] += 1
+                continue
+            if tab == 'comparison' and item.get('pair') is None:
+                continue
+            if args.think_ms:
+                await asyncio.sleep(rng.expovariate(1.0 / args.think_ms) / 1000)
+            
+            started = time.perf_counter()
+            status, _ = await conn.request('POST', '/results', {
+                'evaluator': name, 'row_id': item['row_id'], 'judgments': judge(item, rng)})
+            stats['results'].append(time.perf_counter() - started)
+            if status == 200:
+                stats['judgments'] += 1
+            else:
+                stats['errors'] += 1
+    finally:
+        conn.close()
+
+
+async def run_load(host, port, args):
+    stats = {'next': [], 'results': [], 'judgments': 0, 'errors': 0}
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(evaluator(f"evaluator_{n:03d}", host, port, deadline, stats, args, args.seed + n)
+                           for n in range(args.evaluators)))
+    stats['wall_s'] = time.perf_counter() - started
+    return stats
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate load against a local survey server.")
+    parser.add_argument('--data', default=None, help="Merged translation CSV to serve (default: synthetic data)")
+    parser.add_argument('--sources', type=int, default=2000, help="Synthetic source texts per corpus (default: 2000)")
+    parser.add_argument('--translators', type=int, default=8, help="Synthetic translation columns (default: 8)")
+    parser.add_argument('--corpora', type=int, default=2, help="Synthetic corpora (default: 2)")
+    parser.add_argument('--evaluators', type=int, default=50, help="Concurrent simulated evaluators (default: 50)")
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds to run (default: 10)")
+    parser.add_argument('--judgments', type=int, default=10 ** 9, help="Stop after this many saved judgments")
+    parser.add_argument('--comparison-share', type=float, default=0.5,
+                        help="Fraction of items taken from the comparison pool (default: 0.5)")
+    parser.add_argument('--adaptive', action='store_true', help="Ask for adaptive comparison pairs")
+    parser.add_argument('--think-ms', type=float, default=0.0,
+                        help="Mean pause between taking an item and saving it (default: 0, flat out)")
+    parser.add_argument('--batch-size', type=int, default=500, help="Server --batch-size (default: 500)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help="Also write the report as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    work_dir = tempfile.mkdtemp(prefix='bench_server_')
+    try:
+        data_path = args.data
+        if data_path is None:
+            print(f"Generating {args.corpora} corpora x {args.sources} sources x {args.translators} translators...")
+            data_path = prepare_data(work_dir, args.sources, args.translators, args.corpora)
+        db_path = os.path.join(work_dir, 'survey_results.sqlite')
+        
+        process, port = start_server(data_path, db_path, args.batch_size)
+        try:
+            print(f"Running {args.evaluators} evaluators for up to {args.duration:g} s...")
+            stats = asyncio.run(run_load('127.0.0.1', port, args))
+        finally:
+            stop_server(process)
+        
+        with sqlite3.connect(db_path) as conn:
+            (stored,) = conn.execute("SELECT COUNT(*) FROM results").fetchone()
+        report = {
+            'config': vars(args),
+            'machine': {'platform': platform.platform(), 'python': platform.python_version(),
+                        'cpu_count': os.cpu_count()},
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'judgments': stats['judgments'],
+            'judgments_per_s': stats['judgments'] / stats['wall_s'],
+            'errors': stats['errors'],
+            'stored': stored,
+            'latency': {'next': percentiles(stats['next']), 'results': percentiles(stats['results'])},
+        }
+        
+        print(f"{report['judgments']} judgments in {stats['wall_s']:.1f} s "
+              f"({report['judgments_per_s']:,.0f}/s), {report['errors']} errors, {stored} stored")
+        for op, latency in report['latency'].items():
+            if latency:
+                print(f"  {op:<8} p50 {latency['p50_ms']:.2f} ms  p95 {latency['p95_ms']:.2f} ms  "
+                      f"p99 {latency['p99_ms']:.2f} ms  max {latency['max_ms']:.2f} ms")
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"Results written to {args.output}")
+        return 0 if stored == report['judgments'] and not report['errors'] else 1
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
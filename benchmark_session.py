@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Scripted load test for the headless survey engine (survey_session.py).
+
+Builds a synthetic merged dataset (unless --data is given), times opening a
+SurveySession on it, then replays simulated judgments as fast as the session
+takes them: load the next ranking question or comparison, judge it at random,
+save it and move on, exactly as the app's buttons do. Reports judgments per
+second and the latency percentiles of load, next and save, and checks that
+every saved judgment reached the results CSV.
+
+Example:
+    python benchmark_session.py --judgments 20000 --comparison-share 0.5 --output session_bench.json
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmark_server import RANKS, percentiles, prepare_data
+from results_writer import FSYNC_POLICIES, ResultWriter
+from survey_data import build_sqlite_store, open_dataset
+from survey_session import ADAPTIVE_PAIRS, SurveySession
+
+
+def open_session(data_path, db_path, work_dir, fsync):
+    """A SurveySession over the data with its results, journal and session file in work_dir."""
+    results_path = os.path.join(work_dir, 'translation_quality_results.csv')
+    writer = ResultWriter(results_path, journal_path=os.path.join(work_dir, 'results.journal'), fsync=fsync)
+    return SurveySession(open_dataset(data_path, db_path), results_path=results_path,
+                         session_path=os.path.join(work_dir, 'session.json'), result_writer=writer)
+
+
+def rank_question(session, rng):
+    """Random ranks for the current question, at least one of them set."""
+    columns = list(session.rankings)
+    for col in columns:
+        if rng.random() < 0.8:
+            session.rankings[col] = rng.choice(RANKS)
+    if columns and not any(session.rankings.values()):
+        session.rankings[columns[0]] = 'good'
+
+
+def run_judgments(session, args, stats):
+    """Next, judge, save, until the judgment budget is spent; returns the number of rows saved."""
+    rng = random.Random(args.seed)
+    saved = 0
+    for _ in range(args.judgments):
+        comparison = rng.random() < args.comparison_share
+        if comparison:
+            if not session.has_comparison():
+                session.comp_current_position = 0
+            started = time.perf_counter()
+            item = session.load_comparison()
+            stats['next'].append(time.perf_counter() - started)
+            
+            if item['pair'] is not None:
+                session.comp_choice = rng.choice((1, 2))
+                saved += 1
+            started = time.perf_counter()
+            if not session.comp_next_question():
+                session.comp_current_position = 0  # Walk the order again
+            stats['save'].append(time.perf_counter() - started)
+        else:
+            if not session.has_question():
+                session.current_position = 0
+            started = time.perf_counter()
+            session.load_question()
+            stats['next'].append(time.perf_counter() - started)
+            
+            rank_question(session, rng)
+            saved += any(session.rankings.values())
+            started = time.perf_counter()
+            if not session.next_question():
+                session.current_position = 0
+            stats['save'].append(time.perf_counter() - started)
+        
+        # The app prepares the next item while the evaluator reads this one
+        if args.prefetch:
+            started = time.perf_counter()
+            if comparison:
+                session.prefetch_next_comparison()
+            else:
+                session.prefetch_next_question()
+            stats['prefetch'].append(time.perf_counter() - started)
+    return saved
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay simulated judgments through a headless survey session.")
+    parser.add_argument('--data', default=None, help="Merged translation CSV (default: synthetic data)")
+    parser.add_argument('--sources', type=int, default=5000, help="Synthetic source texts per corpus (default: 5000)")
+    parser.add_argument('--translators', type=int, default=8, help="Synthetic translation columns (default: 8)")
+    parser.add_argument('--corpora', type=int, default=2, help="Synthetic corpora (default: 2)")
+    parser.add_argument('--sqlite', action='store_true', help="Open the data through the indexed SQLite store")
+    parser.add_argument('--loads', type=int, default=5, help="Times to open the session for load latency (default: 5)")
+    parser.add_argument('--judgments', type=int, default=10000, help="Judgments to replay (default: 10000)")
+    parser.add_argument('--comparison-share', type=float, default=0.5,
+                        help="Fraction of judgments made on the comparison tab (default: 0.5)")
+    parser.add_argument('--adaptive', action='store_true', help="Use adaptive comparison pairs (needs NumPy)")
+    parser.add_argument('--no-prefetch', dest='prefetch', action='store_false',
+                        help="Do not prepare the next item between judgments as the app does")
+    parser.add_argument('--fsync', choices=FSYNC_POLICIES, default='batch', help="Result journal fsync policy")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help="Also write the report as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    work_dir = tempfile.mkdtemp(prefix='bench_session_')
+    try:
+        data_path = args.data
+        if data_path is None:
+            print(f"Generating {args.corpora} corpora x {args.sources} sources x {args.translators} translators...")
+            data_path = prepare_data(work_dir, args.sources, args.translators, args.corpora)
+        db_path = os.path.join(work_dir, 'merged_translation_data.sqlite')
+        if args.sqlite:
+            build_sqlite_store(data_path, db_path)
+        
+        stats = {'load': [], 'next': [], 'save': [], 'prefetch': []}
+        for _ in range(max(args.loads, 1)):
+            started = time.perf_counter()
+            session = open_session(data_path, db_path, work_dir, args.fsync)
+            stats['load'].append(time.perf_counter() - started)
+            session.close()
+        
+        session = open_session(data_path, db_path, work_dir, args.fsync)
+        if args.adaptive:
+            if ADAPTIVE_PAIRS not in session.pair_modes:
+                print("Adaptive pairs need NumPy; using random pairs")
+            else:
+                session.set_pair_mode(ADAPTIVE_PAIRS)
+        print(f"Replaying {args.judgments} judgments over {len(session.dataset)} segments...")
+        started = time.perf_counter()
+        saved = run_judgments(session, args, stats)
+        closed = session.close()
+        wall_s = time.perf_counter() - started
+        
+        with open(session.result_writer.path, newline='', encoding='utf-8') as f:
+            stored = sum(1 for _ in csv.DictReader(f))
+        report = {
+            'config': vars(args),
+            'machine': {'platform': platform.platform(), 'python': platform.python_version(),
+                        'cpu_count': os.cpu_count()},
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'segments': len(session.dataset),
+            'judgments': args.judgments,
+            'judgments_per_s': args.judgments / wall_s,
+            'saved': saved,
+            'stored': stored,
+            'latency': {op: percentiles(samples) for op, samples in stats.items()},
+        }
+        
+        print(f"{args.judgments} judgments in {wall_s:.2f} s ({report['judgments_per_s']:,.0f}/s), "
+              f"{saved} saved, {stored} stored")
+        for op, latency in report['latency'].items():
+            if latency:
+                print(f"  {op:<8} p50 {latency['p50_ms']:.3f} ms  p95 {latency['p95_ms']:.3f} ms  "
+                      f"p99 {latency['p99_ms']:.3f} ms  max {latency['max_ms']:.3f} ms")
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"Results written to {args.output}")
+        return 0 if closed and stored == saved else 1
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,59 +1,257 @@
+import argparse
+import json
 import os
+import shutil
+import statistics
 import subprocess
 import sys
+import tempfile
+import time
 
-def build_executable():
-    """Build the survey app as a standalone executable"""
+# Needed only when bundling pandas with --with-pandas (the app itself no longer imports it)
+PANDAS_OPTIONS = [
+    "--hidden-import=pandas._libs.window.aggregations",  # Fix pandas DLL import
+    "--hidden-import=pandas._libs.reduction",
+    "--hidden-import=pandas._libs.groupby",
+    "--hidden-import=pandas._libs.ops",
+    "--hidden-import=pandas._libs.properties",
+    "--hidden-import=pandas._libs.reshape",
+    "--hidden-import=pandas._libs.sparse",
+    "--hidden-import=pandas._libs.join",
+    "--hidden-import=pandas._libs.indexing",
+    "--collect-data=pandas",  # Include pandas data files
+    "--collect-binaries=pandas",  # Include pandas binary files
+]
+
+
+# Modules the app never imports: stdlib tooling, the survey's command-line tools'
+# dependencies and optional extras that PyInstaller hooks would otherwise pull in
+EXCLUDES = [
+    "unittest", "doctest", "pydoc", "pdb", "lib2to3", "idlelib", "turtle", "turtledemo",
+    "tkinter.test", "test", "distutils", "setuptools", "pip", "xmlrpc", "ftplib", "curses",
+    "asyncio", "multiprocessing", "concurrent",
+    "matplotlib", "scipy", "IPython", "jinja2", "pytest",
+]
+
+# NumPy beyond what pair_scheduler.py and survey_data.py use (kept when bundling pandas,
+# which needs more of it). Only safe with NumPy 2, which imports these submodules lazily;
+# NumPy 1.x imports them in numpy/__init__, so excluding them would break `import numpy`
+NUMPY_EXCLUDES = [
+    "numpy.f2py", "numpy.distutils", "numpy.testing", "numpy.random", "numpy.fft", "numpy.polynomial",
+    "numpy.ma", "numpy.ctypeslib",
+]
+
+# pandas' test suite, when bundling pandas
+PANDAS_EXCLUDES = ["pandas.tests", "pandas.conftest"]
+
+# Build profiles:
+#   onefile    - one self-contained executable; unpacked to a temp folder on every launch
+#   fast-start - a folder with the executable and its runtime (PyInstaller onedir), loaded
+#                in place so nothing is unpacked at startup; ship the whole folder
+BUILD_PROFILES = {
+    "onefile": ["--onefile"],
+    "fast-start": ["--onedir", "--noupx", "--distpath=dist/fast-start"],
+}
+
+# Set by the startup benchmark: the app writes the time its first window is drawn to this file and exits
+STARTUP_PROBE_ENV = "SURVEY_STARTUP_PROBE"
+
+
+def numpy_excludes():
+    """NUMPY_EXCLUDES if the installed NumPy loads those submodules lazily, otherwise none"""
+    try:
+        import numpy
+    except ImportError:
+        return []
+    if int(numpy.__version__.split(".")[0]) < 2:
+        print(f"NumPy {numpy.__version__} imports its submodules eagerly; bundling all of NumPy "
+              "(install numpy>=2 for a smaller build)")
+        return []
+    return NUMPY_EXCLUDES
+
+
+def get_executable_path(profile="onefile"):
+    """Path of the built executable for this platform and profile"""
+    name = "TranslationSurvey.exe" if sys.platform == "win32" else "TranslationSurvey"
+    if profile == "fast-start":
+        return os.path.join("dist", "fast-start", "TranslationSurvey", name)
+    return os.path.join("dist", name)
+
+
+def artifact_size(profile="onefile"):
+    """On-disk size in bytes of what gets distributed: the executable, or the whole onedir folder"""
+    if profile != "fast-start":
+        return os.path.getsize(get_executable_path(profile))
+    folder = os.path.dirname(get_executable_path(profile))
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(folder) for name in names)
+
+
+def build_executable(include_pandas=False, profile="onefile"):
+    """Build the survey app as a standalone executable
+    
+    The app reads its data with the standard library (survey_data.py), so by
+    default pandas is excluded from the bundle. include_pandas=True reproduces
+    the previous pandas-bundling build for size and startup comparisons.
+    profile is one of BUILD_PROFILES.
+    """
     
     print("Building Translation Quality Survey executable...")
     
     # Install requirements if not already installed
     try:
-        import pandas
         import tkinter
+        import PyInstaller
     except ImportError:
         print("Installing required packages...")
         subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
+    if include_pandas:
+        try:
+            import pandas
+        except ImportError:
+            subprocess.check_call([sys.executable, "-m", "pip", "install", "pandas"])
     
-    # PyInstaller command with pandas fixes
     cmd = [
         "pyinstaller",
-        "--onefile",           # Create a single executable file
+        *BUILD_PROFILES[profile],
+        "--noconfirm",         # Replace the previous build's output
         "--windowed",          # No console window (GUI app)
         "--name=TranslationSurvey",  # Name of the executable
-        "--add-data=merged_translation_data.csv;.",  # Include the CSV data file
-        "--hidden-import=pandas._libs.window.aggregations",  # Fix pandas DLL import
-        "--hidden-import=pandas._libs.reduction",
-        "--hidden-import=pandas._libs.groupby",
-        "--hidden-import=pandas._libs.ops",
-        "--hidden-import=pandas._libs.properties",
-        "--hidden-import=pandas._libs.reshape",
-        "--hidden-import=pandas._libs.sparse",
-        "--hidden-import=pandas._libs.join",
-        "--hidden-import=pandas._libs.indexing",
-        "--collect-data=pandas",  # Include pandas data files
-        "--collect-binaries=pandas",  # Include pandas binary files
-        "survey_app.py"
+        f"--add-data=merged_translation_data.csv{os.pathsep}.",  # Include the CSV data file (';' on Windows, ':' elsewhere)
     ]
+    excludes = EXCLUDES + (PANDAS_EXCLUDES if include_pandas else ["pandas"] + numpy_excludes())
+    if include_pandas:
+        cmd += PANDAS_OPTIONS
+    cmd += [f"--exclude-module={module}" for module in excludes]
+    cmd.append("survey_app.py")
     
     print("Running PyInstaller...")
     print(" ".join(cmd))
     
     try:
         subprocess.check_call(cmd)
+        executable = get_executable_path(profile)
         print("\nBuild successful!")
-        print("Executable created: dist/TranslationSurvey.exe")
+        print(f"Executable created: {executable}")
+        if os.path.exists(executable):
+            print(f"Size on disk: {artifact_size(profile) / (1024 * 1024):.1f} MB")
         print("\nTo distribute:")
-        print("1. Copy dist/TranslationSurvey.exe to any folder")
+        if profile == "fast-start":
+            print("1. Copy the whole dist/fast-start/TranslationSurvey folder to the evaluator's machine")
+        else:
+            print("1. Copy dist/TranslationSurvey.exe to any folder")
         print("2. Copy merged_translation_data.csv to the same folder")
         print("3. Run TranslationSurvey.exe")
         print("4. Results will be saved to translation_quality_results.csv in the same folder")
-
+    
     except subprocess.CalledProcessError as e:
         print(f"Build failed: {e}")
         return False
     
     return True
 
+def launch_to_first_window(command, work_dir, timeout=120):
+    """
+    Launch the app once; returns (seconds to its first window, seconds until it
+    exited, the NumPy version the app imported or None if it could not).
+    """
+    probe_path = os.path.join(work_dir, "first_window.txt")
+    if os.path.exists(probe_path):
+        os.remove(probe_path)
+    env = dict(os.environ, **{STARTUP_PROBE_ENV: probe_path, "SURVEY_JOURNAL_DIR": os.path.join(work_dir, "state")})
+    env.pop("SURVEY_SERVER", None)
+    
+    started = time.time()
+    subprocess.run(command, cwd=work_dir, env=env, timeout=timeout,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    exited = time.time()
+    try:
+        with open(probe_path, encoding="utf-8") as f:
+            first_window, numpy_version = (f.read().splitlines() + [""])[:2]
+        first_window = float(first_window)
+    except (OSError, ValueError):
+        raise RuntimeError(f"{command[0]} exited without showing its window")
+    return first_window - started, exited - started, numpy_version or None
+
+
+def benchmark_startup(command, data_path, runs=5):
+    """
+    Launch the app runs+1 times in a scratch folder holding a copy of the data.
+    
+    The first launch after a build is reported as cold (the executable is not
+    yet in the OS file cache; a onefile build also unpacks itself on every
+    launch), the rest as warm. For a truly cold start, reboot or drop the OS
+    file cache before running.
+    """
+    work_dir = tempfile.mkdtemp(prefix="startup_bench_")
+    try:
+        shutil.copy(data_path, os.path.join(work_dir, os.path.basename(data_path)))
+        samples = [launch_to_first_window(command, work_dir) for _ in range(runs + 1)]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    warm_window = [first_window for first_window, _, _ in samples[1:]]
+    warm_exit = [exited for _, exited, _ in samples[1:]]
+    return {
+        "command": command,
+        "runs": runs,
+        # Adaptive pairs and the vectorised translation masks need NumPy to import in the build
+        "numpy": samples[0][2],
+        "cold_first_window_s": samples[0][0],
+        "warm_first_window_s": {"median": statistics.median(warm_window), "min": min(warm_window),
+                                "max": max(warm_window)} if warm_window else None,
+        "cold_exit_s": samples[0][1],
+        "warm_exit_s": statistics.median(warm_exit) if warm_exit else None,
+    }
+
+
+def print_benchmark(report):
+    print(f"\nStartup ({' '.join(report['command'])}):")
+    print(f"  cold: first window {report['cold_first_window_s']:.2f} s")
+    warm = report["warm_first_window_s"]
+    if warm:
+        print(f"  warm: first window median {warm['median']:.2f} s (min {warm['min']:.2f}, max {warm['max']:.2f}) "
+              f"over {report['runs']} launches")
+    if report.get("size_bytes") is not None:
+        print(f"  size on disk: {report['size_bytes'] / (1024 * 1024):.1f} MB")
+    print(f"  numpy: {report['numpy'] or 'could not be imported'}")
+
+
 if __name__ == "__main__":
-    build_executable()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Build the survey app executable with PyInstaller.")
+    parser.add_argument("--profile", choices=sorted(BUILD_PROFILES), default="onefile",
+                        help="onefile: one executable (default); fast-start: a folder that starts without unpacking")
+    parser.add_argument("--with-pandas", action="store_true",
+                        help="Bundle pandas as the previous build did (larger executable, slower start)")
+    parser.add_argument("--benchmark", type=int, nargs="?", const=5, default=None, metavar="RUNS",
+                        help="After building, launch the executable RUNS+1 times (default 5) and report cold and "
+                             "warm time to first window and size on disk")
+    parser.add_argument("--benchmark-only", action="store_true",
+                        help="Benchmark the existing build of --profile without rebuilding")
+    parser.add_argument("--benchmark-source", action="store_true",
+                        help="Benchmark 'python survey_app.py' instead of a build, as a baseline")
+    parser.add_argument("--data", default="merged_translation_data.csv",
+                        help="Data file the benchmark launches the app with (default: merged_translation_data.csv)")
+    parser.add_argument("--benchmark-output", default=None, help="Also write the benchmark report as JSON")
+    args = parser.parse_args()
+    
+    benchmark = args.benchmark is not None or args.benchmark_only or args.benchmark_source
+    if not (args.benchmark_only or args.benchmark_source):
+        if not build_executable(include_pandas=args.with_pandas, profile=args.profile):
+            sys.exit(1)
+    if benchmark:
+        if args.benchmark_source:
+            command = [sys.executable, os.path.abspath("survey_app.py")]
+            size = None
+        else:
+            command = [os.path.abspath(get_executable_path(args.profile))]
+            size = artifact_size(args.profile)
+        report = benchmark_startup(command, args.data, args.benchmark or 5)
+        report.update(profile=None if args.benchmark_source else args.profile, with_pandas=args.with_pandas,
+                      size_bytes=size, platform=sys.platform)
+        print_benchmark(report)
+        if args.benchmark_output:
+            with open(args.benchmark_output, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(f"Benchmark written to {args.benchmark_output}")
+        if report["numpy"] is None:
+            print("NumPy could not be imported by the app; adaptive pairs and vectorised masks are unavailable")
+            sys.exit(1)
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Consolidate translation_quality_results.csv files from many evaluators.
+
+Each evaluator machine writes its own results file, and builds with
+different translation columns write different headers. This script aligns
+every file to the union of their columns, tags each row with the evaluator
+and a file id (a hash of the file's contents), drops exact duplicate rows
+(same evaluator, same cells, as when a results file is collected twice)
+and writes one consolidated CSV plus a JSON summary.
+
+The work runs on a process pool in three passes over the inputs:
+1. hash every aligned row into index files partitioned by hash,
+2. find duplicates one partition at a time, keeping the first occurrence,
+3. write each file's remaining rows as a fragment, concatenated in input order.
+Memory is bounded by the largest partition, not the total number of rows:
+the partition count is derived from the inputs' total size and a memory
+budget, so the rows of each partition's duplicate set fit in it.
+
+Usage:
+    python consolidate_results.py evaluators/ [-o dist/consolidated_results.csv] [--workers 0]
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import math
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from functools import partial
+
+from merge_csv import DEFAULT_MEMORY_BUDGET, file_sha256, map_files
+
+RESULTS_FILENAME = 'translation_quality_results.csv'
+TAG_COLUMNS = ('evaluator', 'file_id')
+EVALUATOR_SOURCES = ('folder', 'filename')
+MIN_PARTITIONS = 64
+MAX_PARTITIONS = 4096
+# Sizing the partitions: results rows are rarely shorter than this many bytes on disk,
+# and each row kept in a partition's duplicate set costs about this much memory
+MIN_ROW_BYTES = 64
+SEEN_ROW_BYTES = 128
+# Index record: 16-byte row digest and row number
+_RECORD = struct.Struct('<16sQ')
+# Bytes of index records buffered per partition before writing
+_INDEX_BUFFER = 1 << 16
+
+
+def find_results_files(inputs):
+    """
+    Return the results CSVs to consolidate, sorted by path.
+    
+    Folders are searched recursively for files whose name ends with
+    translation_quality_results.csv; files given directly are always used.
+    """
+    if isinstance(inputs, (str, os.PathLike)):
+        inputs = [inputs]
+    
+    paths = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for folder, _, filenames in os.walk(path):
+                paths.extend(os.path.join(folder, filename) for filename in filenames
+                             if filename.endswith(RESULTS_FILENAME))
+        elif os.path.isfile(path):
+            paths.append(path)
+        else:
+            raise FileNotFoundError(path)
+    return sorted(set(paths))
+
+
+def evaluator_name(path, source='folder'):
+    """Evaluator id from the folder holding the file, or from the filename before the results suffix."""
+    if source == 'filename':
+        stem = os.path.basename(path)
+        if stem.endswith(RESULTS_FILENAME):
+            stem = stem[:-len(RESULTS_FILENAME)].rstrip('_-. ')
+        else:
+            stem = os.path.splitext(stem)[0]
+        if stem:
+            return stem
+    return os.path.basename(os.path.dirname(os.path.abspath(path)))
+
+
+def read_header(path):
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        return next(csv.reader(f), [])
+
+
+def union_columns(headers):
+    """source, every translation column in first-seen order, corpus_type, then the tag columns."""
+    translation_columns = {}
+    for header in headers:
+        for col in header:
+            if col not in ('source', 'corpus_type') and col not in TAG_COLUMNS:
+                translation_columns.setdefault(col)
+    return ['source', *translation_columns, 'corpus_type', *TAG_COLUMNS]
+
+
+def iter_aligned_rows(path, columns, evaluator, file_id):
+    """
+    Yield (row number, aligned cells) for a results file.
+    
+    Cells follow columns; columns missing from the file are empty. Tag
+    columns already present (in a previously consolidated file) are kept.
+    """
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        positions = {col: i for i, col in enumerate(header)}
+        defaults = {'evaluator': evaluator, 'file_id': file_id}
+        layout = [(positions.get(col), defaults.get(col, '')) for col in columns]
+        
+        for row_number, row in enumerate(reader):
+            if not row:
+                continue
+            width = len(row)
+            yield row_number, [row[i] if i is not None and i < width and (row[i] or not default) else default
+                               for i, default in layout]
+
+
+def row_digest(cells, file_id_index):
+    """Hash of an aligned row, ignoring the file id so copies of a file collapse."""
+    key = cells[:file_id_index] + cells[file_id_index + 1:]
+    return hashlib.blake2b(json.dumps(key, ensure_ascii=False).encode('utf-8'), digest_size=16).digest()
+
+
+def index_file(job, columns, index_dir, partitions):
+    """First pass: write (digest, row number) records of one file into per-partition index files."""
+    file_number, path, evaluator, file_id = job
+    file_id_index = columns.index('file_id')
+    buffers = {}
+    rows = 0
+    
+    def flush(partition):
+        with open(os.path.join(index_dir, f"{partition:04d}", f"{file_number:06d}.idx"), 'ab') as f:
+            f.write(buffers.pop(partition))
+    
+    for row_number, cells in iter_aligned_rows(path, columns, evaluator, file_id):
+        digest = row_digest(cells, file_id_index)
+        partition = int.from_bytes(digest[:4], 'little') % partitions
+        buffer = buffers.setdefault(partition, bytearray())
+        buffer += _RECORD.pack(digest, row_number)
+        if len(buffer) >= _INDEX_BUFFER:
+            flush(partition)
+        rows += 1
+    for partition in list(buffers):
+        flush(partition)
+    return rows
+
+
+def find_duplicates(partition, index_dir, drop_dir):
+    """
+    Second pass: mark repeated digests within one partition.
+    
+    Index files are read in input order and each holds its records in row
+    order, so the first occurrence of a row is the one kept. Dropped row
+    numbers are written per input file; returns {file number: duplicates}.
+    """
+    partition_dir = os.path.join(index_dir, f"{partition:04d}")
+    seen = set()
+    counts = {}
+    for filename in sorted(os.listdir(partition_dir)):
+        file_number = int(filename.split('.')[0])
+        dropped = array('Q')
+        with open(os.path.join(partition_dir, filename), 'rb') as f:
+            for digest, row_number in _RECORD.iter_unpack(f.read()):
+                if digest in seen:
+                    dropped.append(row_number)
+                else:
+                    seen.add(digest)
+        if dropped:
+            with open(os.path.join(drop_dir, f"{file_number:06d}.{partition:04d}.drop"), 'wb') as f:
+                dropped.tofile(f)
+            counts[file_number] = len(dropped)
+    return counts
+
+
+def write_fragment(job, columns, drop_dir, fragment_dir):
+    """Third pass: write one file's aligned rows, minus its duplicates, to a headerless CSV fragment."""
+    file_number, path, evaluator, file_id = job
+    dropped = set()
+    prefix = f"{file_number:06d}."
+    for filename in os.listdir(drop_dir):
+        if filename.startswith(prefix):
+            rows = array('Q')
+            with open(os.path.join(drop_dir, filename), 'rb') as f:
+                rows.frombytes(f.read())
+            dropped.update(rows)
+    
+    kept = 0
+    fragment_path = os.path.join(fragment_dir, f"{file_number:06d}.csv")
+    with open(fragment_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        for row_number, cells in iter_aligned_rows(path, columns, evaluator, file_id):
+            if row_number not in dropped:
+                writer.writerow(cells)
+                kept += 1
+    return kept
+
+
+def describe_file(path, evaluator_source='folder'):
+    """Header, evaluator, size and content hash of one input."""
+    return {
+        'path': path,
+        'evaluator': evaluator_name(path, evaluator_source),
+        'file_id': file_sha256(path)[:12],
+        'bytes': os.path.getsize(path),
+        'header': read_header(path),
+    }
+
+
+def partition_count(total_bytes, workers, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """
+    Partitions needed so the workers' duplicate sets together stay within
+    memory_budget bytes, assuming the shortest plausible rows (at most
+    MAX_PARTITIONS, which keeps the index folders manageable).
+    """
+    rows = total_bytes // MIN_ROW_BYTES
+    needed = math.ceil(rows * SEEN_ROW_BYTES * workers / max(memory_budget, 1024 * 1024))
+    return min(MAX_PARTITIONS, max(MIN_PARTITIONS, needed))
+
+
+def consolidate_results(inputs, output_path, summary_path=None, workers=0, partitions=None,
+                        evaluator_source='folder', memory_budget=DEFAULT_MEMORY_BUDGET):
+    """
+    Consolidate the results files found in inputs into output_path; returns the summary dict.
+    
+    partitions defaults to partition_count() of the inputs' total size and memory_budget.
+    """
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    paths = find_results_files(inputs)
+    if not paths:
+        print("No results files found!")
+        return None
+    
+    print(f"Reading headers of {len(paths)} results files...")
+    files = list(map_files(partial(describe_file, evaluator_source=evaluator_source), paths, workers))
+    files = [entry for entry in files if 'source' in entry['header']]
+    for path in sorted(set(paths) - {entry['path'] for entry in files}):
+        print(f"Skipping {path}: no source column")
+    columns = union_columns(entry['header'] for entry in files)
+    jobs = [(n, entry['path'], entry['evaluator'], entry['file_id']) for n, entry in enumerate(files)]
+    if partitions is None:
+        partitions = partition_count(sum(entry['bytes'] for entry in files), workers, memory_budget)
+    
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix='.consolidate-', dir=output_dir)
+    try:
+        index_dir = os.path.join(work_dir, 'index')
+        drop_dir = os.path.join(work_dir, 'drop')
+        fragment_dir = os.path.join(work_dir, 'fragments')
+        for partition in range(partitions):
+            os.makedirs(os.path.join(index_dir, f"{partition:04d}"))
+        os.makedirs(drop_dir)
+        os.makedirs(fragment_dir)
+        
+        print(f"Indexing rows on {workers} workers...")
+        row_counts = list(map_files(partial(index_file, columns=columns, index_dir=index_dir, partitions=partitions),
+                                    jobs, workers))
+        
+        print(f"Finding duplicates in {partitions} partitions...")
+        duplicates = [0] * len(jobs)
+        for counts in map_files(partial(find_duplicates, index_dir=index_dir, drop_dir=drop_dir),
+                                range(partitions), workers):
+            for file_number, count in counts.items():
+                duplicates[file_number] += count
+        
+        print(f"Writing consolidated results to {output_path}...")
+        kept_counts = list(map_files(partial(write_fragment, columns=columns, drop_dir=drop_dir,
+                                             fragment_dir=fragment_dir), jobs, workers))
+        with open(output_path + '.tmp', 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerow(columns)
+            for file_number, _, _, _ in jobs:
+                with open(os.path.join(fragment_dir, f"{file_number:06d}.csv"), 'r', newline='', encoding='utf-8') as fragment:
+                    shutil.copyfileobj(fragment, f)
+        os.replace(output_path + '.tmp', output_path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    by_content = {}
+    for entry in files:
+        by_content.setdefault(entry['file_id'], []).append(entry['path'])
+    evaluators = {}
+    for entry, rows, kept, dropped in zip(files, row_counts, kept_counts, duplicates):
+        entry.update(rows=rows, kept=kept, duplicates=dropped,
+                     missing_columns=[col for col in columns[1:-len(TAG_COLUMNS) - 1] if col not in entry['header']])
+        del entry['header']
+        evaluators[entry['evaluator']] = evaluators.get(entry['evaluator'], 0) + kept
+    
+    summary = {
+        'output': output_path,
+        'columns': columns,
+        'rows': sum(kept_counts),
+        'duplicates': sum(duplicates),
+        'evaluators': evaluators,
+        'identical_files': [group for group in by_content.values() if len(group) > 1],
+        'files': files,
+    }
+    if summary_path is None:
+        summary_path = os.path.splitext(output_path)[0] + '_summary.json'
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=1, ensure_ascii=False)
+    
+    print(f"Consolidation complete! Output contains {summary['rows']} rows "
+          f"({summary['duplicates']} duplicates dropped) from {len(files)} files.")
+    for evaluator, rows in evaluators.items():
+        print(f"{evaluator}: {rows} rows")
+    for group in summary['identical_files']:
+        print(f"Identical files: {', '.join(group)}")
+    print(f"Summary written to {summary_path}")
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Consolidate results files from many evaluators into one CSV.")
+    parser.add_argument('inputs', nargs='+',
+                        help=f"Folders (searched recursively for *{RESULTS_FILENAME}) and/or results CSVs")
+    parser.add_argument('-o', '--output', default="dist/consolidated_results.csv",
+                        help="Consolidated CSV to write (default: dist/consolidated_results.csv)")
+    parser.add_argument('--summary', default=None,
+                        help="Summary JSON (default: <output>_summary.json)")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="Processes used; 0 uses every CPU (default: 0)")
+    parser.add_argument('--memory-budget', type=int, default=DEFAULT_MEMORY_BUDGET // (1024 * 1024),
+                        help="MB the duplicate detection may hold across workers; sets the number of hash "
+                             f"partitions from the inputs' size (default: {DEFAULT_MEMORY_BUDGET // (1024 * 1024)})")
+    parser.add_argument('--partitions', type=int, default=None,
+                        help="Hash partitions for duplicate detection (default: derived from --memory-budget)")
+    parser.add_argument('--evaluator-from', choices=EVALUATOR_SOURCES, default='folder',
+                        help="Take the evaluator id from the file's folder or its filename (default: folder)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        consolidate_results(args.inputs, args.output, summary_path=args.summary, workers=args.workers,
+                            partitions=max(1, args.partitions) if args.partitions else None,
+                            evaluator_source=args.evaluator_from, memory_budget=args.memory_budget * 1024 * 1024)
+    except FileNotFoundError as e:
+        print(f"Error: Could not find input - {e}")
+        sys.exit(1)
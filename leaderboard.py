@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Live leaderboard over translation_quality_results.csv.
+
+Leaderboard keeps running good/bad/best/unknown counts per translation
+column and a pairwise win matrix from the better/worse rows of the
+Comparison tab. The survey app appends a new row every time a question is
+saved, so a later row for the same question replaces the earlier one: the
+latest ranking per source, and the latest verdict per source and pair of
+columns. Each row updates the totals in O(columns).
+
+A comparison whose texts were produced by several columns fans out to a
+verdict for every better column against every worse one; each of those
+k x m verdicts counts 1/(k*m) of a win, so one judgment counts once, as in
+the adaptive pair model (pair_scheduler.py) and analyze_results.py.
+
+Usage:
+    python leaderboard.py [translation_quality_results.csv] [-o leaderboard.csv]
+"""
+
+import argparse
+import csv
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+RESULTS_PATH = 'translation_quality_results.csv'
+RANK_VALUES = ('good', 'bad', 'best', 'unknown')
+COMPARISON_VALUES = ('better', 'worse')
+# Decimal places kept for win counts, which are fractional when a comparison fanned out
+WIN_DECIMALS = 4
+# evaluator and file_id are added by consolidate_results.py
+METADATA_COLUMNS = {'source', 'source_lang', 'corpus_type', 'evaluator', 'file_id'}
+
+
+def classify_row(row: Dict[str, str]):
+    """
+    Return ('rank', key, judgments), ('pair', key, verdicts) or None for a results row.
+    
+    Both are keyed by (evaluator, source, corpus_type); the evaluator is
+    empty unless the file was consolidated. Ranking rows carry the (column,
+    rank) pairs that were set. Comparison rows carry a (winner, loser) verdict
+    for every 'better' column against every 'worse' column: usually one, more
+    when the text shown was produced by several columns.
+    """
+    judged = [(col, (value or '').strip()) for col, value in row.items()
+              if col not in METADATA_COLUMNS and col is not None and value and value.strip()]
+    if not judged:
+        return None
+    source_key = (row.get('evaluator') or '', row.get('source') or '', row.get('corpus_type') or '')
+    
+    if any(value in COMPARISON_VALUES for _, value in judged):
+        winners = [col for col, value in judged if value == 'better']
+        losers = [col for col, value in judged if value == 'worse']
+        if not winners or not losers:
+            return None  # Not a well-formed comparison
+        return 'pair', source_key, tuple((winner, loser) for winner in winners for loser in losers)
+    
+    judgments = tuple((col, value) for col, value in judged if value in RANK_VALUES)
+    return ('rank', source_key, judgments) if judgments else None
+
+
+def _tally(count):
+    """A win count as reported: an int when whole, otherwise rounded to WIN_DECIMALS."""
+    count = round(count, WIN_DECIMALS)
+    return int(count) if count == int(count) else count
+
+
+def _iter_rows(path: str, limit: Optional[int] = None) -> Iterable[Dict[str, str]]:
+    """Stream a results CSV, stopping after the first limit bytes (whole lines only)."""
+    with open(path, 'rb') as f:
+        def lines():
+            consumed = 0
+            for raw in iter(f.readline, b''):
+                consumed += len(raw)
+                if limit is not None and consumed > limit:
+                    return
+                yield raw.decode('utf-8')
+        yield from csv.DictReader(lines())
+
+
+class Leaderboard:
+    """Running per-column ranking counts and pairwise wins, with later rows superseding earlier ones."""
+    
+    def __init__(self, columns: Iterable[str] = ()):
+        self.columns = {}  # Ordered set of translation columns
+        self.rank_counts = {}  # column -> {rank value: count}
+        self.wins = {}  # (winner, loser) -> count, fractional for fanned-out comparisons
+        self.rankings = {}  # (evaluator, source, corpus_type) -> judgments currently counted
+        # (evaluator, source, corpus_type, column_a, column_b) -> (winner, loser, weight) currently counted
+        self.verdicts = {}
+        self.rows = 0
+        self.superseded = 0
+        for col in columns:
+            self._column(col)
+    
+    @classmethod
+    def from_csv(cls, path: str = RESULTS_PATH, limit: Optional[int] = None, columns: Iterable[str] = ()) -> 'Leaderboard':
+        """Build from a results file in one streaming pass (empty if the file does not exist)."""
+        leaderboard = cls(columns)
+        if os.path.exists(path):
+            for row in _iter_rows(path, limit):
+                leaderboard.add_row(row)
+        return leaderboard
+    
+    @classmethod
+    def from_state(cls, state: dict) -> 'Leaderboard':
+        """
+        Rebuild the totals written by state(), as sent by the survey server.
+        
+        Only the totals are carried over: rows added afterwards cannot
+        replace a question counted in the state.
+        """
+        leaderboard = cls(state.get('columns', ()))
+        for col, counts in state.get('rank_counts', {}).items():
+            leaderboard._column(col)
+            leaderboard.rank_counts[col].update((rank, counts.get(rank, 0)) for rank in RANK_VALUES)
+        for winner, loser, count in state.get('wins', ()):
+            leaderboard._column(winner)
+            leaderboard._column(loser)
+            leaderboard.wins[(winner, loser)] = count
+        leaderboard.rows = state.get('rows', 0)
+        leaderboard.superseded = state.get('superseded', 0)
+        return leaderboard
+    
+    def state(self) -> dict:
+        """JSON-serializable totals (without the per-question history)."""
+        return {
+            'columns': list(self.columns),
+            'rank_counts': self.rank_counts,
+            'wins': [[winner, loser, _tally(count)] for (winner, loser), count in self.wins.items() if _tally(count)],
+            'rows': self.rows,
+            'superseded': self.superseded,
+        }
+    
+    def _column(self, col):
+        if col not in self.columns:
+            self.columns[col] = None
+            self.rank_counts[col] = dict.fromkeys(RANK_VALUES, 0)
+    
+    def add_row(self, row: Dict[str, str]):
+        """Count one results row, replacing any earlier row for the same question."""
+        classified = classify_row(row)
+        if classified is None:
+            return
+        kind, key, value = classified
+        self.rows += 1
+        
+        if kind == 'rank':
+            previous = self.rankings.get(key)
+            if previous is not None:
+                self.superseded += 1
+                for col, rank in previous:
+                    self.rank_counts[col][rank] -= 1
+            for col, rank in value:
+                self._column(col)
+                self.rank_counts[col][rank] += 1
+            self.rankings[key] = value
+        else:
+            # The verdicts of one comparison share a single win between them
+            weight = 1 if len(value) == 1 else 1 / len(value)
+            for winner, loser in value:
+                pair_key = key + tuple(sorted((winner, loser)))
+                previous = self.verdicts.get(pair_key)
+                if previous is not None:
+                    self.superseded += 1
+                    self.wins[previous[:2]] -= previous[2]
+                self._column(winner)
+                self._column(loser)
+                self.wins[(winner, loser)] = self.wins.get((winner, loser), 0) + weight
+                self.verdicts[pair_key] = (winner, loser, weight)
+    
+    def summary(self) -> List[Dict[str, object]]:
+        """One row per column, best first: rank counts and rates, comparison wins and losses."""
+        wins = dict.fromkeys(self.columns, 0)
+        losses = dict.fromkeys(self.columns, 0)
+        for (winner, loser), count in self.wins.items():
+            wins[winner] += count
+            losses[loser] += count
+        
+        table = []
+        for col in self.columns:
+            counts = self.rank_counts[col]
+            ranked = sum(counts.values())
+            compared = wins[col] + losses[col]
+            table.append({
+                'column': col,
+                'ranked': ranked,
+                **counts,
+                'good_or_best_rate': (counts['good'] + counts['best']) / ranked if ranked else None,
+                'best_rate': counts['best'] / ranked if ranked else None,
+                'wins': _tally(wins[col]),
+                'losses': _tally(losses[col]),
+                'win_rate': wins[col] / compared if compared else None,
+            })
+        table.sort(key=lambda entry: (-(entry['win_rate'] or 0), -(entry['good_or_best_rate'] or 0), entry['column']))
+        return table
+    
+    def pairwise(self) -> Tuple[List[str], List[List[float]]]:
+        """Columns and the matrix of wins of each row's column over each column."""
+        columns = list(self.columns)
+        return columns, [[_tally(self.wins.get((a, b), 0)) for b in columns] for a in columns]
+    
+    def export(self, path: str) -> Tuple[str, str]:
+        """Write the summary to path and the win matrix next to it; return both paths."""
+        table = self.summary()
+        fieldnames = ['column', 'ranked', *RANK_VALUES, 'good_or_best_rate', 'best_rate', 'wins', 'losses', 'win_rate']
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            for entry in table:
+                writer.writerow({key: '' if value is None else (f"{value:.4f}" if isinstance(value, float) else value)
+                                 for key, value in entry.items()})
+        
+        root, ext = os.path.splitext(path)
+        pairwise_path = f"{root}_pairwise{ext or '.csv'}"
+        columns, matrix = self.pairwise()
+        with open(pairwise_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['winner \\ loser'] + columns)
+            for col, counts in zip(columns, matrix):
+                writer.writerow([col] + counts)
+        return path, pairwise_path
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compute the model leaderboard from survey results.")
+    parser.add_argument('results', nargs='?', default=RESULTS_PATH,
+                        help=f"Results CSV (default: {RESULTS_PATH})")
+    parser.add_argument('-o', '--output', default='leaderboard.csv',
+                        help="Summary CSV; the win matrix goes to <name>_pairwise.csv (default: leaderboard.csv)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if not os.path.exists(args.results):
+        print(f"{args.results} not found!")
+    else:
+        leaderboard = Leaderboard.from_csv(args.results)
+        summary_path, pairwise_path = leaderboard.export(args.output)
+        print(f"{leaderboard.rows} judgments ({leaderboard.superseded} superseded by later saves)")
+        for entry in leaderboard.summary():
+            win_rate = f"{entry['win_rate']:.0%}" if entry['win_rate'] is not None else '-'
+            good_rate = f"{entry['good_or_best_rate']:.0%}" if entry['good_or_best_rate'] is not None else '-'
+            print(f"  {entry['column']:<30} good/best {good_rate:>5}  wins {win_rate:>5}")
+        print(f"Leaderboard written to {summary_path} and {pairwise_path}")
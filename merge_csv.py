@@ -5,74 +5,316 @@ Each CSV has multiple rows per source text (one per translator).
 This script combines them into one row per source text with separate columns for each translator.
 """
 
+import argparse
 import csv
+import hashlib
+import heapq
+import json
+import shutil
 import sys
 import os
 import re
+import tempfile
 from collections import defaultdict, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
+from survey_data import STORE_FORMAT_VERSION, build_sqlite_store, store_format_version
 
-def merge_csv_folder(folder_path, output_path):
+
+METADATA_COLUMNS = ('source', 'translation_bureau', 'source_lang', 'other_lang', 'corpus_type')
+FILENAME_PATTERN = re.compile(r'(.+?)_translation_comparison_(.+?)\.csv')
+MANIFEST_VERSION = 1
+GROUPING_MODES = ('contiguous', 'any')
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+# Rough per-entry overhead of dicts and strings, used to estimate index memory
+_GROUP_OVERHEAD = 400
+_FIELD_OVERHEAD = 120
+# Maximum number of runs open at once during the k-way merge
+_MERGE_FAN_IN = 64
+
+
+def iter_source_groups(file_path, corpus_type):
     """
-    Merge CSV files from a folder containing translation data.
+    Yield one grouped row per run of consecutive rows sharing a source text.
     
-    Args:
-        folder_path: Path to folder containing CSV files
-        output_path: Path for output merged CSV file
+    Only the group currently being built is held in memory, so peak memory
+    depends on the largest single group rather than on the size of the file.
     """
-    
-    def process_csv_file(file_path, corpus_type):
-        """Process a single CSV file and group by source text."""
-        grouped_data = OrderedDict()
+    with open(file_path, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
+        current_source = None
+        current_group = {}
+        
+        for row in reader:
+            source = row['source']
+            
+            # If we hit a new source, emit the previous group
+            if current_source is not None and source != current_source:
+                if current_group:
+                    current_group['corpus_type'] = corpus_type
+                    yield current_group
+                current_group = {}
             
-            current_source = None
-            current_group = {}
+            # Initialize group for new source
+            if source != current_source:
+                current_source = source
+                current_group = _start_group(row)
             
-            for row in reader:
+            # Add translator data
+            translator_name = row['translator_name']
+            current_group[translator_name] = row['translated_text']
+        
+        # Don't forget the last group
+        if current_group:
+            current_group['corpus_type'] = corpus_type
+            yield current_group
+
+
+def _start_group(row):
+    return {
+        'source': row['source'],
+        'translation_bureau': row['target'],
+        'source_lang': row['source_lang'],
+        'other_lang': row['other_lang']
+    }
+
+
+def _spill_run(index, spill_dir, first_seen):
+    """Write the hash index as a run of partial groups sorted by source."""
+    fd, run_path = tempfile.mkstemp(suffix='.jsonl', dir=spill_dir)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        for source in sorted(index):
+            f.write(json.dumps([source, first_seen[source], index[source]], ensure_ascii=False))
+            f.write('\n')
+    return run_path
+
+
+def _read_run(run_path):
+    with open(run_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def _run_key(item):
+    return item[0], item[1]
+
+
+def _merge_runs(runs, spill_dir):
+    """Reduce the number of runs to at most _MERGE_FAN_IN by merging them in batches."""
+    while len(runs) > _MERGE_FAN_IN:
+        merged_runs = []
+        for start in range(0, len(runs), _MERGE_FAN_IN):
+            batch = runs[start:start + _MERGE_FAN_IN]
+            fd, run_path = tempfile.mkstemp(suffix='.jsonl', dir=spill_dir)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                for item in heapq.merge(*(_read_run(path) for path in batch), key=_run_key):
+                    f.write(json.dumps(item, ensure_ascii=False))
+                    f.write('\n')
+            for path in batch:
+                os.remove(path)
+            merged_runs.append(run_path)
+        runs = merged_runs
+    return runs
+
+
+def iter_unordered_source_groups(file_path, corpus_type, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """
+    Yield one grouped row per source text, whatever order the rows come in.
+    
+    Rows are grouped in a hash index while its estimated size stays within
+    memory_budget bytes; groups come out in order of first appearance. Once the
+    budget is exceeded the index is spilled to sorted temporary runs, which are
+    combined with a k-way merge, and groups come out sorted by source text.
+    Within a group, the first row supplies the metadata and later rows win for
+    a repeated translator, as with contiguous grouping.
+    """
+    index = OrderedDict()
+    first_seen = {}
+    estimated = 0
+    runs = []
+    
+    with tempfile.TemporaryDirectory(prefix='merge_csv_') as spill_dir:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for seq, row in enumerate(csv.DictReader(f)):
                 source = row['source']
+                group = index.get(source)
+                if group is None:
+                    group = index[source] = _start_group(row)
+                    first_seen[source] = seq
+                    estimated += _GROUP_OVERHEAD + len(source) + len(row['target'])
+                translated_text = row['translated_text']
+                group[row['translator_name']] = translated_text
+                estimated += _FIELD_OVERHEAD + len(translated_text)
                 
-                # If we hit a new source, save the previous group
-                if current_source is not None and source != current_source:
-                    if current_group:
-                        current_group['corpus_type'] = corpus_type
-                        grouped_data[current_source] = current_group
-                    current_group = {}
-                
-                # Initialize group for new source
-                if source != current_source:
-                    current_source = source
-                    current_group = {
-                        'source': source,
-                        'translation_bureau': row['target'],
-                        'source_lang': row['source_lang'],
-                        'other_lang': row['other_lang']
-                    }
-                
-                # Add translator data
-                translator_name = row['translator_name']
-                current_group[translator_name] = row['translated_text']
-            
-            # Don't forget the last group
-            if current_group:
-                current_group['corpus_type'] = corpus_type
-                grouped_data[current_source] = current_group
+                if estimated > memory_budget:
+                    runs.append(_spill_run(index, spill_dir, first_seen))
+                    index = OrderedDict()
+                    first_seen = {}
+                    estimated = 0
+        
+        if not runs:
+            for group in index.values():
+                group['corpus_type'] = corpus_type
+                yield group
+            return
         
-        return grouped_data
+        if index:
+            runs.append(_spill_run(index, spill_dir, first_seen))
+        index = first_seen = None
+        
+        # Partial groups for one source arrive in the order they were first seen
+        runs = _merge_runs(runs, spill_dir)
+        merged = heapq.merge(*(_read_run(run_path) for run_path in runs), key=_run_key)
+        current_source = None
+        current_group = None
+        for source, _, partial_group in merged:
+            if source != current_source:
+                if current_group is not None:
+                    current_group['corpus_type'] = corpus_type
+                    yield current_group
+                current_source = source
+                current_group = partial_group
+            else:
+                for key, value in partial_group.items():
+                    if key not in METADATA_COLUMNS:
+                        current_group[key] = value
+        if current_group is not None:
+            current_group['corpus_type'] = corpus_type
+            yield current_group
+
+
+def iter_grouped_rows(file_path, corpus_type, grouping='contiguous', memory_budget=DEFAULT_MEMORY_BUDGET):
+    """Yield grouped rows using the requested grouping mode."""
+    if grouping == 'contiguous':
+        return iter_source_groups(file_path, corpus_type)
+    if grouping == 'any':
+        return iter_unordered_source_groups(file_path, corpus_type, memory_budget)
+    raise ValueError(f"Unknown grouping mode: {grouping}")
+
+
+def process_csv_file(file_path, corpus_type, grouping='contiguous', memory_budget=DEFAULT_MEMORY_BUDGET):
+    """Process a single CSV file and group by source text."""
+    grouped_data = OrderedDict()
+    repeated = 0
     
-    # Find CSV files in folder matching the pattern
-    csv_files = []
-    pattern = re.compile(r'(.+?)_translation_comparison_(.+?)\.csv')
+    for group in iter_grouped_rows(file_path, corpus_type, grouping, memory_budget):
+        if group['source'] in grouped_data:
+            repeated += 1
+        grouped_data[group['source']] = group
+    
+    if repeated:
+        print(f"Warning: {repeated} source(s) in {os.path.basename(file_path)} are not contiguous "
+              f"and were overwritten by a later partial group; use grouping='any' (--grouping any)")
     
-    for filename in os.listdir(folder_path):
-        match = pattern.match(filename)
+    return grouped_data
+
+
+def find_translator_names(file_path):
+    """Collect translator names from a CSV file without grouping its rows."""
+    translator_names = set()
+    
+    with open(file_path, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            translator_names.add(row['translator_name'])
+    
+    return translator_names
+
+
+def group_file_values(csv_file, grouping='contiguous', memory_budget=DEFAULT_MEMORY_BUDGET):
+    """Group one (file_path, corpus_type) pair and return its rows; runs in worker processes."""
+    file_path, corpus_type = csv_file
+    return list(process_csv_file(file_path, corpus_type, grouping, memory_budget).values())
+
+
+def find_csv_files(inputs):
+    """
+    Return (file_path, corpus_type) pairs for the comparison CSVs to merge.
+    
+    Inputs may be folders (searched for matching files) or individual CSV paths.
+    Results are sorted by filename and corpus_type so the merged output does not
+    depend on directory listing order.
+    """
+    if isinstance(inputs, (str, os.PathLike)):
+        inputs = [inputs]
+    
+    candidates = []
+    for path in inputs:
+        if os.path.isdir(path):
+            candidates.extend(os.path.join(path, filename) for filename in os.listdir(path))
+        elif os.path.isfile(path):
+            candidates.append(path)
+        else:
+            raise FileNotFoundError(path)
+    
+    csv_files = []
+    for file_path in candidates:
+        match = FILENAME_PATTERN.match(os.path.basename(file_path))
         if match:
             corpus_type = match.group(2)
-            file_path = os.path.join(folder_path, filename)
             csv_files.append((file_path, corpus_type))
     
+    csv_files.sort(key=lambda item: (os.path.basename(item[0]), item[1], item[0]))
+    return csv_files
+
+
+def map_files(func, items, workers):
+    """Map func over items in order, using a process pool when workers > 1."""
+    if workers <= 1 or len(items) <= 1:
+        return map(func, items)
+    executor = ProcessPoolExecutor(max_workers=min(workers, len(items)))
+    
+    def results():
+        with executor:
+            yield from executor.map(func, items)
+    
+    return results()
+
+
+def build_output_row(data, columns):
+    """Ensure all columns exist in the row."""
+    return {col: data.get(col, '') for col in columns}
+
+
+def merge_csv_folder(folder_path, output_path, streaming=False, workers=1, incremental=False, manifest_path=None,
+                     grouping='contiguous', memory_budget=DEFAULT_MEMORY_BUDGET, sqlite_path=None):
+    """
+    Merge CSV files from a folder containing translation data.
+    
+    Args:
+        folder_path: Path to folder containing CSV files, or a list of folders
+            and CSV files
+        output_path: Path for output merged CSV file
+        streaming: Write each grouped source as soon as it is complete instead of
+            holding every group in memory. A cheap first pass collects the
+            translator columns. With contiguous grouping, a source that
+            reappears later in a file is written as a second row rather than
+            replacing the first.
+        workers: Number of processes used to parse and group corpus files
+            (0 means one per CPU). Output is identical to a serial run.
+        incremental: Keep a manifest of input fingerprints and a cache of each
+            file's grouped rows next to the output, and only reparse inputs whose
+            size, mtime and content hash changed since the last merge.
+        manifest_path: Manifest location for incremental merges
+            (default: output_path + '.manifest.json')
+        grouping: 'contiguous' assumes all rows for a source are adjacent (the
+            fast path); 'any' groups rows in any order, see
+            iter_unordered_source_groups
+        memory_budget: Bytes of grouped rows held per file in 'any' mode before
+            spilling sorted runs to temporary files
+        sqlite_path: Also write an indexed SQLite store of the merged data that
+            the survey app opens directly instead of parsing the CSV
+    """
+    if grouping not in GROUPING_MODES:
+        raise ValueError(f"Unknown grouping mode: {grouping}")
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    
+    # Find CSV files in folder matching the pattern
+    csv_files = find_csv_files(folder_path)
+    
     if not csv_files:
         raise ValueError(f"No CSV files matching pattern found in {folder_path}")
     
@@ -80,18 +322,43 @@ def merge_csv_folder(folder_path, output_path):
     for file_path, corpus_type in csv_files:
         print(f"  {os.path.basename(file_path)} -> corpus_type: {corpus_type}")
     
-    # Process all files
+    grouping_options = {'grouping': grouping, 'memory_budget': memory_budget}
+    if incremental:
+        _merge_incremental(csv_files, output_path, manifest_path or output_path + '.manifest.json', streaming, workers,
+                           grouping_options)
+    elif streaming:
+        _merge_streaming(csv_files, output_path, workers, grouping_options)
+    else:
+        _merge_in_memory(csv_files, output_path, workers, grouping_options)
+    
+    if sqlite_path:
+        current = os.path.exists(sqlite_path) and os.path.getmtime(sqlite_path) >= os.path.getmtime(output_path)
+        if current and store_format_version(sqlite_path) == STORE_FORMAT_VERSION:
+            print(f"{sqlite_path} is up to date.")
+        else:
+            if current:
+                print(f"{sqlite_path} was written in an older format.")
+            print(f"Writing indexed store to {sqlite_path}...")
+            build_sqlite_store(output_path, sqlite_path)
+
+
+def _merge_in_memory(csv_files, output_path, workers=1, grouping_options=None):
+    """Group every file in memory, then write the merged CSV."""
+    # Process all files; results come back in csv_files order
     all_data = []
-    for file_path, corpus_type in csv_files:
-        print(f"Processing {os.path.basename(file_path)}...")
-        file_data = process_csv_file(file_path, corpus_type)
-        all_data.extend(file_data.values())
+    if workers > 1:
+        print(f"Processing {len(csv_files)} files with {min(workers, len(csv_files))} workers...")
+    group_file = partial(group_file_values, **(grouping_options or {}))
+    for (file_path, _), file_data in zip(csv_files, map_files(group_file, csv_files, workers)):
+        if workers <= 1:
+            print(f"Processing {os.path.basename(file_path)}...")
+        all_data.extend(file_data)
     
     # Get all unique translator names to create consistent column headers
     all_translators = set()
     for data in all_data:
         for key in data.keys():
-            if key not in ['source', 'translation_bureau', 'source_lang', 'other_lang', 'corpus_type']:
+            if key not in METADATA_COLUMNS:
                 all_translators.add(key)
     
     translator_columns = sorted(list(all_translators))
@@ -106,31 +373,253 @@ def merge_csv_folder(folder_path, output_path):
         writer.writeheader()
         
         for data in all_data:
-            # Ensure all columns exist in the row
-            row = {}
-            for col in columns:
-                row[col] = data.get(col, '')
-            writer.writerow(row)
+            writer.writerow(build_output_row(data, columns))
     
-    print(f"Merge complete! Output contains {len(all_data)} rows.")
     corpus_counts = {}
     for data in all_data:
         corpus_type = data.get('corpus_type', 'unknown')
         corpus_counts[corpus_type] = corpus_counts.get(corpus_type, 0) + 1
     
+    _print_summary(len(all_data), corpus_counts, translator_columns)
+
+
+def _merge_streaming(csv_files, output_path, workers=1, grouping_options=None):
+    """Write grouped sources one at a time, keeping only one group in memory."""
+    # First pass: only collect translator names (in parallel when workers > 1)
+    all_translators = set()
+    file_paths = [file_path for file_path, _ in csv_files]
+    print(f"Scanning {len(file_paths)} files for translator names...")
+    for translator_names in map_files(find_translator_names, file_paths, workers):
+        all_translators.update(translator_names)
+    
+    translator_columns = sorted(name for name in all_translators if name not in METADATA_COLUMNS)
+    columns = ['source', 'source_lang', 'translation_bureau'] + translator_columns + ['corpus_type']
+    
+    # Second pass: group and write as rows go by
+    print(f"Writing merged data to {output_path}...")
+    total_rows = 0
+    corpus_counts = {}
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        
+        for file_path, corpus_type in csv_files:
+            print(f"Processing {os.path.basename(file_path)}...")
+            for data in iter_grouped_rows(file_path, corpus_type, **(grouping_options or {})):
+                writer.writerow(build_output_row(data, columns))
+                total_rows += 1
+                corpus_counts[corpus_type] = corpus_counts.get(corpus_type, 0) + 1
+    
+    _print_summary(total_rows, corpus_counts, translator_columns)
+
+
+def file_sha256(file_path):
+    """Hash a file's contents in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_file_groups(job):
+    """
+    Group one input file into a JSON-lines cache; runs in worker processes.
+    
+    Returns the translator names and row count recorded in the manifest.
+    """
+    file_path, corpus_type, cache_path, streaming, grouping_options = job
+    if streaming:
+        groups = iter_grouped_rows(file_path, corpus_type, **grouping_options)
+    else:
+        groups = process_csv_file(file_path, corpus_type, **grouping_options).values()
+    
+    translators = set()
+    rows = 0
+    with open(cache_path + '.tmp', 'w', encoding='utf-8') as f:
+        for data in groups:
+            translators.update(key for key in data if key not in METADATA_COLUMNS)
+            f.write(json.dumps(data, ensure_ascii=False))
+            f.write('\n')
+            rows += 1
+    os.replace(cache_path + '.tmp', cache_path)
+    return sorted(translators), rows
+
+
+def render_cached_groups(cache_path, fragment_path, columns):
+    """Render a file's cached groups as CSV rows (no header) for the given columns."""
+    with open(cache_path, 'r', encoding='utf-8') as src, \
+            open(fragment_path + '.tmp', 'w', newline='', encoding='utf-8') as dst:
+        writer = csv.DictWriter(dst, fieldnames=columns)
+        for line in src:
+            writer.writerow(build_output_row(json.loads(line), columns))
+    os.replace(fragment_path + '.tmp', fragment_path)
+
+
+def load_manifest(manifest_path):
+    """Load a merge manifest, or return an empty one if it is missing or stale."""
+    empty = {'version': MANIFEST_VERSION, 'streaming': None, 'grouping': None, 'columns': None, 'output': None, 'files': {}}
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return empty
+    if manifest.get('version') != MANIFEST_VERSION:
+        return empty
+    return manifest
+
+
+def _stat_fingerprint(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _merge_incremental(csv_files, output_path, manifest_path, streaming=False, workers=1, grouping_options=None):
+    """
+    Rebuild the merged CSV, reparsing only inputs that changed since the last run.
+    
+    Each input's grouped rows are cached as JSON lines, and as a CSV fragment
+    rendered for the current column set. Unchanged files are copied from their
+    fragment; fragments are re-rendered from the cache when a new translator
+    column widens the header.
+    """
+    cache_dir = output_path + '.cache'
+    os.makedirs(cache_dir, exist_ok=True)
+    
+    grouping_options = grouping_options or {'grouping': 'contiguous'}
+    manifest = load_manifest(manifest_path)
+    if manifest['streaming'] != streaming or manifest.get('grouping') != grouping_options['grouping']:
+        # Cached groups depend on the grouping mode
+        manifest['files'] = {}
+    old_files = manifest['files']
+    
+    # Fingerprint inputs: stat first, hash only when size or mtime moved
+    new_files = OrderedDict()
+    jobs = []
+    for file_path, corpus_type in csv_files:
+        key = os.path.abspath(file_path)
+        entry = dict(_stat_fingerprint(file_path), corpus_type=corpus_type)
+        old = old_files.get(key)
+        if old and old['corpus_type'] == corpus_type and os.path.exists(os.path.join(cache_dir, old['cache'])):
+            if old['size'] == entry['size'] and old['mtime_ns'] == entry['mtime_ns']:
+                new_files[key] = old
+                continue
+            entry['sha256'] = file_sha256(file_path)
+            if entry['sha256'] == old['sha256']:
+                new_files[key] = dict(old, mtime_ns=entry['mtime_ns'])
+                continue
+        else:
+            entry['sha256'] = file_sha256(file_path)
+        
+        entry['cache'] = hashlib.sha256(f"{entry['sha256']}:{corpus_type}".encode('utf-8')).hexdigest()[:32] + '.jsonl'
+        new_files[key] = entry
+        jobs.append((key, (file_path, corpus_type, os.path.join(cache_dir, entry['cache']), streaming, grouping_options)))
+    
+    # Reparse changed files only
+    if jobs:
+        print(f"Reparsing {len(jobs)} changed file(s)...")
+        for (key, job), (translators, rows) in zip(jobs, map_files(cache_file_groups, [job for _, job in jobs], workers)):
+            new_files[key]['translators'] = translators
+            new_files[key]['rows'] = rows
+    
+    all_translators = set()
+    for entry in new_files.values():
+        all_translators.update(entry['translators'])
+    translator_columns = sorted(all_translators)
+    columns = ['source', 'source_lang', 'translation_bureau'] + translator_columns + ['corpus_type']
+    
+    output_unchanged = (
+        manifest['output'] is not None
+        and os.path.exists(output_path)
+        and _stat_fingerprint(output_path) == manifest['output']
+    )
+    if not jobs and list(new_files) == list(old_files) and columns == manifest['columns'] and output_unchanged:
+        print(f"{output_path} is up to date.")
+    else:
+        columns_changed = columns != manifest['columns']
+        print(f"Writing merged data to {output_path}...")
+        with open(output_path + '.tmp', 'w', newline='', encoding='utf-8') as f:
+            csv.DictWriter(f, fieldnames=columns).writeheader()
+            for key, entry in new_files.items():
+                cache_path = os.path.join(cache_dir, entry['cache'])
+                fragment_path = cache_path[:-len('.jsonl')] + '.csv'
+                if columns_changed or not os.path.exists(fragment_path):
+                    render_cached_groups(cache_path, fragment_path, columns)
+                with open(fragment_path, 'r', newline='', encoding='utf-8') as fragment:
+                    shutil.copyfileobj(fragment, f)
+        os.replace(output_path + '.tmp', output_path)
+        
+        # Drop cache entries no input refers to any more
+        live = set()
+        for entry in new_files.values():
+            live.add(entry['cache'])
+            live.add(entry['cache'][:-len('.jsonl')] + '.csv')
+        for name in os.listdir(cache_dir):
+            if name not in live:
+                os.remove(os.path.join(cache_dir, name))
+    
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'streaming': streaming,
+        'grouping': grouping_options['grouping'],
+        'columns': columns,
+        'output': _stat_fingerprint(output_path),
+        'files': new_files,
+    }
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    
+    corpus_counts = {}
+    for entry in new_files.values():
+        corpus_counts[entry['corpus_type']] = corpus_counts.get(entry['corpus_type'], 0) + entry['rows']
+    _print_summary(sum(corpus_counts.values()), corpus_counts, translator_columns)
+
+
+def _print_summary(total_rows, corpus_counts, translator_columns):
+    print(f"Merge complete! Output contains {total_rows} rows.")
     for corpus_type, count in corpus_counts.items():
         print(f"{corpus_type} rows: {count}")
     print(f"Translator columns: {translator_columns}")
 
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Merge *_translation_comparison_<corpus>.csv files into one row per source text.")
+    parser.add_argument('inputs', nargs='*', default=["translation_results/"],
+                        help="Folders and/or CSV files to merge (default: translation_results/)")
+    parser.add_argument('-o', '--output', default="dist/merged_translation_data.csv",
+                        help="Merged CSV to write (default: dist/merged_translation_data.csv)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processes used to parse corpus files; 0 uses every CPU (default: 1)")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Write groups as they are parsed instead of holding all rows in memory")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only reparse inputs that changed since the last merge, using a manifest next to the output")
+    parser.add_argument('--manifest', default=None,
+                        help="Manifest path for --incremental (default: <output>.manifest.json)")
+    parser.add_argument('--grouping', choices=GROUPING_MODES, default='contiguous',
+                        help="'any' groups rows for a source wherever they appear in a file (default: contiguous)")
+    parser.add_argument('--memory-budget', type=int, default=DEFAULT_MEMORY_BUDGET // (1024 * 1024),
+                        help="MB of grouped rows held per file with --grouping any before spilling to disk (default: 256)")
+    parser.add_argument('--sqlite', nargs='?', const='', default=None, metavar='PATH',
+                        help="Also write an indexed SQLite store for the survey app "
+                             "(default path: output with a .sqlite extension)")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    folder_path = "translation_results/"
-    output = "dist/merged_translation_data.csv"
+    args = parse_args()
+    sqlite_path = args.sqlite
+    if sqlite_path == '':
+        sqlite_path = os.path.splitext(args.output)[0] + '.sqlite'
     
     try:
-        merge_csv_folder(folder_path, output)
+        merge_csv_folder(args.inputs, args.output, streaming=args.streaming, workers=args.workers,
+                         incremental=args.incremental, manifest_path=args.manifest,
+                         grouping=args.grouping, memory_budget=args.memory_budget * 1024 * 1024,
+                         sqlite_path=sqlite_path)
     except FileNotFoundError as e:
-        print(f"Error: Could not find folder - {e}")
+        print(f"Error: Could not find input - {e}")
         sys.exit(1)
     except Exception as e:
         print(f"Error: {e}")
@@ -0,0 +1,136 @@
+"""
+Adaptive pair selection for the Comparison tab.
+
+PairScheduler keeps an online Bradley-Terry estimate of every translation
+column's strength as a Gaussian (mean, variance), updated after each
+judgment with a one-step Laplace approximation. The next pair is the one
+whose outcome is expected to shrink the uncertainty of the strength
+difference the most, so pairs whose outcome is already clear (a strong
+model against a weak base model) score close to zero. All candidate pairs
+are scored at once with NumPy.
+
+NumPy is optional: without it the app only offers random pairs.
+"""
+
+import math
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Prior variance of each column's strength (logit scale)
+PRIOR_VARIANCE = 1.0
+
+# Upcoming items considered when choosing the next item and pair
+SELECTION_WINDOW = 16
+
+
+def available() -> bool:
+    return np is not None
+
+
+class PairScheduler:
+    """Online Bradley-Terry model over translation columns with information-based pair choice."""
+    
+    def __init__(self, columns: Sequence[str], state: Optional[dict] = None):
+        if np is None:
+            raise ImportError("numpy is required for adaptive pair selection")
+        self.columns = list(columns)
+        self.column_index = {col: i for i, col in enumerate(self.columns)}
+        self.mean = np.zeros(len(self.columns))
+        self.variance = np.full(len(self.columns), PRIOR_VARIANCE)
+        self.judgments = 0
+        if state:
+            self.restore(state)
+    
+    def restore(self, state: dict):
+        """Load a saved state, matching columns by name (new columns start at the prior)."""
+        try:
+            for col, mean, variance in zip(state['columns'], state['mean'], state['variance']):
+                i = self.column_index.get(col)
+                if i is not None and variance > 0:
+                    self.mean[i] = mean
+                    self.variance[i] = variance
+            self.judgments = int(state.get('judgments', 0))
+        except (KeyError, TypeError, ValueError):
+            pass  # Unusable state; keep the prior
+    
+    def state(self) -> dict:
+        return {
+            'columns': self.columns,
+            'mean': self.mean.tolist(),
+            'variance': self.variance.tolist(),
+            'judgments': self.judgments,
+        }
+    
+    def update(self, winner: str, loser: str):
+        """Record that winner was judged better than loser."""
+        self.update_groups([winner], [loser])
+    
+    def update_groups(self, winners: Sequence[str], losers: Sequence[str]):
+        """
+        Record one judgment of a text several columns produced (winners) over
+        another (losers). Each of the winner x loser pairs carries 1/(k*m) of
+        the judgment, so it weighs as much as a judgment between two columns.
+        """
+        pairs = [(self.column_index.get(winner), self.column_index.get(loser)) for winner in winners for loser in losers]
+        pairs = [(i, j) for i, j in pairs if i is not None and j is not None and i != j]
+        if not pairs:
+            return
+        
+        weight = 1.0 / len(pairs)
+        for i, j in pairs:
+            # Gradient and curvature of the (weighted) log-likelihood in the strength difference
+            p = 1.0 / (1.0 + math.exp(self.mean[j] - self.mean[i]))
+            gradient = weight * (1.0 - p)
+            curvature = weight * p * (1.0 - p)
+            for k, sign in ((i, 1.0), (j, -1.0)):
+                variance = 1.0 / (1.0 / self.variance[k] + curvature)
+                self.mean[k] += sign * variance * gradient
+                self.variance[k] = variance
+        self.judgments += 1
+    
+    def pair_scores(self):
+        """
+        Expected information gain for every ordered pair of columns.
+        
+        The score is the expected reduction in the variance of the strength
+        difference after one judgment; the diagonal is -inf.
+        """
+        difference = self.mean[:, None] - self.mean[None, :]
+        spread = self.variance[:, None] + self.variance[None, :]
+        # Win probability averaged over the current uncertainty (probit approximation)
+        p = 1.0 / (1.0 + np.exp(-difference / np.sqrt(1.0 + math.pi * spread / 8.0)))
+        fisher = p * (1.0 - p)
+        scores = spread * spread * fisher / (1.0 + spread * fisher)
+        np.fill_diagonal(scores, -np.inf)
+        return scores
+    
+    def choose(self, candidates: List[Sequence[str]]) -> Tuple[Optional[int], Optional[Tuple[str, str]]]:
+        """
+        Pick the candidate item and pair of its columns with the highest score.
+        
+        candidates holds the available translation columns of each upcoming
+        item; ties go to the earliest item. Returns (None, None) if no item
+        has two known columns.
+        """
+        scores = self.pair_scores()
+        best_score = -np.inf
+        best = (None, None)
+        for n, columns in enumerate(candidates):
+            indices = np.fromiter((self.column_index[col] for col in columns if col in self.column_index), dtype=np.intp)
+            if len(indices) < 2:
+                continue
+            sub_scores = scores[np.ix_(indices, indices)]
+            a, b = divmod(int(np.argmax(sub_scores)), len(indices))
+            if sub_scores[a, b] > best_score:
+                best_score = sub_scores[a, b]
+                best = (n, (self.columns[indices[a]], self.columns[indices[b]]))
+        return best
+    
+    def ranking(self) -> List[Tuple[str, float, float]]:
+        """(column, strength, standard deviation), strongest first."""
+        order = np.argsort(-self.mean, kind='stable')
+        return [(self.columns[i], float(self.mean[i]), float(math.sqrt(self.variance[i]))) for i in order]
@@ -0,0 +1,273 @@
+"""
+Crash-safe, buffered writer for translation_quality_results.csv.
+
+Saving a judgment used to open, append to and close the results CSV on the UI
+thread, which stalls on network-mounted drives. ResultWriter instead appends
+each row to a small write-ahead journal on local disk and returns at once; a
+background thread group-commits queued rows to the results CSV and records a
+checkpoint in the journal. Rows that were journaled but not committed when the
+app was killed are appended to the CSV the next time a writer is opened; if
+the CSV cannot be written then, they stay journaled and the background thread
+retries them along with the new rows.
+
+A crash between a CSV write and its checkpoint can replay that batch once more
+on recovery; the results file already allows duplicate rows.
+
+The same thread also writes small local state files handed to save_later
+(the session file), so moving to the next question does no file I/O beyond
+the journal append.
+"""
+
+import csv
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import zlib
+from typing import Callable, Dict, List, Optional
+
+RESULTS_PATH = 'translation_quality_results.csv'
+
+# fsync policies:
+#   'always' - fsync the journal on every save and the CSV after every batch
+#   'batch'  - flush the journal on every save (survives an app crash or kill)
+#              and fsync the CSV after every batch
+#   'never'  - flush only; leave durability to the OS
+FSYNC_POLICIES = ('always', 'batch', 'never')
+
+# Truncate the journal once everything in it is committed and it is this large
+JOURNAL_COMPACT_BYTES = 256 * 1024
+
+# Queued to wake the background thread for a save_later call
+_SAVE = object()
+
+
+def local_state_path(results_path: str, suffix: str) -> str:
+    """Per-results-file path on local disk (SURVEY_JOURNAL_DIR or the user's app state folder)."""
+    base = os.environ.get('SURVEY_JOURNAL_DIR')
+    if not base:
+        if sys.platform == 'win32':
+            base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+        else:
+            base = os.environ.get('XDG_STATE_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'state')
+        base = os.path.join(base, 'TranslationSurvey')
+    absolute = os.path.abspath(results_path)
+    key = format(zlib.crc32(absolute.encode('utf-8')), '08x')
+    return os.path.join(base, f"{os.path.basename(absolute)}.{key}.{suffix}")
+
+
+def default_journal_path(results_path: str) -> str:
+    """Journal location on local disk, keyed by the results file's absolute path."""
+    return local_state_path(results_path, 'journal')
+
+
+def append_rows(path: str, fieldnames: List[str], rows: List[Dict[str, str]], fsync: bool = False):
+    """Append rows to a CSV in one open, writing the header if the file is new or empty."""
+    write_header = not os.path.isfile(path) or os.path.getsize(path) == 0
+    with open(path, 'a', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        if write_header:
+            writer.writeheader()
+        writer.writerows(rows)
+        if fsync:
+            csvfile.flush()
+            os.fsync(csvfile.fileno())
+
+
+def append_records(path: str, records: List[dict], fsync: bool = False):
+    """Append journal records to a CSV, one open per run of records sharing fieldnames."""
+    start = 0
+    for end in range(1, len(records) + 1):
+        if end == len(records) or records[end]['fieldnames'] != records[start]['fieldnames']:
+            append_rows(path, records[start]['fieldnames'], [r['row'] for r in records[start:end]], fsync=fsync)
+            start = end
+
+
+class ResultWriter:
+    """Queue-fed background writer for result rows with a write-ahead journal."""
+    
+    def __init__(self, path: str = RESULTS_PATH, journal_path: Optional[str] = None, fsync: str = 'batch',
+                 batch_size: int = 64, flush_interval: float = 0.5):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        self.path = path
+        self.journal_path = journal_path or default_journal_path(path)
+        self.fsync = fsync
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.last_error = None
+        self.deferred = []  # Journaled rows from a previous run the CSV could not take at startup
+        self.start_size = None  # Size of the CSV before this run's first commit, once there is one
+        
+        os.makedirs(os.path.dirname(os.path.abspath(self.journal_path)), exist_ok=True)
+        self.recovered = self.recover()
+        
+        self._lock = threading.Lock()
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        self._seq = len(self.deferred)
+        self._committed = 0
+        self._queue = queue.Queue()
+        self._save = None  # Latest save_later callable not yet run
+        for record in self.deferred:
+            self._queue.put(record)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='ResultWriter', daemon=True)
+        self._thread.start()
+    
+    def recover(self) -> int:
+        """
+        Commit rows left in the journal by a previous run; return how many were replayed.
+        
+        If the results CSV cannot be written (a locked file, an unreachable
+        share), the rows are rewritten to a fresh journal as seq 1..n and kept
+        in self.deferred for the background thread to retry.
+        """
+        if not os.path.exists(self.journal_path):
+            return 0
+        
+        pending = []
+        committed = 0
+        with open(self.journal_path, 'r', encoding='utf-8') as journal:
+            for line in journal:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break  # Torn final write from a crash
+                if 'committed' in record:
+                    committed = record['committed']
+                else:
+                    pending.append(record)
+        
+        pending = [record for record in pending if record['seq'] > committed]
+        try:
+            append_records(self.path, pending, fsync=self.fsync != 'never')
+        except OSError as e:
+            self.last_error = e
+            self.deferred = [dict(record, seq=seq) for seq, record in enumerate(pending, 1)]
+            with open(self.journal_path + '.tmp', 'w', encoding='utf-8') as journal:
+                for record in self.deferred:
+                    journal.write(json.dumps(record, ensure_ascii=False) + '\n')
+                journal.flush()
+                os.fsync(journal.fileno())
+            os.replace(self.journal_path + '.tmp', self.journal_path)
+            return 0
+        os.remove(self.journal_path)
+        return len(pending)
+    
+    def submit(self, fieldnames: List[str], row: Dict[str, str]):
+        """Journal a row and queue it for the background thread; returns once it is journaled."""
+        if self._closed:
+            raise RuntimeError("ResultWriter is closed")
+        with self._lock:
+            self._seq += 1
+            record = {'seq': self._seq, 'fieldnames': list(fieldnames), 'row': row}
+            self._journal.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._journal.flush()
+            if self.fsync == 'always':
+                os.fsync(self._journal.fileno())
+            self._queue.put(record)
+    
+    def save_later(self, save: Callable[[], object]):
+        """Run save on the background thread; if several are queued before it gets to them, only the latest runs."""
+        with self._lock:
+            self._save = save
+        if self._closed:
+            self._run_save()
+        else:
+            self._queue.put(_SAVE)
+    
+    def _run_save(self):
+        with self._lock:
+            save, self._save = self._save, None
+        if save is not None:
+            save()
+    
+    def _run(self):
+        batch = []
+        stopping = False
+        while not (stopping and not batch):
+            try:
+                timeout = self.flush_interval if batch else None
+                item = self._queue.get(timeout=timeout)
+                if item is None:
+                    stopping = True
+                elif item is _SAVE:
+                    self._run_save()
+                    continue
+                else:
+                    batch.append(item)
+                    if len(batch) < self.batch_size:
+                        continue
+            except queue.Empty:
+                pass
+            
+            # Drain whatever else is already queued into the same commit
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                elif item is _SAVE:
+                    self._run_save()
+                else:
+                    batch.append(item)
+            
+            if batch and self._commit(batch):
+                batch = []
+            elif batch and stopping:
+                break  # Leave the rows in the journal for the next launch
+            elif batch:
+                time.sleep(self.flush_interval)
+    
+    def _commit(self, batch) -> bool:
+        try:
+            if self.start_size is None:
+                self.start_size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+            append_records(self.path, batch, fsync=self.fsync != 'never')
+        except OSError as e:
+            self.last_error = e
+            if not self._committed:
+                self.start_size = None  # Measured again before the next attempt
+            return False
+        
+        self.last_error = None
+        with self._lock:
+            if self._journal.closed:
+                return True  # close() gave up waiting; the journal is replayed next launch
+            self._committed = batch[-1]['seq']
+            self._journal.write(json.dumps({'committed': self._committed}) + '\n')
+            self._journal.flush()
+            if self._committed == self._seq and self._journal.tell() > JOURNAL_COMPACT_BYTES:
+                self._journal.truncate(0)
+                self._journal.seek(0)
+        return True
+    
+    def pending(self) -> int:
+        """Rows journaled but not yet committed to the CSV."""
+        with self._lock:
+            return self._seq - self._committed
+    
+    def close(self, timeout: Optional[float] = 10.0) -> bool:
+        """
+        Drain the queue and stop the background thread.
+        
+        Returns True if every row reached the results CSV; otherwise the rest
+        stay in the journal and are recovered on the next launch.
+        """
+        if self._closed:
+            return self.pending() == 0
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._run_save()
+        
+        with self._lock:
+            done = self._committed == self._seq and not self._thread.is_alive()
+            self._journal.close()
+            if done:
+                os.remove(self.journal_path)
+        return done
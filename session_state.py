@@ -0,0 +1,106 @@
+"""
+Resumable survey sessions.
+
+The session file is a few hundred bytes of JSON kept next to the result
+journal. It holds the session's random seed plus each tab's filters and
+position. Question order is a seeded shuffle of the filtered row ids, so the
+next launch rebuilds the same order in O(n) and resumes at the saved position
+without reading the results CSV. Items that adaptive pair selection moved are
+saved as (position, row id) for the positions not yet reached, so the file
+stays small however long the session runs.
+"""
+
+import json
+import os
+import random
+from typing import Optional
+
+from results_writer import local_state_path
+
+SESSION_VERSION = 1
+
+# Tabs with their own filters and position
+SESSION_TABS = ('ranking', 'comparison')
+
+
+def default_session_path(results_path: str) -> str:
+    """Session file location, alongside the journal for the same results file."""
+    return local_state_path(results_path, 'session.json')
+
+
+def new_seed() -> int:
+    return random.SystemRandom().getrandbits(32)
+
+
+def shuffled_order(row_ids, seed: int, tab: str, language_filter: str, corpus_filter: str):
+    """Shuffle row_ids in place into the question order for a tab and its filters, and return it."""
+    random.Random(f"{seed}:{tab}:{language_filter}:{corpus_filter}").shuffle(row_ids)
+    return row_ids
+
+
+def swap_positions(order, moved: dict, a: int, b: int):
+    """Swap two positions of a question order, noting both in moved (position -> row id)."""
+    order[a], order[b] = order[b], order[a]
+    moved[a] = order[a]
+    moved[b] = order[b]
+
+
+def pending_moves(moved: dict, position: int) -> list:
+    """Forget moves before position (already answered) and return the rest as [position, row id] pairs."""
+    for passed in [p for p in moved if p < position]:
+        del moved[passed]
+    return sorted([p, row_id] for p, row_id in moved.items())
+
+
+def replay_moves(order, moves, moved: dict):
+    """
+    Put saved [position, row id] moves back into a rebuilt order, keeping it a
+    permutation: each row id is swapped in from wherever the order has it.
+    """
+    moves = [move for move in moves if isinstance(move, list) and len(move) == 2
+             and all(isinstance(value, int) for value in move) and 0 <= move[0] < len(order)]
+    wanted = {row_id for _, row_id in moves}
+    where = {row_id: i for i, row_id in enumerate(order) if row_id in wanted}
+    for position, row_id in moves:
+        source = where.get(row_id)
+        if source is None:
+            continue
+        displaced = order[position]
+        swap_positions(order, moved, position, source)
+        where[row_id], where[displaced] = position, source
+
+
+def load_session(path: str, dataset_rows: int) -> Optional[dict]:
+    """
+    Read a saved session, or None if there is none or it cannot be used.
+    
+    A session saved against a dataset with a different number of rows is
+    discarded, since its row ids and order no longer match.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable session file {path}: {e}")
+        return None
+    
+    if (not isinstance(state, dict) or state.get('version') != SESSION_VERSION
+            or state.get('dataset_rows') != dataset_rows or not isinstance(state.get('seed'), int)):
+        return None
+    return state
+
+
+def save_session(path: str, state: dict) -> bool:
+    """Atomically replace the session file; returns False (and keeps the old file) on error."""
+    tmp_path = path + '.tmp'
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(dict(state, version=SESSION_VERSION), f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Could not save session state to {path}: {e}")
+        return False
+    return True
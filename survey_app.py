@@ -1,32 +1,304 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-import pandas as pd
-import csv
-import random
+from tkinter import ttk, messagebox, filedialog
+import tkinter.font as tkfont
+import argparse
+import functools
 import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
 from typing import Dict, List, Optional
 
+from survey_data import CSV_PATH, SQLITE_PATH
+from results_writer import RESULTS_PATH
+from survey_session import LANGUAGE_FILTERS, RANKING_OPTIONS, SurveySession
+import survey_client
+import survey_metrics
+from leaderboard import Leaderboard
+
+# How often to check whether the startup leaderboard rebuild has finished
+LEADERBOARD_POLL_MS = 100
+
+# Leaderboard tab columns: (summary key, heading, width)
+LEADERBOARD_COLUMNS = [
+    ('column', "Model", 220),
+    ('ranked', "Ranked", 70),
+    ('best', "Best", 60),
+    ('good', "Good", 60),
+    ('bad', "Bad", 60),
+    ('unknown', "Unknown", 70),
+    ('good_or_best_rate', "Good or Best", 100),
+    ('wins', "Wins", 60),
+    ('losses', "Losses", 60),
+    ('win_rate', "Win Rate", 80),
+]
+
+# Translation cards laid out beyond each edge of the viewport, so short scrolls reuse them
+OVERSCAN_CARDS = 2
+
+# Estimated card height beyond its text lines (padding, rank dropdown, separator)
+# and the gap between cards; estimates are corrected once a card is shown
+CARD_CHROME_HEIGHT = 40
+CARD_SPACING = 8
+CARD_RIGHT_MARGIN = 10
+
+# Delay for folding a burst of <Configure> events into one reflow (about one frame)
+REFLOW_DELAY_MS = 16
+
+# Font role -> weight; sizes come from base_font_sizes scaled by the zoom level
+FONT_WEIGHTS = {
+    'header': 'bold',
+    'source': 'bold',
+    'translation_header': 'bold',
+    'comparison_header': 'bold',
+    'translation_text': 'normal',
+    'filter_label': 'normal',
+}
+
+class TranslationCard:
+    """One translation row with its rank dropdown; the list moves cards between rows as it scrolls"""
+    
+    def __init__(self, translation_list):
+        app = translation_list.app
+        self.translation_list = translation_list
+        self.canvas = translation_list.canvas
+        self.frame = ttk.Frame(self.canvas, padding="5")
+        self.column = None  # Translation column shown on this card
+        
+        # Header with translation number and rank dropdown on same line
+        header_frame = ttk.Frame(self.frame)
+        header_frame.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 5))
+        header_frame.columnconfigure(0, weight=1)
+        
+        self.title_label = ttk.Label(header_frame, text="", font=app.fonts['translation_header'])
+        self.title_label.grid(row=0, column=0, sticky=tk.W)
+        
+        rank_frame = ttk.Frame(header_frame)
+        rank_frame.grid(row=0, column=1, sticky=tk.E)
+        
+        ttk.Label(rank_frame, text="Rank:").grid(row=0, column=0, padx=(0, 5))
+        
+        self.var = tk.StringVar(value='')  # Explicitly set to empty
+        self.combo = ttk.Combobox(rank_frame, textvariable=self.var, values=app.ranking_options, state="readonly", width=10)
+        self.combo.grid(row=0, column=1)
+        self.combo.bind('<<ComboboxSelected>>', self.on_rank_selected)
+        
+        # Disable mousewheel on combobox to prevent accidental changes
+        self.combo.bind("<MouseWheel>", lambda event: "break")
+        
+        # Translation text as label
+        self.text_label = ttk.Label(self.frame, text="", font=app.fonts['translation_text'], wraplength=app.wrap_length, justify=tk.LEFT)
+        self.text_label.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=(0, 3))
+        
+        # Add separator line
+        separator = ttk.Separator(self.frame, orient='horizontal')
+        separator.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=(3, 0))
+        
+        self.frame.columnconfigure(0, weight=1)
+        self.window = self.canvas.create_window(0, 0, window=self.frame, anchor="nw", state='hidden')
+    
+    def show(self, index, column, translation, rank, y):
+        """Display translation number index+1 at canvas height y"""
+        self.column = column
+        self.title_label.config(text=f"Translation {index+1}")
+        self.text_label.config(text=translation, wraplength=self.translation_list.app.wrap_length)
+        self.var.set(rank)
+        self.canvas.coords(self.window, 0, y)
+        self.canvas.itemconfig(self.window, width=self.translation_list.card_width(), state='normal')
+    
+    def hide(self):
+        self.column = None
+        self.canvas.itemconfig(self.window, state='hidden')
+    
+    def on_rank_selected(self, event=None):
+        # The ranking model, not the widget, holds the rank once the card scrolls away
+        if self.column is not None:
+            self.translation_list.rankings[self.column] = self.var.get()
+
+class TranslationList:
+    """
+    Virtualized list of translation cards inside a canvas.
+    
+    Only the cards in the viewport plus OVERSCAN_CARDS on each side are laid
+    out; the pool grows to the most cards ever visible at once and is reused
+    for every question. Row heights are estimated from the shared fonts and
+    corrected from the real card size once a row has been shown; the next
+    question's estimates are made in idle time by prepare().
+    """
+    
+    def __init__(self, app, canvas, scrollbar):
+        self.app = app
+        self.canvas = canvas
+        self.scrollbar = scrollbar
+        self.translations = []  # (column, text) per row
+        self.rankings = {}  # column -> rank, shared with the survey session
+        self.heights = []
+        self.offsets = [0]  # Top of each row, plus the total height
+        self.width = 1
+        self.shown = {}  # row index -> card
+        self.free_cards = []
+        self.render_job = None
+        self.prepared = None  # (translations, row heights) estimated ahead for the next question
+        
+        canvas.configure(yscrollcommand=self.on_yscroll)
+        canvas.bind("<Configure>", self.on_canvas_configure)
+    
+    def set_item(self, translations, rankings):
+        """Show a new question's translations, scrolled to the top"""
+        self.translations = translations
+        self.rankings = rankings
+        for card in self.shown.values():
+            card.hide()
+            self.free_cards.append(card)
+        self.shown = {}
+        self.canvas.yview_moveto(0)
+        prepared, self.prepared = self.prepared, None
+        if prepared is not None and prepared[0] is translations:
+            self.heights = prepared[1]
+            self.update_offsets()
+            self.render()
+        else:
+            self.relayout()
+    
+    def prepare(self, translations):
+        """Estimate the row heights of the next question while the evaluator reads this one"""
+        self.prepared = (translations, [self.estimate_height(text) for _, text in translations])
+    
+    def estimate_height(self, text):
+        """Card height for text at the current wrap length and zoom"""
+        text_font = self.app.fonts['translation_text']
+        wrap_length = max(self.app.wrap_length, 1)
+        lines = sum(max(1, -(-text_font.measure(line) // wrap_length)) for line in text.split('\n'))
+        return (CARD_CHROME_HEIGHT + self.app.fonts['translation_header'].metrics('linespace')
+                + lines * text_font.metrics('linespace'))
+    
+    def relayout(self):
+        """Re-estimate every row after a new question, wrap length or zoom"""
+        self.prepared = None  # Estimated for the old wrap length or zoom
+        self.heights = [self.estimate_height(text) for _, text in self.translations]
+        wrap_length = self.app.wrap_length
+        for card in self.shown.values():
+            card.text_label.config(wraplength=wrap_length)
+        self.update_offsets()
+        self.render()
+    
+    def update_offsets(self):
+        self.offsets = [0, *accumulate(self.heights)]
+        total_height = self.offsets[-1]
+        self.canvas.configure(scrollregion=(0, 0, self.width, total_height))
+        for index, card in self.shown.items():
+            self.canvas.coords(card.window, 0, self.offsets[index])
+        
+        # Only show scrollbar when needed
+        if total_height > self.canvas.winfo_height():
+            self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        else:
+            self.scrollbar.grid_remove()
+    
+    def schedule_render(self):
+        if self.render_job is None:
+            self.render_job = self.canvas.after_idle(self.render)
+    
+    def render(self):
+        """Show the rows in the viewport plus overscan, recycling cards that scrolled out"""
+        self.render_job = None
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        first = max(bisect_right(self.offsets, top) - 1 - OVERSCAN_CARDS, 0)
+        last = min(bisect_left(self.offsets, bottom) + OVERSCAN_CARDS, len(self.translations))
+        
+        for index in [index for index in self.shown if not first <= index < last]:
+            card = self.shown.pop(index)
+            card.hide()
+            self.free_cards.append(card)
+        
+        new_rows = False
+        for index in range(first, last):
+            if index not in self.shown:
+                card = self.free_cards.pop() if self.free_cards else TranslationCard(self)
+                column, text = self.translations[index]
+                card.show(index, column, text, self.rankings.get(column, ''), self.offsets[index])
+                self.shown[index] = card
+                new_rows = True
+        
+        if new_rows:
+            # Geometry is computed at idle time, so measure the new cards after it
+            self.canvas.after_idle(self.measure_shown)
+    
+    def measure_shown(self):
+        """Replace estimates with the real height of the cards on screen"""
+        changed = False
+        for index, card in self.shown.items():
+            height = card.frame.winfo_reqheight() + CARD_SPACING
+            if index < len(self.heights) and height != self.heights[index]:
+                self.heights[index] = height
+                changed = True
+        if changed:
+            self.update_offsets()
+            self.schedule_render()
+    
+    def card_width(self):
+        return max(self.width - CARD_RIGHT_MARGIN, 1)
+    
+    def refresh_ranks(self):
+        for card in self.shown.values():
+            card.var.set(self.rankings.get(card.column, ''))
+    
+    def labels(self):
+        """Text labels of the cards currently laid out"""
+        return [card.text_label for card in self.shown.values()]
+    
+    def on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.schedule_render()
+    
+    def on_canvas_configure(self, event):
+        if event.width != self.width:
+            self.width = event.width
+            for card in self.shown.values():
+                self.canvas.itemconfig(card.window, width=self.card_width())
+        self.update_offsets()
+        self.schedule_render()
+
+# Set by build_exe.py --benchmark: write the time the first window is drawn to this file, then exit
+STARTUP_PROBE_ENV = 'SURVEY_STARTUP_PROBE'
+
+# Calls timed when instrumentation is on (see survey_metrics.py)
+INSTRUMENTED_METHODS = ['load_next_question', 'create_translation_widgets', 'create_comparison_widgets',
+                        'update_font_sizes', 'update_wrap_lengths']
+INSTRUMENTED_SESSION_METHODS = ['save_current_rankings', 'save_current_comparison']
+
+def reports_server_errors(handler):
+    """Show a message instead of a Tk traceback when the survey server cannot be reached"""
+    @functools.wraps(handler)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return handler(self, *args, **kwargs)
+        except survey_client.ServerError as e:
+            messagebox.showerror("Survey server", f"Could not reach the survey server: {e}\n"
+                                                  "Your saved answers are kept; try again in a moment.")
+    return wrapper
+
 class TranslationSurveyApp:
-    def __init__(self):
+    def __init__(self, metrics: Optional[survey_metrics.Metrics] = None,
+                 server: Optional[survey_client.SurveyClient] = None):
+        self.metrics = metrics
         self.root = tk.Tk()
         self.root.title("Translation Quality Survey")
         self.root.geometry("1200x800")
         
-        # Load data
-        self.data = pd.read_csv('merged_translation_data.csv')
-        self.all_data = self.data.copy()  # Keep original data
-        self.current_language_filter = "Both"  # Default filter
-        
-        # Apply initial filter and randomize question order
-        self.apply_language_filter()
-        self.current_position = 0
-        
-        # Initialize comparison mode variables
-        self.comp_current_language_filter = "Both"
-        self.comp_current_position = 0
-        self.comp_data = self.all_data.copy()
-        self.comp_question_indices = list(range(len(self.comp_data)))
-        random.shuffle(self.comp_question_indices)
+        # Filters, question order, current items and saved results live in a SurveySession
+        # (see survey_session.py); items come from a shared survey server when one is given
+        started = time.perf_counter_ns()
+        self.session = SurveySession(server=server)
+        self.session.result_listeners.append(self.count_result)
+        if self.metrics is not None:
+            self.metrics.record('data_load', started)
+            self.metrics.instrument(self, INSTRUMENTED_METHODS)
+            self.metrics.instrument(self.session, INSTRUMENTED_SESSION_METHODS, prefix='session.')
+        self.corpus_options = self.session.corpus_options
+        self.translation_columns = self.session.translation_columns
         
         # Initialize zoom level
         self.zoom_level = 1.0
@@ -34,16 +306,26 @@ class TranslationSurveyApp:
             'header': 14,
             'source': 11,
             'translation_header': 11,
+            'comparison_header': 12,
             'translation_text': 10,
             'filter_label': 12
         }
         
-        # Dynamically determine translation columns from CSV headers
-        # Exclude metadata columns to get only translation columns
-        excluded_columns = {'source', 'source_lang', 'corpus_type'}
-        self.translation_columns = [col for col in self.data.columns if col not in excluded_columns]
+        # One shared font per role: zooming reconfigures these instead of every label
+        self.fonts = {
+            role: tkfont.Font(self.root, family="Arial", size=self.base_font_sizes[role], weight=weight)
+            for role, weight in FONT_WEIGHTS.items()
+        }
+        self.wrap_length = self.get_current_wrap_length()
+        self.reflow_job = None
+        
+        self.ranking_options = RANKING_OPTIONS
         
-        self.ranking_options = ['', 'good', 'bad', 'best', 'unknown']
+        # Leaderboard, rebuilt from the results file in the background and then updated on every save
+        self.leaderboard = None
+        self.leaderboard_pending = []  # Rows saved before the rebuild finished
+        self.leaderboard_dirty = False
+        self.start_leaderboard_rebuild()
         
         self.setup_ui()
         self.load_next_question()
@@ -51,6 +333,11 @@ class TranslationSurveyApp:
         
         # Bind window resize event
         self.root.bind('<Configure>', self.on_window_resize)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        if self.metrics is not None:
+            self.metrics.snapshot('startup')
+        if os.environ.get(STARTUP_PROBE_ENV):
+            self.root.after_idle(self.finish_startup_probe, os.environ[STARTUP_PROBE_ENV])
     
     def setup_ui(self):
         # Create notebook for tabs
@@ -123,10 +410,17 @@ class TranslationSurveyApp:
         # Add tabs to notebook
         self.notebook.add(self.rank_all_frame, text="Rank All Translations")
         self.notebook.add(self.comparison_frame, text="Which is Better?")
+        self.leaderboard_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.leaderboard_frame, text="Leaderboard")
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
         
-        # Setup both tabs
+        style.configure('Treeview', background=dark_bg, fieldbackground=dark_bg, foreground=dark_fg)
+        style.configure('Treeview.Heading', background=dark_select_bg, foreground=dark_fg)
+        
+        # Setup all tabs
         self.setup_rank_all_tab()
         self.setup_comparison_tab()
+        self.setup_leaderboard_tab()
     
     def setup_rank_all_tab(self):
         # Main frame for rank all tab
@@ -144,21 +438,30 @@ class TranslationSurveyApp:
         header_frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 3))
         header_frame.columnconfigure(0, weight=1)
         
-        ttk.Label(header_frame, text="Source Text:", font=("Arial", 14, "bold")).grid(row=0, column=0, sticky=tk.W)
+        ttk.Label(header_frame, text="Source Text:", font=self.fonts['header']).grid(row=0, column=0, sticky=tk.W)
         
         filter_frame = ttk.Frame(header_frame)
         filter_frame.grid(row=0, column=1, sticky=tk.E)
         
-        ttk.Label(filter_frame, text="Source Language:", font=("Arial", 12)).grid(row=0, column=0, padx=(0, 5))
+        ttk.Label(filter_frame, text="Source Language:", font=self.fonts['filter_label']).grid(row=0, column=0, padx=(0, 5))
         
-        self.language_var = tk.StringVar(value="Both")
+        self.language_var = tk.StringVar(value=self.session.current_language_filter)
         self.language_combo = ttk.Combobox(filter_frame, textvariable=self.language_var, 
-                                          values=["Both", "English", "French"], 
+                                          values=LANGUAGE_FILTERS, 
                                           state="readonly", width=10)
         self.language_combo.grid(row=0, column=1)
-        self.language_combo.bind('<<ComboboxSelected>>', self.on_language_filter_change)
+        self.language_combo.bind('<<ComboboxSelected>>', self.on_filter_change)
+        
+        ttk.Label(filter_frame, text="Corpus:", font=self.fonts['filter_label']).grid(row=0, column=2, padx=(15, 5))
         
-        self.source_label = ttk.Label(main_frame, text="", font=("Arial", 11, "bold"), wraplength=self.get_current_wrap_length(), justify=tk.LEFT)
+        self.corpus_var = tk.StringVar(value=self.session.current_corpus_filter)
+        self.corpus_combo = ttk.Combobox(filter_frame, textvariable=self.corpus_var,
+                                        values=self.corpus_options,
+                                        state="readonly", width=14)
+        self.corpus_combo.grid(row=0, column=3)
+        self.corpus_combo.bind('<<ComboboxSelected>>', self.on_filter_change)
+        
+        self.source_label = ttk.Label(main_frame, text="", font=self.fonts['source'], wraplength=self.wrap_length, justify=tk.LEFT)
         self.source_label.grid(row=1, column=0, columnspan=2, pady=(0, 5), sticky=(tk.W, tk.E))
         
         # Separator line under source text
@@ -171,47 +474,18 @@ class TranslationSurveyApp:
         translations_frame.columnconfigure(0, weight=1)
         main_frame.rowconfigure(3, weight=1)
         
-        # Create scrollable frame for translations
+        # Virtualized list of translation cards inside a canvas
         canvas = tk.Canvas(translations_frame, highlightthickness=0, bg='#2b2b2b')
         scrollbar = ttk.Scrollbar(translations_frame, orient="vertical", command=canvas.yview)
-        self.scrollable_frame = ttk.Frame(canvas)
-        
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-        
-        canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
         canvas.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         # Only show scrollbar when needed
         self.canvas = canvas
         self.scrollbar = scrollbar
+        self.translation_list = TranslationList(self, canvas, scrollbar)
         
         translations_frame.rowconfigure(0, weight=1)
         translations_frame.columnconfigure(0, weight=1)
         
-        # Make scrollable frame expand to canvas width and manage scrollbar
-        def configure_scroll_region(event):
-            canvas.configure(scrollregion=canvas.bbox("all"))
-            canvas.itemconfig(canvas.find_all()[0], width=canvas.winfo_width())
-            
-            # Show/hide scrollbar based on content height
-            canvas.update_idletasks()
-            content_height = self.scrollable_frame.winfo_reqheight()
-            canvas_height = canvas.winfo_height()
-            
-            if content_height > canvas_height:
-                scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
-                translations_frame.columnconfigure(1, weight=0)
-            else:
-                scrollbar.grid_remove()
-                translations_frame.columnconfigure(1, weight=0)
-        
-        self.scrollable_frame.bind("<Configure>", configure_scroll_region)
-        canvas.bind("<Configure>", configure_scroll_region)
-        
         # Mouse wheel scrolling and zooming
         def _on_mousewheel(event):
             if event.state & 0x4:  # Ctrl key is pressed
@@ -250,22 +524,40 @@ class TranslationSurveyApp:
         comp_header_frame.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 3))
         comp_header_frame.columnconfigure(0, weight=1)
         
-        ttk.Label(comp_header_frame, text="Source Text:", font=("Arial", 14, "bold")).grid(row=0, column=0, sticky=tk.W)
+        ttk.Label(comp_header_frame, text="Source Text:", font=self.fonts['header']).grid(row=0, column=0, sticky=tk.W)
         
         comp_filter_frame = ttk.Frame(comp_header_frame)
         comp_filter_frame.grid(row=0, column=1, sticky=tk.E)
         
-        ttk.Label(comp_filter_frame, text="Source Language:", font=("Arial", 12)).grid(row=0, column=0, padx=(0, 5))
+        ttk.Label(comp_filter_frame, text="Source Language:", font=self.fonts['filter_label']).grid(row=0, column=0, padx=(0, 5))
         
-        self.comp_language_var = tk.StringVar(value="Both")
+        self.comp_language_var = tk.StringVar(value=self.session.comp_current_language_filter)
         self.comp_language_combo = ttk.Combobox(comp_filter_frame, textvariable=self.comp_language_var, 
-                                               values=["Both", "English", "French"], 
+                                               values=LANGUAGE_FILTERS, 
                                                state="readonly", width=10)
         self.comp_language_combo.grid(row=0, column=1)
-        self.comp_language_combo.bind('<<ComboboxSelected>>', self.on_comp_language_filter_change)
+        self.comp_language_combo.bind('<<ComboboxSelected>>', self.on_comp_filter_change)
+        
+        ttk.Label(comp_filter_frame, text="Corpus:", font=self.fonts['filter_label']).grid(row=0, column=2, padx=(15, 5))
+        
+        self.comp_corpus_var = tk.StringVar(value=self.session.comp_current_corpus_filter)
+        self.comp_corpus_combo = ttk.Combobox(comp_filter_frame, textvariable=self.comp_corpus_var,
+                                             values=self.corpus_options,
+                                             state="readonly", width=14)
+        self.comp_corpus_combo.grid(row=0, column=3)
+        self.comp_corpus_combo.bind('<<ComboboxSelected>>', self.on_comp_filter_change)
+        
+        ttk.Label(comp_filter_frame, text="Pairs:", font=self.fonts['filter_label']).grid(row=0, column=4, padx=(15, 5))
+        
+        self.comp_pair_mode_var = tk.StringVar(value=self.session.comp_pair_mode)
+        self.comp_pair_mode_combo = ttk.Combobox(comp_filter_frame, textvariable=self.comp_pair_mode_var,
+                                                values=self.session.pair_modes,
+                                                state="readonly", width=10)
+        self.comp_pair_mode_combo.grid(row=0, column=5)
+        self.comp_pair_mode_combo.bind('<<ComboboxSelected>>', self.on_pair_mode_change)
         
         # Source text
-        self.comp_source_label = ttk.Label(comp_main_frame, text="", font=("Arial", 11, "bold"), wraplength=self.get_current_wrap_length(), justify=tk.LEFT)
+        self.comp_source_label = ttk.Label(comp_main_frame, text="", font=self.fonts['source'], wraplength=self.wrap_length, justify=tk.LEFT)
         self.comp_source_label.grid(row=1, column=0, pady=(0, 5), sticky=(tk.W, tk.E))
         
         # Separator line
@@ -277,6 +569,7 @@ class TranslationSurveyApp:
         self.comp_translations_frame.grid(row=3, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         self.comp_translations_frame.columnconfigure(0, weight=1)
         comp_main_frame.rowconfigure(3, weight=1)
+        self.build_comparison_widgets()
         
         # Navigation buttons for comparison tab
         comp_nav_frame = ttk.Frame(comp_main_frame)
@@ -288,325 +581,311 @@ class TranslationSurveyApp:
         self.comp_save_button = ttk.Button(comp_nav_frame, text="Save and Close", command=self.save_and_close)
         self.comp_save_button.grid(row=0, column=1, padx=(10, 0))
     
-    def apply_language_filter(self):
-        """Filter data based on selected language and randomize question order"""
-        if self.current_language_filter == "Both":
-            self.data = self.all_data.copy()
-        elif self.current_language_filter == "English":
-            self.data = self.all_data[self.all_data['source_lang'] == 'en'].copy()
-        else:  # French
-            self.data = self.all_data[self.all_data['source_lang'] == 'fr'].copy()
-        
-        # Reset indices and randomize
-        self.question_indices = list(range(len(self.data)))
-        random.shuffle(self.question_indices)
-    
-    def on_language_filter_change(self, event=None):
-        """Handle language filter change"""
-        new_filter = self.language_var.get()
-        if new_filter != self.current_language_filter:
-            # Save current rankings before switching
-            if hasattr(self, 'ranking_vars'):
-                self.save_current_rankings()
-            
-            self.current_language_filter = new_filter
-            self.apply_language_filter()
-            self.current_position = 0
+    @reports_server_errors
+    def on_filter_change(self, event=None):
+        """Handle language or corpus filter change"""
+        # The session saves the current rankings before switching
+        if self.session.set_filters(self.language_var.get(), self.corpus_var.get()):
             self.load_next_question()
     
-    def on_comp_language_filter_change(self, event=None):
-        """Handle language filter change for comparison tab"""
-        new_filter = self.comp_language_var.get()
-        if new_filter != self.comp_current_language_filter:
-            self.comp_current_language_filter = new_filter
-            self.apply_comp_language_filter()
-            self.comp_current_position = 0
+    @reports_server_errors
+    def on_comp_filter_change(self, event=None):
+        """Handle language or corpus filter change for comparison tab"""
+        if self.session.set_comp_filters(self.comp_language_var.get(), self.comp_corpus_var.get()):
             self.load_next_comparison()
     
-    def apply_comp_language_filter(self):
-        """Filter data based on selected language for comparison tab"""
-        if self.comp_current_language_filter == "Both":
-            self.comp_data = self.all_data.copy()
-        elif self.comp_current_language_filter == "English":
-            self.comp_data = self.all_data[self.all_data['source_lang'] == 'en'].copy()
-        else:  # French
-            self.comp_data = self.all_data[self.all_data['source_lang'] == 'fr'].copy()
-        
-        # Reset indices and randomize
-        self.comp_question_indices = list(range(len(self.comp_data)))
-        random.shuffle(self.comp_question_indices)
+    def on_pair_mode_change(self, event=None):
+        """Switch between random and adaptive pairs from the next comparison on"""
+        self.session.set_pair_mode(self.comp_pair_mode_var.get())
     
     def create_translation_widgets(self):
-        # Clear existing widgets and labels list
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-        
-        self.ranking_vars = {}
-        self.translation_labels = []  # Reset labels list
-        current_row = self.data.iloc[self.current_index]
-        
-        # Get translations and randomize order
-        translations = []
-        for col in self.translation_columns:
-            if pd.notna(current_row[col]) and str(current_row[col]).strip():
-                translations.append((col, str(current_row[col])))
-        
-        # Randomize the order
-        random.shuffle(translations)
-        
-        # Create widgets for each translation
-        for i, (col_name, translation) in enumerate(translations):
-            frame = ttk.Frame(self.scrollable_frame, padding="5")
-            frame.grid(row=i, column=0, sticky=(tk.W, tk.E), pady=(0, 8), padx=(0, 10))
-            self.scrollable_frame.columnconfigure(0, weight=1)
-            
-            # Header with translation number and rank dropdown on same line
-            header_frame = ttk.Frame(frame)
-            header_frame.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 5))
-            header_frame.columnconfigure(0, weight=1)
-            
-            ttk.Label(header_frame, text=f"Translation {i+1}", font=("Arial", 11, "bold")).grid(row=0, column=0, sticky=tk.W)
-            
-            rank_frame = ttk.Frame(header_frame)
-            rank_frame.grid(row=0, column=1, sticky=tk.E)
-            
-            ttk.Label(rank_frame, text="Rank:").grid(row=0, column=0, padx=(0, 5))
-            
-            var = tk.StringVar(value='')  # Explicitly set to empty
-            combo = ttk.Combobox(rank_frame, textvariable=var, values=self.ranking_options, state="readonly", width=10)
-            combo.set('')  # Ensure it starts blank
-            combo.grid(row=0, column=1)
-            
-            # Disable mousewheel on combobox to prevent accidental changes
-            def disable_mousewheel(event):
-                return "break"
-            combo.bind("<MouseWheel>", disable_mousewheel)
-            
-            # Translation text as label
-            translation_label = ttk.Label(frame, text=translation, font=("Arial", 10), wraplength=self.get_current_wrap_length(), justify=tk.LEFT)
-            translation_label.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=(0, 3))
-            
-            # Store translation labels for resize handling
-            self.translation_labels.append(translation_label)
-            
-            # Add separator line
-            separator = ttk.Separator(frame, orient='horizontal')
-            separator.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=(3, 0))
-            
-            # Store the variable with the original column name for tracking
-            self.ranking_vars[col_name] = var
-            
-            frame.columnconfigure(0, weight=1)
+        """Show the current question; only the cards in view are laid out"""
+        item = self.session.load_question()
+        self.translation_list.set_item(item['translations'], self.session.rankings)
     
+    @reports_server_errors
     def load_next_question(self):
-        if self.current_position < len(self.question_indices):
-            self.current_index = self.question_indices[self.current_position]
+        if self.session.has_question():
+            self.create_translation_widgets()
             self.update_progress()
             self.update_source_text()
-            self.create_translation_widgets()
             self.update_navigation_buttons()
-            # Reapply zoom level and wrap length to new widgets
-            self.update_font_sizes()
-            self.update_wrap_lengths()
+            self.root.after_idle(self.prefetch_next_question)
+        elif not self.session.question_indices:
+            messagebox.showinfo("No Questions", "No segments match the selected filters.")
         else:
             messagebox.showinfo("Survey Complete", "You have completed all questions!")
     
+    def prefetch_next_question(self):
+        """Prepare the next question and its layout in idle time (not from a survey server, see SurveySession)"""
+        self.session.prefetch_next_question()
+        if self.session.prefetched is not None:
+            self.translation_list.prepare(self.session.prefetched['translations'])
+    
     def update_progress(self):
         pass  # ID removed
     
     def update_source_text(self):
-        current_row = self.data.iloc[self.current_index]
-        self.source_label.config(text=str(current_row['source']))
+        self.source_label.config(text=self.session.current_source)
     
     def update_navigation_buttons(self):
-        self.next_button.config(state=tk.NORMAL if self.current_position < len(self.question_indices) - 1 else tk.DISABLED)
-    
-    def save_current_rankings(self):
-        """Save current rankings to CSV if any rankings exist"""
-        if not hasattr(self, 'ranking_vars'):
-            return
-        
-        # Get current rankings
-        current_rankings = {}
-        for col_name, var in self.ranking_vars.items():
-            ranking = var.get()
-            current_rankings[col_name] = ranking if ranking else ''
-        
-        # Only save if any rankings were made
-        if not any(ranking for ranking in current_rankings.values()):
-            return
-        
-        # Create result row matching original CSV structure
-        current_row = self.data.iloc[self.current_index]
-        result_row = {
-            'source': str(current_row['source']),
-            'corpus_type': str(current_row['corpus_type'])
-        }
-        
-        # Add rankings for each translation column
-        for col in self.translation_columns:
-            result_row[col] = current_rankings.get(col, '')
-        
-        # Write to CSV
-        filename = 'translation_quality_results.csv'
-        file_exists = os.path.isfile(filename)
-        
-        with open(filename, 'a', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['source'] + self.translation_columns + ['corpus_type']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            if not file_exists:
-                writer.writeheader()
-            
-            writer.writerow(result_row)
+        self.next_button.config(state=tk.NORMAL if self.session.has_next_question() else tk.DISABLED)
     
     def load_saved_rankings(self):
         # No longer remember rankings - always start blank
-        for col_name, var in self.ranking_vars.items():
-            var.set('')
+        for col_name in self.session.rankings:
+            self.session.rankings[col_name] = ''
+        self.translation_list.refresh_ranks()
     
+    @reports_server_errors
     def next_question(self):
         # Save current rankings before moving
-        self.save_current_rankings()
-        
-        if self.current_position < len(self.question_indices) - 1:
-            self.current_position += 1
+        if self.session.next_question():
             self.load_next_question()
     
+    @reports_server_errors
     def comp_next_question(self):
         """Move to next comparison question"""
         # Save current comparison if any
-        if hasattr(self, 'comp_translation1_col') and hasattr(self, 'comp_translation2_col'):
-            self.save_current_comparison()
-        
-        if self.comp_current_position < len(self.comp_question_indices) - 1:
-            self.comp_current_position += 1
+        if self.session.comp_next_question():
             self.load_next_comparison()
     
+    @reports_server_errors
     def load_next_comparison(self):
         """Load next comparison question"""
-        if self.comp_current_position < len(self.comp_question_indices):
-            self.comp_current_index = self.comp_question_indices[self.comp_current_position]
+        if self.session.has_comparison():
+            item = self.session.load_comparison()
             self.update_comp_source_text()
-            self.create_comparison_widgets()
+            self.create_comparison_widgets(item['pair'])
             self.update_comp_navigation_buttons()
-            # Reapply zoom level and wrap length to new widgets
-            self.update_font_sizes()
-            self.update_wrap_lengths()
+            self.root.after_idle(self.session.prefetch_next_comparison)
+        elif not self.session.comp_question_indices:
+            messagebox.showinfo("No Questions", "No segments match the selected filters.")
         else:
             messagebox.showinfo("Survey Complete", "You have completed all comparison questions!")
     
     def update_comp_source_text(self):
         """Update source text for comparison tab"""
-        current_row = self.comp_data.iloc[self.comp_current_index]
-        self.comp_source_label.config(text=str(current_row['source']))
+        self.comp_source_label.config(text=self.session.comp_current_source)
     
     def update_comp_navigation_buttons(self):
         """Update navigation buttons for comparison tab"""
-        self.comp_next_button.config(state=tk.NORMAL if self.comp_current_position < len(self.comp_question_indices) - 1 else tk.DISABLED)
+        self.comp_next_button.config(state=tk.NORMAL if self.session.has_next_comparison() else tk.DISABLED)
     
-    def create_comparison_widgets(self):
-        """Create comparison widgets with 2 random translations"""
-        # Clear existing widgets
-        for widget in self.comp_translations_frame.winfo_children():
-            widget.destroy()
-        
-        current_row = self.comp_data.iloc[self.comp_current_index]
-        
-        # Get available translations
-        available_translations = []
-        for col in self.translation_columns:
-            if pd.notna(current_row[col]) and str(current_row[col]).strip():
-                available_translations.append((col, str(current_row[col])))
-        
-        # Select 2 random translations
-        if len(available_translations) < 2:
-            messagebox.showwarning("Not enough translations", "Need at least 2 translations for comparison!")
-            return
-        
-        selected_translations = random.sample(available_translations, 2)
-        self.comp_translation1_col, translation1_text = selected_translations[0]
-        self.comp_translation2_col, translation2_text = selected_translations[1]
+    def build_comparison_widgets(self):
+        """Create the comparison widgets once; each question only updates their text"""
+        frame = self.comp_translations_frame
         
         # Translation A section
-        ttk.Label(self.comp_translations_frame, text="Translation A", font=("Arial", 12, "bold")).grid(row=0, column=0, sticky=tk.W, pady=(0, 5))
+        ttk.Label(frame, text="Translation A", font=self.fonts['comparison_header']).grid(row=0, column=0, sticky=tk.W, pady=(0, 5))
         
-        translation1_label = ttk.Label(self.comp_translations_frame, text=translation1_text, font=("Arial", 10), wraplength=self.get_current_wrap_length(), justify=tk.LEFT)
+        translation1_label = ttk.Label(frame, text="", font=self.fonts['translation_text'], wraplength=self.wrap_length, justify=tk.LEFT)
         translation1_label.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
         
-        better1_button = ttk.Button(self.comp_translations_frame, text="This is Better", command=lambda: self.choose_better(1))
+        better1_button = ttk.Button(frame, text="This is Better", command=lambda: self.choose_better(1))
         better1_button.grid(row=2, column=0, pady=(0, 15))
         
         # Separator between translations
-        separator = ttk.Separator(self.comp_translations_frame, orient='horizontal')
+        separator = ttk.Separator(frame, orient='horizontal')
         separator.grid(row=3, column=0, sticky=(tk.W, tk.E), pady=(0, 15))
         
         # Translation B section
-        ttk.Label(self.comp_translations_frame, text="Translation B", font=("Arial", 12, "bold")).grid(row=4, column=0, sticky=tk.W, pady=(0, 5))
+        ttk.Label(frame, text="Translation B", font=self.fonts['comparison_header']).grid(row=4, column=0, sticky=tk.W, pady=(0, 5))
         
-        translation2_label = ttk.Label(self.comp_translations_frame, text=translation2_text, font=("Arial", 10), wraplength=self.get_current_wrap_length(), justify=tk.LEFT)
+        translation2_label = ttk.Label(frame, text="", font=self.fonts['translation_text'], wraplength=self.wrap_length, justify=tk.LEFT)
         translation2_label.grid(row=5, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
         
-        better2_button = ttk.Button(self.comp_translations_frame, text="This is Better", command=lambda: self.choose_better(2))
+        better2_button = ttk.Button(frame, text="This is Better", command=lambda: self.choose_better(2))
         better2_button.grid(row=6, column=0, pady=(0, 10))
         
-        # Store labels for font updating
-        if not hasattr(self, 'comp_translation_labels'):
-            self.comp_translation_labels = []
+        # Store labels for wrap length updates
         self.comp_translation_labels = [translation1_label, translation2_label]
     
+    def create_comparison_widgets(self, selected_translations):
+        """Show the 2 selected translations in the comparison widgets"""
+        if selected_translations is None:
+            # Comparison filters only keep rows with two distinct translations, so this is not expected
+            self.comp_translations_frame.grid_remove()
+            return
+        
+        (_, translation1_text), (_, translation2_text) = selected_translations
+        self.comp_translation_labels[0].config(text=translation1_text)
+        self.comp_translation_labels[1].config(text=translation2_text)
+        self.comp_translations_frame.grid()
+    
     def choose_better(self, choice):
         """Handle user choosing which translation is better"""
-        self.comp_choice = choice
+        self.session.comp_choice = choice
         # Automatically move to next question after choice
         self.comp_next_question()
     
-    def save_current_comparison(self):
-        """Save comparison result to CSV"""
-        if not hasattr(self, 'comp_choice'):
-            return  # No choice made
+    def count_result(self, result_row):
+        """Count a row the session saved on the leaderboard"""
+        if self.session.server is not None:
+            self.leaderboard_dirty = True  # The shared leaderboard is fetched again on the next visit
+        elif self.leaderboard is None:
+            self.leaderboard_pending.append(result_row)
+        else:
+            self.leaderboard.add_row(result_row)
+            self.refresh_leaderboard()
+    
+    def setup_leaderboard_tab(self):
+        """Read-only leaderboard of every translation column"""
+        main_frame = ttk.Frame(self.leaderboard_frame, padding="10")
+        main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.leaderboard_frame.columnconfigure(0, weight=1)
+        self.leaderboard_frame.rowconfigure(0, weight=1)
+        main_frame.columnconfigure(0, weight=1)
+        main_frame.rowconfigure(1, weight=1)
         
-        current_row = self.comp_data.iloc[self.comp_current_index]
+        self.leaderboard_status = ttk.Label(main_frame, text="Loading results...", font=self.fonts['filter_label'])
+        self.leaderboard_status.grid(row=0, column=0, sticky=tk.W, pady=(0, 10))
         
-        # Create result row
-        result_row = {
-            'source': str(current_row['source']),
-            'corpus_type': str(current_row['corpus_type'])
-        }
+        keys = [key for key, _, _ in LEADERBOARD_COLUMNS]
+        self.leaderboard_tree = ttk.Treeview(main_frame, columns=keys, show='headings')
+        for key, heading, width in LEADERBOARD_COLUMNS:
+            self.leaderboard_tree.heading(key, text=heading)
+            self.leaderboard_tree.column(key, width=width, anchor=tk.W if key == 'column' else tk.E)
+        self.leaderboard_tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
-        # Set better/worse based on choice
-        for col in self.translation_columns:
-            if col == self.comp_translation1_col:
-                result_row[col] = 'better' if self.comp_choice == 1 else 'worse'
-            elif col == self.comp_translation2_col:
-                result_row[col] = 'better' if self.comp_choice == 2 else 'worse'
-            else:
-                result_row[col] = ''
+        tree_scrollbar = ttk.Scrollbar(main_frame, orient="vertical", command=self.leaderboard_tree.yview)
+        tree_scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        self.leaderboard_tree.configure(yscrollcommand=tree_scrollbar.set)
         
-        # Write to same CSV as ranking mode
-        filename = 'translation_quality_results.csv'
-        file_exists = os.path.isfile(filename)
+        export_button = ttk.Button(main_frame, text="Export...", command=self.export_leaderboard)
+        export_button.grid(row=2, column=0, pady=(10, 0))
+    
+    def start_leaderboard_rebuild(self):
+        """Rebuild the leaderboard from the rows already in the results file, off the UI thread"""
+        # Only the rows committed so far; rows saved from now on are counted as they are saved
+        limit = os.path.getsize(RESULTS_PATH) if os.path.exists(RESULTS_PATH) else 0
+        writer = self.session.result_writer
+        if self.session.server is None and writer.deferred:
+            # Rows from a previous run still waiting in the journal are counted like new saves,
+            # and the rebuild stops short of the CSV the writer has appended them to since
+            self.leaderboard_pending[:0] = [record['row'] for record in writer.deferred]
+            if writer.start_size is not None:
+                limit = min(limit, writer.start_size)
+        result = []
+        self.leaderboard_loading = True
+        
+        def rebuild():
+            try:
+                if self.session.server is not None:
+                    result.append(self.session.server.leaderboard())
+                else:
+                    result.append(Leaderboard.from_csv(RESULTS_PATH, limit, self.translation_columns))
+            except (OSError, ValueError) as e:
+                result.append(e)
         
-        with open(filename, 'a', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['source'] + self.translation_columns + ['corpus_type']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            if not file_exists:
-                writer.writeheader()
-            
-            writer.writerow(result_row)
+        thread = threading.Thread(target=rebuild, name='LeaderboardRebuild', daemon=True)
+        thread.start()
+        self.root.after(LEADERBOARD_POLL_MS, self.finish_leaderboard_rebuild, thread, result)
+    
+    def finish_leaderboard_rebuild(self, thread, result):
+        if thread.is_alive():
+            self.root.after(LEADERBOARD_POLL_MS, self.finish_leaderboard_rebuild, thread, result)
+            return
         
-        # Clear choice for next comparison
-        delattr(self, 'comp_choice')
+        leaderboard = result[0] if result and isinstance(result[0], Leaderboard) else None
+        if leaderboard is None:
+            print(f"Could not load the leaderboard: {result[0] if result else 'unknown error'}")
+            leaderboard = self.leaderboard or Leaderboard(self.translation_columns)
+        for row in self.leaderboard_pending:
+            leaderboard.add_row(row)
+        self.leaderboard_pending = []
+        self.leaderboard = leaderboard
+        self.leaderboard_loading = False
+        self.leaderboard_dirty = True
+        self.refresh_leaderboard()
+    
+    def on_tab_changed(self, event=None):
+        if (self.session.server is not None and self.leaderboard_dirty and not self.leaderboard_loading
+                and self.notebook.select() == str(self.leaderboard_frame)):
+            self.start_leaderboard_rebuild()
+        elif self.leaderboard_dirty:
+            self.refresh_leaderboard()
+    
+    def refresh_leaderboard(self):
+        """Redraw the leaderboard table if its tab is showing; otherwise on the next visit"""
+        if self.leaderboard is None or self.notebook.select() != str(self.leaderboard_frame):
+            self.leaderboard_dirty = True
+            return
+        self.leaderboard_dirty = False
+        
+        self.leaderboard_tree.delete(*self.leaderboard_tree.get_children())
+        for entry in self.leaderboard.summary():
+            values = []
+            for key, _, _ in LEADERBOARD_COLUMNS:
+                value = entry[key]
+                if key.endswith('_rate'):
+                    value = f"{value:.0%}" if value is not None else "-"
+                values.append(value)
+            self.leaderboard_tree.insert('', tk.END, values=values)
+        self.leaderboard_status.config(
+            text=f"{self.leaderboard.rows} judgments ({self.leaderboard.superseded} replaced by later saves)")
+    
+    def export_leaderboard(self):
+        if self.leaderboard is None:
+            messagebox.showinfo("Leaderboard", "The leaderboard is still loading.")
+            return
+        path = filedialog.asksaveasfilename(title="Export Leaderboard", defaultextension=".csv",
+                                            initialfile="leaderboard.csv", filetypes=[("CSV files", "*.csv")])
+        if not path:
+            return
+        try:
+            summary_path, pairwise_path = self.leaderboard.export(path)
+        except OSError as e:
+            messagebox.showerror("Export failed", str(e))
+            return
+        messagebox.showinfo("Leaderboard exported", f"Saved {summary_path}\nand {pairwise_path}")
     
     def save_and_close(self):
         """Save current rankings and close the application"""
         # Save rankings if any exist
-        if hasattr(self, 'ranking_vars'):
-            self.save_current_rankings()
+        self.session.save_current_rankings()
         
+        self.close_result_writer()
+        self.write_metrics()
         self.root.quit()
     
+    def on_close(self):
+        """Window closed without saving: still flush results already submitted"""
+        self.close_result_writer()
+        self.write_metrics()
+        self.root.destroy()
+    
+    def finish_startup_probe(self, probe_path):
+        """Record when the first window has been drawn and whether NumPy imports, for the startup benchmark, and exit"""
+        self.root.update()
+        first_window = time.time()
+        try:
+            import numpy
+            numpy_version = numpy.__version__
+        except ImportError:
+            numpy_version = ''
+        with open(probe_path, 'w', encoding='utf-8') as f:
+            f.write(f"{first_window!r}\n{numpy_version}\n")
+        self.on_close()
+    
+    def write_metrics(self):
+        """Write the timing histograms (and memory snapshots) if instrumentation is on"""
+        if self.metrics is not None:
+            self.metrics.snapshot('close')
+            if self.metrics.write():
+                print(f"Metrics written to {self.metrics.path}")
+            self.metrics = None  # Written once; a second write would count this session twice
+    
+    def close_result_writer(self):
+        """Wait for queued results to reach the CSV, warning if some could not be written"""
+        if not self.session.close():
+            error = self.session.result_writer.last_error
+            messagebox.showwarning(
+                "Results not fully saved",
+                f"Some results could not be written to {RESULTS_PATH}"
+                + (f" ({error})" if error else "")
+                + ".\nThey are kept locally and will be saved the next time the survey starts.")
+    
     def zoom_in(self):
         """Increase font size"""
         self.zoom_level = min(2.0, self.zoom_level + 0.1)  # Max 2x zoom
@@ -618,33 +897,10 @@ class TranslationSurveyApp:
         self.update_font_sizes()
     
     def update_font_sizes(self):
-        """Update all font sizes based on current zoom level"""
-        # Update header font
-        header_size = int(self.base_font_sizes['header'] * self.zoom_level)
-        source_size = int(self.base_font_sizes['source'] * self.zoom_level)
-        filter_size = int(self.base_font_sizes['filter_label'] * self.zoom_level)
-        translation_header_size = int(self.base_font_sizes['translation_header'] * self.zoom_level)
-        translation_text_size = int(self.base_font_sizes['translation_text'] * self.zoom_level)
-        
-        # Update source text label
-        self.source_label.config(font=("Arial", source_size))
-        
-        # Update translation labels
-        if hasattr(self, 'translation_labels'):
-            for label in self.translation_labels:
-                label.config(font=("Arial", translation_text_size))
-        
-        # Update comparison labels
-        if hasattr(self, 'comp_translation_labels'):
-            for label in self.comp_translation_labels:
-                label.config(font=("Arial", translation_text_size))
-        
-        # Update comparison source label
-        if hasattr(self, 'comp_source_label'):
-            self.comp_source_label.config(font=("Arial", source_size))
-        
-        # Note: Static UI elements (headers, filter labels) would need widget references to update
-        # For now, they'll keep their original size as they're created once
+        """Rescale the shared fonts; every label using them (headers included) follows"""
+        for role, font in self.fonts.items():
+            font.configure(size=int(self.base_font_sizes[role] * self.zoom_level))
+        self.translation_list.relayout()
     
     def get_current_wrap_length(self):
         """Calculate current wrap length based on window width"""
@@ -655,14 +911,15 @@ class TranslationSurveyApp:
     def update_wrap_lengths(self):
         """Update wrap lengths for all text labels"""
         wrap_length = self.get_current_wrap_length()
+        if wrap_length == self.wrap_length:
+            return  # Height-only resize; nothing to rewrap
+        self.wrap_length = wrap_length
         
         # Update source label wraplength
         self.source_label.config(wraplength=wrap_length)
         
-        # Update translation labels wraplength
-        if hasattr(self, 'translation_labels'):
-            for label in self.translation_labels:
-                label.config(wraplength=wrap_length)
+        # Rewrap the translation cards in view and re-estimate the rest
+        self.translation_list.relayout()
         
         # Update comparison labels wraplength
         if hasattr(self, 'comp_translation_labels'):
@@ -679,18 +936,49 @@ class TranslationSurveyApp:
         if event.widget != self.root:
             return
         
+        # Fold a drag's burst of events into one reflow per frame
+        if self.reflow_job is None:
+            self.reflow_job = self.root.after(REFLOW_DELAY_MS, self.reflow)
+    
+    def reflow(self):
+        self.reflow_job = None
         self.update_wrap_lengths()
     
     def run(self):
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            self.session.close()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Translation quality survey.")
+    parser.add_argument('--metrics', nargs='?', const=survey_metrics.METRICS_PATH, default=None,
+                        help=f"Time the app's hot paths and write them to this file on close "
+                             f"(default: {survey_metrics.METRICS_PATH}; or set {survey_metrics.METRICS_ENV})")
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help="Also record tracemalloc snapshots in the metrics file")
+    # Ignore arguments added by the platform (for example macOS -psn_ when launched from Finder)
+    return parser.parse_known_args(argv)[0]
 
 def main():
-    # Check if data file exists
-    if not os.path.exists('merged_translation_data.csv'):
-        messagebox.showerror("Error", "merged_translation_data.csv not found!")
+    args = parse_args()
+    # Start timing before the data load
+    metrics = survey_metrics.from_environment(args.metrics, args.tracemalloc)
+    
+    # Check if data file exists (a survey server has its own copy)
+    server = survey_client.from_environment()
+    if server is None and not os.path.exists(CSV_PATH) and not os.path.exists(SQLITE_PATH):
+        messagebox.showerror("Error", f"{CSV_PATH} not found!")
         return
     
-    app = TranslationSurveyApp()
+    try:
+        app = TranslationSurveyApp(metrics, server)
+    except survey_client.ServerError as e:
+        messagebox.showerror("Error", f"Could not reach the survey server: {e}")
+        return
+    except ValueError as e:
+        messagebox.showerror("Error", f"Could not load {CSV_PATH}: {e}")
+        return
     app.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,142 @@
+"""
+Thin client for survey_server.py.
+
+When SURVEY_SERVER is set (for example http://192.168.1.10:8765) the survey
+app takes its items from the server's shared pools and sends results there
+instead of appending to a local CSV. SURVEY_EVALUATOR names the evaluator
+(default: the computer's name).
+"""
+
+import http.client
+import json
+import os
+import socket
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from leaderboard import Leaderboard
+
+SERVER_ENV = 'SURVEY_SERVER'
+EVALUATOR_ENV = 'SURVEY_EVALUATOR'
+# Served items kept so result rows can be built without another request
+ITEM_CACHE_SIZE = 64
+
+
+class ServerError(OSError):
+    """The server could not be reached or rejected a request."""
+
+
+class SurveyClient:
+    """JSON/HTTP client with one keep-alive connection per thread."""
+    
+    def __init__(self, url: str, evaluator: Optional[str] = None, timeout: float = 10.0):
+        parts = urlsplit(url if '://' in url else f"http://{url}")
+        self.url = url
+        self.host = parts.hostname or '127.0.0.1'
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.evaluator = evaluator or os.environ.get(EVALUATOR_ENV) or socket.gethostname()
+        self.local = threading.local()
+        self.items = OrderedDict()  # row_id -> served item
+        self._info = None
+    
+    def request(self, method: str, path: str, body: Optional[dict] = None):
+        """Send one request and return the decoded JSON response, retrying once on a stale connection."""
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        headers = {'Content-Type': 'application/json'} if data is not None else {}
+        for attempt in range(2):
+            conn = getattr(self.local, 'conn', None)
+            if conn is None:
+                conn = self.local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                conn.request(method, path, body=data, headers=headers)
+                response = conn.getresponse()
+                payload = json.loads(response.read() or b'{}')
+                break
+            except (OSError, http.client.HTTPException, ValueError) as e:
+                conn.close()
+                self.local.conn = None
+                if attempt:
+                    raise ServerError(f"{self.url}: {e}") from e
+        if response.status != 200:
+            raise ServerError(f"{self.url}{path}: {payload.get('error', response.reason)}")
+        return payload
+    
+    def info(self) -> dict:
+        if self._info is None:
+            self._info = self.request('GET', '/info')
+        return self._info
+    
+    @property
+    def adaptive(self) -> bool:
+        return bool(self.info().get('adaptive'))
+    
+    def dataset(self) -> 'RemoteDataset':
+        return RemoteDataset(self)
+    
+    def pool_size(self, tab: str, source_lang: Optional[str], corpus_type: Optional[str]) -> int:
+        return self.request('POST', '/pool', {'tab': tab, 'source_lang': source_lang, 'corpus_type': corpus_type})['size']
+    
+    def next_item(self, tab: str, source_lang: Optional[str], corpus_type: Optional[str],
+                  pair_mode: Optional[str] = None) -> dict:
+        """Take the next item of a shared pool (see SurveyServer.next_item)."""
+        item = self.request('POST', '/next', {'tab': tab, 'source_lang': source_lang, 'corpus_type': corpus_type,
+                                              'pair_mode': pair_mode})
+        for key in ('translations', 'pair'):
+            if item.get(key) is not None:
+                item[key] = [tuple(translation) for translation in item[key]]
+        self.items[item['row_id']] = item
+        self.items.move_to_end(item['row_id'])
+        while len(self.items) > ITEM_CACHE_SIZE:
+            self.items.popitem(last=False)
+        return item
+    
+    def row(self, row_id: int) -> dict:
+        item = self.items.get(row_id)
+        if item is None:
+            item = self.request('GET', f"/rows/{row_id}")
+        return item
+    
+    def submit(self, row_id: int, result_row: Dict[str, str]) -> int:
+        """Send a saved question (a results-CSV style row); returns its id once the server has committed it."""
+        judgments = {col: value for col, value in result_row.items()
+                     if value and col not in ('source', 'source_lang', 'corpus_type')}
+        return self.request('POST', '/results',
+                            {'evaluator': self.evaluator, 'row_id': row_id, 'judgments': judgments})['id']
+    
+    def leaderboard(self) -> Leaderboard:
+        return Leaderboard.from_state(self.request('GET', '/leaderboard'))
+
+
+class _CorpusTypes:
+    def __init__(self, corpus_types):
+        self.corpus_types = corpus_types
+
+
+class RemoteDataset:
+    """The parts of the dataset interface the app uses, answered by the server."""
+    
+    def __init__(self, client: SurveyClient):
+        info = client.info()
+        self.client = client
+        self.translation_columns = info['columns']
+        self.filter_index = _CorpusTypes(info['corpus_types'])
+        self.row_count = info['dataset_rows']
+    
+    def __len__(self):
+        return self.row_count
+    
+    def row(self, row_id: int) -> Dict[str, str]:
+        item = self.client.row(row_id)
+        return {'source': item['source'], 'source_lang': item['source_lang'], 'corpus_type': item['corpus_type']}
+    
+    def available_translations(self, row_id: int) -> List[Tuple[str, str]]:
+        return [tuple(translation) for translation in self.client.request('GET', f"/rows/{row_id}")['translations']]
+
+
+def from_environment() -> Optional[SurveyClient]:
+    """A client for SURVEY_SERVER, or None to run standalone."""
+    url = os.environ.get(SERVER_ENV)
+    return SurveyClient(url) if url else None
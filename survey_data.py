@@ -0,0 +1,677 @@
+"""
+Data access for the survey app.
+
+The merged translation data is read either from merged_translation_data.csv or
+from an indexed SQLite store that merge_csv.py writes next to it (--sqlite).
+The store is opened in place and rows are fetched on demand, so startup time and
+memory do not grow with the number of segments. Large CSVs are read the same way
+through a cached byte-offset index; small ones are loaded whole into a compact
+column store. Only the standard library is needed, so the app does not need
+pandas; NumPy, when installed, vectorises building the per-row translation masks.
+"""
+
+import csv
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unicodedata
+import zlib
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CSV_PATH = 'merged_translation_data.csv'
+SQLITE_PATH = 'merged_translation_data.sqlite'
+
+# Columns that describe a segment rather than hold a translation
+METADATA_COLUMNS = {'source', 'source_lang', 'corpus_type'}
+
+# Language filter labels shown in the UI -> source_lang codes
+LANGUAGE_CODES = {'English': 'en', 'French': 'fr'}
+
+STORE_FORMAT_VERSION = 4
+
+# CSVs at least this large are read lazily through a byte-offset index
+LAZY_CSV_THRESHOLD = 32 * 1024 * 1024
+CSV_INDEX_MAGIC = b'SURVEYCSVIDX2\n'
+ROW_CACHE_SIZE = 64
+
+# Translation group code of an empty cell (see translation_groups)
+NO_TRANSLATION = 0xFF
+# Groups are one byte per column, so columns 0..254 can be told apart from NO_TRANSLATION
+MAX_TRANSLATION_COLUMNS = NO_TRANSLATION
+
+
+def get_translation_columns(columns: List[str]) -> List[str]:
+    """Every column except the metadata columns holds a translation (at most MAX_TRANSLATION_COLUMNS)."""
+    translation_columns = [col for col in columns if col not in METADATA_COLUMNS]
+    if len(translation_columns) > MAX_TRANSLATION_COLUMNS:
+        raise ValueError(f"{len(translation_columns)} translation columns; "
+                         f"at most {MAX_TRANSLATION_COLUMNS} are supported")
+    return translation_columns
+
+
+def encode_mask(flags: List[bool]) -> bytes:
+    """Pack per-column flags into a little-endian bitmask."""
+    value = 0
+    for bit, flag in enumerate(flags):
+        if flag:
+            value |= 1 << bit
+    return value.to_bytes((len(flags) + 7) // 8 or 1, 'little')
+
+
+def decode_mask(mask: bytes, count: int) -> List[bool]:
+    """Unpack a bitmask written by encode_mask."""
+    value = int.from_bytes(mask, 'little')
+    return [bool(value >> bit & 1) for bit in range(count)]
+
+
+def normalize_language(value: str) -> str:
+    """source_lang as every backend returns and filters it: stripped and lower-case."""
+    return value.strip().lower()
+
+
+def normalize_translation(text: str) -> str:
+    """Text as compared for duplicates: Unicode NFC with runs of whitespace collapsed."""
+    return unicodedata.normalize('NFC', ' '.join(text.split()))
+
+
+def translation_groups(texts: List[str]) -> bytes:
+    """
+    One byte per translation column: the position of the first column with the
+    same normalised text, or NO_TRANSLATION for an empty cell.
+    
+    Computed once per row at load, so showing a question never compares texts.
+    """
+    first_position = {}
+    groups = bytearray(len(texts))
+    for position, text in enumerate(texts):
+        normalized = normalize_translation(text)
+        groups[position] = first_position.setdefault(normalized, position) if normalized else NO_TRANSLATION
+    return bytes(groups)
+
+
+def group_translations(columns: List[str], row, groups) -> Tuple[List[Tuple[str, str]], Dict[str, List[str]]]:
+    """
+    (column, text) for each distinct translation of a row, keyed by the first
+    column that produced it, and first column -> the other columns with the
+    same text (only for texts more than one column produced).
+    """
+    translations = []
+    duplicates = {}
+    for position, (col, group) in enumerate(zip(columns, groups)):
+        if group == position:
+            translations.append((col, row[col]))
+        elif group != NO_TRANSLATION:
+            duplicates.setdefault(columns[group], []).append(col)
+    return translations, duplicates
+
+
+class TranslationIndex:
+    """
+    Translation groups of every row (see translation_groups), with a bitmask
+    of each row's non-empty translation columns and its number of distinct
+    translations, both derived from the groups once at load.
+    
+    Showing a question reads the mask and groups instead of testing cells,
+    and comparison filters drop rows with fewer than two distinct
+    translations up front. The derivation is vectorised with NumPy when it
+    is installed and done row by row otherwise.
+    """
+    
+    def __init__(self, groups: bytes, width: int):
+        self.groups = groups
+        self.width = width
+        self.mask_width = (width + 7) // 8 or 1  # Bytes per mask, as encode_mask writes them
+        rows = len(groups) // width if width else 0
+        self.distinct_counts = array('B')
+        if np is not None and width:
+            codes = np.frombuffer(groups, dtype=np.uint8).reshape(rows, width)
+            self.masks = np.packbits(codes != NO_TRANSLATION, axis=1, bitorder='little').tobytes()
+            self.distinct_counts.frombytes(
+                (codes == np.arange(width, dtype=np.uint8)).sum(axis=1, dtype=np.uint8).tobytes())
+        else:
+            # Rows share a handful of group patterns, so each is worked out once
+            patterns = {}
+            masks = bytearray()
+            for start in range(0, rows * width, width):
+                row_groups = groups[start:start + width]
+                pattern = patterns.get(row_groups)
+                if pattern is None:
+                    pattern = patterns[row_groups] = (
+                        encode_mask([group != NO_TRANSLATION for group in row_groups]),
+                        sum(group == position for position, group in enumerate(row_groups)))
+                masks += pattern[0]
+                self.distinct_counts.append(pattern[1])
+            self.masks = bytes(masks)
+    
+    def row_groups(self, row_id: int) -> bytes:
+        return self.groups[row_id * self.width:(row_id + 1) * self.width]
+    
+    def present(self, row_id: int) -> List[bool]:
+        """Whether each translation column of the row is non-empty."""
+        return decode_mask(self.masks[row_id * self.mask_width:(row_id + 1) * self.mask_width], self.width)
+    
+    def comparable(self, row_ids: array) -> array:
+        """The row ids with at least two distinct translations, in the same order."""
+        if np is not None and len(row_ids):
+            ids = np.asarray(row_ids)
+            counts = np.frombuffer(self.distinct_counts, dtype=np.uint8)
+            result = array('I')
+            result.frombytes(ids[counts[ids] >= 2].astype(np.uintc).tobytes())
+            return result
+        counts = self.distinct_counts
+        return array('I', (row_id for row_id in row_ids if counts[row_id] >= 2))
+
+
+class FilterIndex:
+    """
+    Row ids for each source_lang and each corpus_type, built once at load.
+    
+    Filters return a fresh array of matching row ids and never copy rows, so a
+    filter change costs O(matching rows). A language x corpus filter walks the
+    smaller of the two id arrays and checks the other code per row.
+    """
+    
+    def __init__(self, languages: List[str], language_codes: array, corpus_types: List[str], corpus_codes: array):
+        self.languages = languages
+        self.language_codes = language_codes
+        self.corpus_types = corpus_types
+        self.corpus_codes = corpus_codes
+        self.row_count = len(language_codes)
+        
+        self.rows_by_language = [array('I') for _ in languages]
+        self.rows_by_corpus = [array('I') for _ in corpus_types]
+        for row_id, (language_code, corpus_code) in enumerate(zip(language_codes, corpus_codes)):
+            self.rows_by_language[language_code].append(row_id)
+            self.rows_by_corpus[corpus_code].append(row_id)
+    
+    @classmethod
+    def from_values(cls, pairs) -> 'FilterIndex':
+        """Build from (source_lang, corpus_type) pairs in row order; source_lang is normalised."""
+        languages = {}
+        corpus_types = {}
+        language_codes = array('H')
+        corpus_codes = array('H')
+        for language, corpus_type in pairs:
+            language = normalize_language(language)
+            language_codes.append(languages.setdefault(language, len(languages)))
+            corpus_codes.append(corpus_types.setdefault(corpus_type, len(corpus_types)))
+        return cls(list(languages), language_codes, list(corpus_types), corpus_codes)
+    
+    def select(self, source_lang: Optional[str] = None, corpus_type: Optional[str] = None) -> array:
+        """Return the ids of rows matching both filters (None matches everything)."""
+        if source_lang is None and corpus_type is None:
+            return array('I', range(self.row_count))
+        if source_lang is not None and source_lang not in self.languages:
+            return array('I')
+        if corpus_type is not None and corpus_type not in self.corpus_types:
+            return array('I')
+        
+        language_code = self.languages.index(source_lang) if source_lang is not None else None
+        corpus_code = self.corpus_types.index(corpus_type) if corpus_type is not None else None
+        if corpus_code is None:
+            return array('I', self.rows_by_language[language_code])
+        if language_code is None:
+            return array('I', self.rows_by_corpus[corpus_code])
+        
+        by_language = self.rows_by_language[language_code]
+        by_corpus = self.rows_by_corpus[corpus_code]
+        if len(by_language) <= len(by_corpus):
+            codes, code, candidates = self.corpus_codes, corpus_code, by_language
+        else:
+            codes, code, candidates = self.language_codes, language_code, by_corpus
+        return array('I', (row_id for row_id in candidates if codes[row_id] == code))
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def build_sqlite_store(csv_path: str, db_path: str, batch_size: int = 5000) -> int:
+    """
+    Write an indexed SQLite copy of a merged CSV and return its row count.
+    
+    Each segment keeps its CSV position as its id, a normalised source_lang and
+    corpus_type (both indexed) and its translation groups (see
+    translation_groups), from which the translation masks are derived on open.
+    """
+    tmp_path = db_path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    
+    with open(csv_path, 'r', newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        columns = next(reader)
+        translation_columns = get_translation_columns(columns)
+        positions = {col: i for i, col in enumerate(columns)}
+        translation_positions = [positions[col] for col in translation_columns]
+        
+        conn = sqlite3.connect(tmp_path)
+        try:
+            conn.execute("PRAGMA journal_mode = OFF")
+            conn.execute("PRAGMA synchronous = OFF")
+            conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            column_defs = ", ".join(f"{_quote(col)} TEXT" for col in columns if col not in ('source_lang', 'corpus_type'))
+            conn.execute(
+                "CREATE TABLE segments (id INTEGER PRIMARY KEY, source_lang TEXT NOT NULL, "
+                f"corpus_type TEXT NOT NULL, translation_groups BLOB NOT NULL, "
+                f"{column_defs})"
+            )
+            
+            stored_columns = [col for col in columns if col not in ('source_lang', 'corpus_type')]
+            stored_positions = [positions[col] for col in stored_columns]
+            placeholders = ", ".join("?" * (len(stored_columns) + 4))
+            insert = (
+                f"INSERT INTO segments (id, source_lang, corpus_type, translation_groups, "
+                f"{', '.join(_quote(col) for col in stored_columns)}) VALUES ({placeholders})"
+            )
+            source_lang_pos = positions.get('source_lang')
+            corpus_type_pos = positions.get('corpus_type')
+            
+            row_count = 0
+            batch = []
+            for row in reader:
+                batch.append((
+                    row_count,
+                    normalize_language(row[source_lang_pos]) if source_lang_pos is not None else '',
+                    row[corpus_type_pos] if corpus_type_pos is not None else '',
+                    translation_groups([row[pos] for pos in translation_positions]),
+                    *(row[pos] for pos in stored_positions),
+                ))
+                row_count += 1
+                if len(batch) >= batch_size:
+                    conn.executemany(insert, batch)
+                    batch = []
+            if batch:
+                conn.executemany(insert, batch)
+            
+            conn.execute("CREATE INDEX segments_source_lang ON segments (source_lang)")
+            conn.execute("CREATE INDEX segments_corpus_type ON segments (corpus_type)")
+            conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", [
+                ('format_version', str(STORE_FORMAT_VERSION)),
+                ('columns', json.dumps(columns)),
+                ('row_count', str(row_count)),
+            ])
+            conn.commit()
+        finally:
+            conn.close()
+    
+    os.replace(tmp_path, db_path)
+    return row_count
+
+
+def store_format_version(db_path: str) -> Optional[int]:
+    """The format version recorded in a store written by build_sqlite_store, or None if it cannot be read."""
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'format_version'").fetchone()
+        finally:
+            conn.close()
+        return int(row[0]) if row else None
+    except (sqlite3.Error, ValueError):
+        return None
+
+
+class SqliteDataset:
+    """
+    Read-only view of a store written by build_sqlite_store.
+    
+    Raises ValueError for a store that cannot be used (an old format version,
+    a corrupt or partly copied file, missing metadata), so callers can fall
+    back to the CSV.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        try:
+            self._load()
+        except sqlite3.Error as e:
+            self.conn.close()
+            raise ValueError(f"{path} cannot be read ({e})") from e
+        except KeyError as e:
+            self.conn.close()
+            raise ValueError(f"{path} has no {e.args[0]} record") from e
+        except ValueError:
+            self.conn.close()
+            raise
+    
+    def _load(self):
+        path = self.path
+        meta = dict(self.conn.execute("SELECT key, value FROM meta"))
+        if int(meta['format_version']) != STORE_FORMAT_VERSION:
+            raise ValueError(f"{path} has unsupported format version {meta['format_version']}")
+        
+        self.columns = json.loads(meta['columns'])
+        self.translation_columns = get_translation_columns(self.columns)
+        self.row_count = int(meta['row_count'])
+        
+        select_columns = ", ".join(_quote(col) for col in self.columns)
+        self._select_row = f"SELECT {select_columns} FROM segments WHERE id = ?"
+        
+        # One pass over the segments builds both indexes
+        groups = bytearray()
+        
+        def filter_values(rows):
+            for source_lang, corpus_type, row_groups in rows:
+                groups.extend(row_groups)
+                yield source_lang, corpus_type
+        self.filter_index = FilterIndex.from_values(filter_values(
+            self.conn.execute("SELECT source_lang, corpus_type, translation_groups FROM segments ORDER BY id")
+        ))
+        self.translation_index = TranslationIndex(bytes(groups), len(self.translation_columns))
+    
+    def __len__(self):
+        return self.row_count
+    
+    def row_ids(self, source_lang: Optional[str] = None, corpus_type: Optional[str] = None) -> array:
+        """Return the ids of rows with the given source language and corpus type."""
+        return self.filter_index.select(source_lang, corpus_type)
+    
+    def comparable_row_ids(self, source_lang: Optional[str] = None, corpus_type: Optional[str] = None) -> array:
+        """Like row_ids, keeping only rows with at least two distinct translations to compare."""
+        return self.translation_index.comparable(self.filter_index.select(source_lang, corpus_type))
+    
+    def row(self, row_id: int) -> Dict[str, str]:
+        values = self.conn.execute(self._select_row, (row_id,)).fetchone()
+        if values is None:
+            raise IndexError(row_id)
+        return {col: value if value is not None else '' for col, value in zip(self.columns, values)}
+    
+    def available_translations(self, row_id: int) -> List[Tuple[str, str]]:
+        """Return (column, text) for each non-empty translation, using the translation mask."""
+        row = self.row(row_id)
+        flags = self.translation_index.present(row_id)
+        return [(col, row[col]) for col, present in zip(self.translation_columns, flags) if present]
+    
+    def distinct_translations(self, row_id: int) -> Tuple[List[Tuple[str, str]], Dict[str, List[str]]]:
+        """Distinct translations and their duplicate columns (see group_translations), from the stored groups."""
+        return group_translations(self.translation_columns, self.row(row_id),
+                                  self.translation_index.row_groups(row_id))
+
+
+class RowView(Mapping):
+    """Read-only mapping over one row of a CompactTable, without copying its values."""
+    
+    __slots__ = ('_table', '_index')
+    
+    def __init__(self, table: 'CompactTable', index: int):
+        self._table = table
+        self._index = index
+    
+    def __getitem__(self, column: str) -> str:
+        return self._table.column_data[self._table.column_positions[column]][self._index]
+    
+    def __iter__(self):
+        return iter(self._table.columns)
+    
+    def __len__(self):
+        return len(self._table.columns)
+    
+    def __repr__(self):
+        return f"RowView({dict(self)!r})"
+
+
+class CompactTable:
+    """
+    Loads a merged CSV with the csv module and stores it column by column.
+    
+    Each column is a tuple of strings (repeated source_lang and corpus_type
+    values share one string object; source_lang is normalised as on every
+    backend), rows are exposed as RowView objects, and missing cells are empty
+    strings.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            self.columns = next(reader)
+            width = len(self.columns)
+            records = [record + [''] * (width - len(record)) if len(record) < width else record
+                       for record in reader if record]
+        
+        self.column_positions = {col: i for i, col in enumerate(self.columns)}
+        self.column_data = list(zip(*records)) if records else [() for _ in self.columns]
+        del records
+        for col in ('source_lang', 'corpus_type'):
+            if col in self.column_positions:
+                pos = self.column_positions[col]
+                values = self.column_data[pos]
+                if col == 'source_lang':
+                    values = map(normalize_language, values)
+                self.column_data[pos] = tuple(sys.intern(value) for value in values)
+        self.row_count = len(self.column_data[0]) if self.column_data else 0
+        self.translation_columns = get_translation_columns(self.columns)
+        
+        empty = ('',) * self.row_count
+        languages = self.column_data[self.column_positions['source_lang']] if 'source_lang' in self.column_positions else empty
+        corpus_types = self.column_data[self.column_positions['corpus_type']] if 'corpus_type' in self.column_positions else empty
+        self.filter_index = FilterIndex.from_values(zip(languages, corpus_types))
+        
+        # Translation groups of every row, one byte per translation column
+        translation_data = [self.column_data[self.column_positions[col]] for col in self.translation_columns]
+        self.translation_index = TranslationIndex(
+            b''.join(translation_groups(texts) for texts in zip(*translation_data)), len(translation_data))
+    
+    def __len__(self):
+        return self.row_count
+    
+    def row_ids(self, source_lang: Optional[str] = None, corpus_type: Optional[str] = None) -> array:
+        return self.filter_index.select(source_lang, corpus_type)
+    
+    def comparable_row_ids(self, source_lang: Optional[str] = None, corpus_type: Optional[str] = None) -> array:
+        return self.translation_index.comparable(self.filter_index.select(source_lang, corpus_type))
+    
+    def row(self, row_id: int) -> RowView:
+        if not 0 <= row_id < self.row_count:
+            raise IndexError(row_id)
+        return RowView(self, row_id)
+    
+    def available_translations(self, row_id: int) -> List[Tuple[str, str]]:
+        flags = self.translation_index.present(row_id)
+        return [(col, self.column_data[self.column_positions[col]][row_id])
+                for col, present in zip(self.translation_columns, flags) if present]
+    
+    def distinct_translations(self, row_id: int) -> Tuple[List[Tuple[str, str]], Dict[str, List[str]]]:
+        return group_translations(self.translation_columns, self.row(row_id),
+                                  self.translation_index.row_groups(row_id))
+
+
+def _csv_index_paths(csv_path: str) -> List[str]:
+    """Sidecar index next to the CSV, or in the temp dir if that is not writable."""
+    absolute = os.path.abspath(csv_path)
+    key = format(zlib.crc32(absolute.encode('utf-8')), '08x')
+    return [
+        absolute + '.idx',
+        os.path.join(tempfile.gettempdir(), f"{os.path.basename(absolute)}.{key}.idx"),
+    ]
+
+
+class LazyCsvDataset:
+    """
+    Reads rows of a large merged CSV on demand.
+    
+    The first open scans the file once to record where each row starts, plus
+    its source_lang, corpus_type and translation groups, and caches that index
+    next to the CSV.
+    Later opens load the index only. A row is decoded when it is first shown
+    (with source_lang normalised, as on every backend) and kept in a small LRU
+    cache.
+    """
+    
+    def __init__(self, path: str, cache_size: int = ROW_CACHE_SIZE):
+        self.path = path
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        stat = os.stat(path)
+        self._fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        
+        if not self._load_index():
+            self._build_index()
+        self.translation_columns = get_translation_columns(self.columns)
+        self.filter_index = FilterIndex(self.languages, self.language_codes, self.corpus_types, self.corpus_codes)
+        self.translation_index = TranslationIndex(self.groups, self.group_width)
+        self._file = open(path, 'rb')
+    
+    def _load_index(self) -> bool:
+        for index_path in _csv_index_paths(self.path):
+            try:
+                with open(index_path, 'rb') as f:
+                    if f.readline() != CSV_INDEX_MAGIC:
+                        continue
+                    header = json.loads(f.readline())
+                    if header['csv'] != self._fingerprint:
+                        continue
+                    count = header['row_count']
+                    self.columns = header['columns']
+                    self.languages = header['languages']
+                    self.corpus_types = header['corpus_types']
+                    self.offsets = array('q')
+                    self.offsets.fromfile(f, count)
+                    self.language_codes = array('H')
+                    self.language_codes.fromfile(f, count)
+                    self.corpus_codes = array('H')
+                    self.corpus_codes.fromfile(f, count)
+                    self.group_width = header['group_width']
+                    self.groups = f.read(count * self.group_width)
+                    if len(self.groups) != count * self.group_width:
+                        continue
+                    return True
+            except (OSError, ValueError, KeyError, EOFError):
+                continue
+        return False
+    
+    def _build_index(self):
+        consumed = 0
+        
+        with open(self.path, 'rb') as f:
+            def lines():
+                # csv.reader pulls exactly the lines of one record at a time,
+                # so `consumed` marks where the next record starts
+                nonlocal consumed
+                for raw in f:
+                    consumed += len(raw)
+                    yield raw.decode('utf-8')
+            
+            reader = csv.reader(lines())
+            self.columns = next(reader)
+            if self.columns:
+                self.columns[0] = self.columns[0].lstrip('\ufeff')
+            lang_pos = self.columns.index('source_lang') if 'source_lang' in self.columns else None
+            corpus_pos = self.columns.index('corpus_type') if 'corpus_type' in self.columns else None
+            translation_positions = [self.columns.index(col) for col in get_translation_columns(self.columns)]
+            
+            languages = {}
+            corpus_types = {}
+            self.offsets = array('q')
+            self.language_codes = array('H')
+            self.corpus_codes = array('H')
+            groups = bytearray()
+            start = consumed
+            for record in reader:
+                if record:
+                    language = normalize_language(record[lang_pos]) if lang_pos is not None else ''
+                    corpus_type = record[corpus_pos] if corpus_pos is not None else ''
+                    self.offsets.append(start)
+                    self.language_codes.append(languages.setdefault(language, len(languages)))
+                    self.corpus_codes.append(corpus_types.setdefault(corpus_type, len(corpus_types)))
+                    groups += translation_groups([record[pos] if pos < len(record) else ''
+                                                  for pos in translation_positions])
+                start = consumed
+        
+        self.languages = list(languages)
+        self.corpus_types = list(corpus_types)
+        self.group_width = len(translation_positions)
+        self.groups = bytes(groups)
+        header = {
+            'csv': self._fingerprint,
+            'row_count': len(self.offsets),
+            'columns': self.columns,
+            'languages': self.languages,
+            'corpus_types': self.corpus_types,
+            'group_width': self.group_width,
+        }
+        for index_path in _csv_index_paths(self.path):
+            try:
+                with open(index_path + '.tmp', 'wb') as f:
+                    f.write(CSV_INDEX_MAGIC)
+                    f.write(json.dumps(header).encode('utf-8') + b'\n')
+                    self.offsets.tofile(f)
+                    self.language_codes.tofile(f)
+                    self.corpus_codes.tofile(f)
+                    f.write(self.groups)
+                os.replace(index_path + '.tmp', index_path)
+                return
+            except OSError:
+                continue
+    
+    def __len__(self):
+        return len(self.offsets)
+    
+    def row_ids(self, source_lang: Optional[str] = None, corpus_type: Optional[str] = None) -> array:
+        return self.filter_index.select(source_lang, corpus_type)
+    
+    def comparable_row_ids(self, source_lang: Optional[str] = None, corpus_type: Optional[str] = None) -> array:
+        return self.translation_index.comparable(self.filter_index.select(source_lang, corpus_type))
+    
+    def _read_record(self, offset: int) -> List[str]:
+        self._file.seek(offset)
+        lines = (raw.decode('utf-8') for raw in iter(self._file.readline, b''))
+        return next(csv.reader(lines))
+    
+    def row(self, row_id: int) -> Dict[str, str]:
+        row = self._cache.get(row_id)
+        if row is not None:
+            self._cache.move_to_end(row_id)
+            return row
+        
+        record = self._read_record(self.offsets[row_id])
+        record += [''] * (len(self.columns) - len(record))
+        row = dict(zip(self.columns, record))
+        if 'source_lang' in row:
+            row['source_lang'] = normalize_language(row['source_lang'])
+        self._cache[row_id] = row
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return row
+    
+    def available_translations(self, row_id: int) -> List[Tuple[str, str]]:
+        row = self.row(row_id)
+        flags = self.translation_index.present(row_id)
+        return [(col, row[col]) for col, present in zip(self.translation_columns, flags) if present]
+    
+    def distinct_translations(self, row_id: int) -> Tuple[List[Tuple[str, str]], Dict[str, List[str]]]:
+        return group_translations(self.translation_columns, self.row(row_id),
+                                  self.translation_index.row_groups(row_id))
+
+
+def open_dataset(csv_path: str = CSV_PATH, db_path: str = SQLITE_PATH):
+    """
+    Open the SQLite store when it exists and is not older than the CSV,
+    otherwise read the CSV (lazily when it is large). A store that cannot be
+    used is skipped in favour of the CSV when there is one.
+    """
+    if os.path.exists(db_path):
+        if not os.path.exists(csv_path) or os.path.getmtime(db_path) >= os.path.getmtime(csv_path):
+            try:
+                return SqliteDataset(db_path)
+            except ValueError as e:
+                if not os.path.exists(csv_path):
+                    raise
+                print(f"{e}; loading the CSV instead (rebuild it with merge_csv.py --sqlite)")
+        else:
+            print(f"{db_path} is older than {csv_path}; loading the CSV instead")
+    if os.path.getsize(csv_path) >= LAZY_CSV_THRESHOLD:
+        return LazyCsvDataset(csv_path)
+    return CompactTable(csv_path)
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Optional timing instrumentation for the survey app.
+
+Off unless SURVEY_METRICS is set (1 for the default file, or a path) or the
+app is started with --metrics. When on, the app's hot paths are wrapped so
+each call's perf_counter_ns duration lands in a fixed-bucket histogram: one
+bisect and an increment per call, nothing when off. With SURVEY_TRACEMALLOC=1
+(or --tracemalloc) tracemalloc runs too, and snapshots taken at startup and
+close record the traced memory and the top allocation sites.
+
+The metrics file is written on close. It is small JSON with the same bucket
+bounds on every machine, and each session's counts are added to the file's,
+so files collected from evaluators can be compared directly:
+    python survey_metrics.py survey_metrics.json other_machine/survey_metrics.json
+"""
+
+import argparse
+import functools
+import json
+import os
+import platform
+import socket
+import sys
+import time
+import tracemalloc
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional
+
+METRICS_ENV = 'SURVEY_METRICS'
+TRACEMALLOC_ENV = 'SURVEY_TRACEMALLOC'
+METRICS_PATH = 'survey_metrics.json'
+METRICS_VERSION = 1
+
+# Upper bucket bounds in microseconds; a last bucket counts everything slower
+BUCKET_BOUNDS_US = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 16000, 25000, 50000,
+                    100000, 250000, 500000, 1000000, 2500000, 5000000)
+_BOUNDS_NS = tuple(bound * 1000 for bound in BUCKET_BOUNDS_US)
+
+# Allocation sites kept per tracemalloc snapshot
+TOP_ALLOCATIONS = 10
+
+
+class Histogram:
+    """Call count, total, max and fixed-bucket counts of durations in nanoseconds."""
+    
+    __slots__ = ('count', 'total_ns', 'max_ns', 'buckets')
+    
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets = [0] * (len(_BOUNDS_NS) + 1)
+    
+    def record(self, ns: int):
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        self.buckets[bisect_left(_BOUNDS_NS, ns)] += 1
+    
+    def merge(self, state: dict):
+        """Add the counts of a histogram written by state()."""
+        if len(state.get('buckets', ())) != len(self.buckets):
+            return
+        self.count += state['count']
+        self.total_ns += round(state['total_ms'] * 1e6)
+        self.max_ns = max(self.max_ns, round(state['max_ms'] * 1e6))
+        self.buckets = [a + b for a, b in zip(self.buckets, state['buckets'])]
+    
+    def state(self) -> dict:
+        return {
+            'count': self.count,
+            'total_ms': round(self.total_ns / 1e6, 3),
+            'max_ms': round(self.max_ns / 1e6, 3),
+            'buckets': self.buckets,
+        }
+
+
+def histogram_percentile(state: dict, q: float) -> Optional[float]:
+    """Upper bound in ms of the bucket holding quantile q (the max for the last bucket)."""
+    count = state.get('count', 0)
+    if not count:
+        return None
+    target = q * count
+    seen = 0
+    for bound, n in zip(BUCKET_BOUNDS_US, state['buckets']):
+        seen += n
+        if seen >= target:
+            return min(bound / 1000, state['max_ms'])
+    return state['max_ms']
+
+
+class Metrics:
+    """Histograms of the instrumented calls, plus optional tracemalloc snapshots."""
+    
+    def __init__(self, path: str = METRICS_PATH, trace_memory: bool = False):
+        self.path = path
+        self.trace_memory = trace_memory
+        self.histograms: Dict[str, Histogram] = {}
+        self.memory = {}  # snapshot label -> traced memory and top allocation sites
+        self.started = time.time()
+        self._snapshots = {}
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+    
+    def histogram(self, name: str) -> Histogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        return histogram
+    
+    def record(self, name: str, started_ns: int):
+        """Record the time since started_ns (a perf_counter_ns reading) under name."""
+        self.histogram(name).record(time.perf_counter_ns() - started_ns)
+    
+    def instrument(self, obj, names: Iterable[str], prefix: str = ''):
+        """Replace obj's bound methods with timed wrappers; calls through obj then land in the histograms."""
+        for name in names:
+            method = getattr(obj, name)
+            record = self.histogram(prefix + name).record
+            
+            @functools.wraps(method)
+            def timed(*args, _method=method, _record=record, **kwargs):
+                started = time.perf_counter_ns()
+                try:
+                    return _method(*args, **kwargs)
+                finally:
+                    _record(time.perf_counter_ns() - started)
+            setattr(obj, name, timed)
+    
+    def snapshot(self, label: str):
+        """Take a tracemalloc snapshot (when tracing) and keep its totals and top allocation sites."""
+        if not self.trace_memory or not tracemalloc.is_tracing():
+            return
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, '<frozen importlib._bootstrap>')])
+        current, peak = tracemalloc.get_traced_memory()
+        entry = {'current_kb': current // 1024, 'peak_kb': peak // 1024, 'top': self.top_allocations(snapshot)}
+        if self._snapshots:
+            # Growth since the first snapshot, largest first
+            first_label, first = next(iter(self._snapshots.items()))
+            entry['growth'] = {'since': first_label, 'top': [
+                {'site': str(stat.traceback), 'size_kb': stat.size_diff // 1024, 'count': stat.count_diff}
+                for stat in snapshot.compare_to(first, 'lineno')[:TOP_ALLOCATIONS]]}
+        self._snapshots[label] = snapshot
+        self.memory[label] = entry
+    
+    @staticmethod
+    def top_allocations(snapshot) -> List[dict]:
+        return [{'site': str(stat.traceback), 'size_kb': stat.size // 1024, 'count': stat.count}
+                for stat in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]]
+    
+    def state(self) -> dict:
+        return {
+            'version': METRICS_VERSION,
+            'host': socket.gethostname(),
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'frozen': bool(getattr(sys, 'frozen', False)),
+            'sessions': 1,
+            'uptime_s': round(time.time() - self.started, 1),
+            'bucket_bounds_us': list(BUCKET_BOUNDS_US),
+            'histograms': {name: histogram.state() for name, histogram in sorted(self.histograms.items())},
+            'memory': self.memory,
+        }
+    
+    def write(self) -> bool:
+        """Write the metrics file, adding the counts already in it from earlier sessions."""
+        state = self.state()
+        previous = read_metrics(self.path)
+        if previous is not None and previous.get('bucket_bounds_us') == state['bucket_bounds_us']:
+            state['sessions'] += previous.get('sessions', 1)
+            state['uptime_s'] = round(state['uptime_s'] + previous.get('uptime_s', 0), 1)
+            for name, earlier in previous.get('histograms', {}).items():
+                histogram = Histogram()
+                histogram.merge(earlier)
+                if name in self.histograms:
+                    histogram.merge(self.histograms[name].state())
+                state['histograms'][name] = histogram.state()
+            state['histograms'] = dict(sorted(state['histograms'].items()))
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, separators=(',', ':'))
+        except OSError as e:
+            print(f"Could not write metrics to {self.path}: {e}")
+            return False
+        return True
+
+
+def read_metrics(path: str) -> Optional[dict]:
+    try:
+        with open(path, encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if isinstance(state, dict) and state.get('version') == METRICS_VERSION else None
+
+
+def from_environment(path: Optional[str] = None, trace_memory: bool = False) -> Optional[Metrics]:
+    """Metrics if asked for by the arguments, SURVEY_METRICS or SURVEY_TRACEMALLOC; otherwise None."""
+    setting = os.environ.get(METRICS_ENV, '')
+    trace_memory = trace_memory or os.environ.get(TRACEMALLOC_ENV, '') not in ('', '0')
+    if path is None and setting not in ('', '0'):
+        path = METRICS_PATH if setting == '1' else setting
+    if path is None and not trace_memory:
+        return None
+    return Metrics(path or METRICS_PATH, trace_memory)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare survey metrics files collected from evaluator machines.")
+    parser.add_argument('files', nargs='+', help="survey_metrics.json files")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    for path in args.files:
+        metrics = read_metrics(path)
+        if metrics is None:
+            print(f"{path}: not a metrics file")
+            continue
+        print(f"{path}: {metrics['host']} ({metrics['platform']}), {metrics['sessions']} sessions")
+        for name, state in metrics['histograms'].items():
+            if not state['count']:
+                continue
+            p50, p95, p99 = (histogram_percentile(state, q) for q in (0.5, 0.95, 0.99))
+            print(f"  {name:<32} {state['count']:>7} calls  mean {state['total_ms'] / state['count']:8.2f} ms  "
+                  f"p50 <={p50:.2f}  p95 <={p95:.2f}  p99 <={p99:.2f}  max {state['max_ms']:.2f} ms")
+        for label, memory in metrics.get('memory', {}).items():
+            print(f"  memory at {label}: {memory['current_kb']} KB traced, peak {memory['peak_kb']} KB")
@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Shared survey server for sessions with many evaluators.
+
+One process loads the merged translation data once and hands out ranking
+and comparison items from shared question pools over a small JSON/HTTP API,
+so every evaluator works through the same seeded order instead of each
+repeating the whole dataset; once a pool has been handed out it starts over.
+Results are stored in SQLite by one writer thread that commits every row
+queued by any connection in a single transaction, and a request is answered
+once its row is committed. The running leaderboard and the adaptive pair
+model are shared by all evaluators.
+
+The survey app runs as a thin client when SURVEY_SERVER is set (see
+survey_client.py); benchmark_server.py generates load against a local server.
+
+API (JSON bodies and responses):
+    GET  /info                                             columns, corpus types, rows, adaptive pairs
+    POST /pool     {tab, source_lang, corpus_type}         -> {size}
+    POST /next     {tab, source_lang, corpus_type, pair_mode} -> item
+    GET  /rows/<id>                                        source, corpus_type and translations of a row
+    POST /results  {evaluator, row_id, judgments}          -> {id}
+    GET  /leaderboard                                      leaderboard totals (Leaderboard.state())
+
+Usage:
+    python survey_server.py [--host 0.0.0.0] [--port 8765] [--db survey_results.sqlite]
+    python survey_server.py --export results.csv
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import queue
+import random
+import sqlite3
+import sys
+import threading
+import time
+from http import HTTPStatus
+
+import pair_scheduler
+from leaderboard import Leaderboard, classify_row, RANK_VALUES, COMPARISON_VALUES
+from session_state import new_seed, pending_moves, replay_moves, shuffled_order, swap_positions
+from survey_data import CSV_PATH, SQLITE_PATH, open_dataset
+
+DEFAULT_PORT = 8765
+DB_PATH = 'survey_results.sqlite'
+TABS = ('ranking', 'comparison')
+# Rows committed per transaction at most; a batch is whatever is queued when the writer is free
+DEFAULT_BATCH_SIZE = 500
+MAX_BODY_BYTES = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    received REAL NOT NULL,
+    evaluator TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    row_id INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    corpus_type TEXT NOT NULL,
+    judgments TEXT NOT NULL
+);
+"""
+
+
+class RequestError(Exception):
+    """A request the server rejects, with the HTTP status to answer with."""
+    
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _resolve(future, result=None, error=None):
+    if not future.done():
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+
+class ResultStore:
+    """
+    SQLite results table fed through one writer thread.
+    
+    add() queues a row from the event loop and returns a future for its id.
+    The writer takes everything queued (up to batch_size rows) and commits
+    it in one transaction, so the cost of a commit is shared by every
+    evaluator who saved in the meantime. Meta values passed to
+    set_meta_later are written in that same transaction.
+    """
+    
+    def __init__(self, path=DB_PATH, batch_size=DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self.conn = self._connect()
+        self.conn.executescript(_SCHEMA)
+        self.queue = queue.Queue()
+        self.meta_lock = threading.Lock()
+        self.pending_meta = {}  # key -> value for the next committed batch
+        self.batches = 0
+        self.committed = 0
+        self.thread = threading.Thread(target=self._run, name='ResultStoreWriter', daemon=True)
+        self.thread.start()
+    
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL")
+        return conn
+    
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+    
+    def set_meta(self, key, value):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+    
+    def set_meta_later(self, key, value):
+        """Write a meta value with the next batch of results; the latest value for a key wins."""
+        with self.meta_lock:
+            self.pending_meta[key] = value
+    
+    def add(self, evaluator, kind, row_id, source, corpus_type, judgments):
+        """Queue a result row; the returned future resolves to its id once committed."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        record = (time.time(), evaluator, kind, row_id, source, corpus_type, json.dumps(judgments, ensure_ascii=False))
+        self.queue.put((record, loop, future))
+        return future
+    
+    def _run(self):
+        conn = self._connect()
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            if item is None:
+                break
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            ids = []
+            error = None
+            with self.meta_lock:
+                meta, self.pending_meta = self.pending_meta, {}
+            try:
+                with conn:
+                    for record, _, _ in batch:
+                        ids.append(conn.execute(
+                            "INSERT INTO results (received, evaluator, kind, row_id, source, corpus_type, judgments) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?)", record).lastrowid)
+                    conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                                     [(key, json.dumps(value)) for key, value in meta.items()])
+                self.batches += 1
+                self.committed += len(batch)
+            except sqlite3.Error as e:
+                error = e
+                with self.meta_lock:
+                    for key, value in meta.items():
+                        self.pending_meta.setdefault(key, value)
+            for n, (_, loop, future) in enumerate(batch):
+                try:
+                    loop.call_soon_threadsafe(_resolve, future, ids[n] if error is None else None, error)
+                except RuntimeError:
+                    pass  # The event loop has already stopped
+        conn.close()
+    
+    def rows(self):
+        """Yield (evaluator, kind, row_id, source, corpus_type, judgments) in commit order."""
+        for evaluator, kind, row_id, source, corpus_type, judgments in self.conn.execute(
+                "SELECT evaluator, kind, row_id, source, corpus_type, judgments FROM results ORDER BY id"):
+            yield evaluator, kind, row_id, source, corpus_type, json.loads(judgments)
+    
+    def close(self):
+        """Commit everything queued, then stop the writer."""
+        self.queue.put(None)
+        self.thread.join()
+        self.conn.close()
+
+
+def result_row(evaluator, source, corpus_type, judgments):
+    """A results-CSV style row (as written by the survey app) for the leaderboard and exports."""
+    return {'source': source, 'corpus_type': corpus_type, 'evaluator': evaluator, **judgments}
+
+
+class SurveyServer:
+    """Shared question pools, result validation, leaderboard and pair model behind the HTTP API."""
+    
+    def __init__(self, dataset, store):
+        self.dataset = dataset
+        self.store = store
+        self.columns = dataset.translation_columns
+        self.column_set = set(self.columns)
+        self.random = random.Random()
+        
+        # The seed and pool positions survive restarts (positions are saved with every batch
+        # of results), so pools carry on where they stopped
+        self.seed = store.get_meta('seed')
+        if store.get_meta('dataset_rows') != len(dataset) or not isinstance(self.seed, int):
+            self.seed = new_seed()
+            store.set_meta('seed', self.seed)
+            store.set_meta('dataset_rows', len(dataset))
+            store.set_meta('pools', {})
+        self.saved_pools = store.get_meta('pools', {})
+        self.pools = {}
+        
+        self.scheduler = pair_scheduler.PairScheduler(self.columns) if pair_scheduler.available() else None
+        self.leaderboard = Leaderboard(self.columns)
+        replayed = 0
+        for evaluator, kind, _, source, corpus_type, judgments in store.rows():
+            self.count_result(kind, result_row(evaluator, source, corpus_type, judgments))
+            replayed += 1
+        if replayed:
+            print(f"Loaded {replayed} stored results")
+    
+    def close(self):
+        """Save pool positions and commit queued results."""
+        self.store.set_meta('pools', self.pool_state())
+        self.store.close()
+    
+    # Question pools
+    
+    def pool(self, tab, source_lang, corpus_type):
+        """The shared pool for a tab and filter, created on first use in the seeded order."""
+        if tab not in TABS:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"tab must be one of {', '.join(TABS)}")
+        key = f"{tab}:{source_lang or ''}:{corpus_type or ''}"
+        pool = self.pools.get(key)
+        if pool is None:
+            # Comparison pools leave out rows with fewer than two distinct translations
+            row_ids = self.dataset.comparable_row_ids if tab == 'comparison' else self.dataset.row_ids
+            order = shuffled_order(row_ids(source_lang or None, corpus_type or None),
+                                   self.seed, tab, source_lang or '', corpus_type or '')
+            # moved: position -> row id placed there by adaptive selection
+            pool = self.pools[key] = {'order': order, 'cursor': 0, 'moved': {}}
+            saved = self.saved_pools.get(key)
+            if isinstance(saved, dict):
+                if isinstance(saved.get('moves'), list):
+                    replay_moves(order, saved['moves'], pool['moved'])
+                for a, b in saved.get('swaps', []):  # Saved before moves replaced the swap history
+                    if 0 <= min(a, b) and max(a, b) < len(order):
+                        swap_positions(order, pool['moved'], a, b)
+                pool['cursor'] = max(0, int(saved.get('cursor', 0)))
+        return pool
+    
+    def pool_state(self):
+        """Cursor and moves not yet reached of every pool, as saved in the store's meta table."""
+        pools = dict(self.saved_pools)  # Pools not used since the last start keep their positions
+        for key, pool in self.pools.items():
+            position = pool['cursor'] % len(pool['order']) if pool['order'] else 0
+            pools[key] = {'cursor': pool['cursor'], 'moves': pending_moves(pool['moved'], position)}
+        return pools
+    
+    def describe_row(self, row_id):
+        row = self.dataset.row(row_id)
+        return {
+            'row_id': row_id,
+            'source': row['source'],
+            'source_lang': row.get('source_lang', ''),
+            'corpus_type': row.get('corpus_type', ''),
+        }
+    
+    def next_item(self, tab, source_lang=None, corpus_type=None, pair_mode=None):
+        """
+        Hand out the next item of a pool, or None if the pool is empty.
+        
+        Ranking items carry all distinct translations, shuffled; comparison
+        items carry two different ones (comparison pools only hold rows that
+        have two), picked at random or, in adaptive mode, by the shared pair
+        model. Both map each shown column to the other columns with the same
+        text ('duplicates'), which the app saves the same judgment for.
+        """
+        pool = self.pool(tab, source_lang, corpus_type)
+        order = pool['order']
+        if not order:
+            return None
+        position = pool['cursor'] % len(order)
+        rounds = pool['cursor'] // len(order)
+        pool['cursor'] += 1
+        
+        if tab == 'ranking':
+            translations, duplicates = self.dataset.distinct_translations(order[position])
+            self.random.shuffle(translations)
+            return dict(self.describe_row(order[position]), translations=translations, duplicates=duplicates,
+                        round=rounds)
+        
+        pair = None
+        if pair_mode == 'adaptive' and self.scheduler is not None:
+            window = range(position, min(position + pair_scheduler.SELECTION_WINDOW, len(order)))
+            candidates = [self.dataset.distinct_translations(order[p]) for p in window]
+            chosen, columns = self.scheduler.choose([[col for col, _ in translations] for translations, _ in candidates])
+            duplicates = candidates[0][1]
+            if chosen is not None:
+                texts, duplicates = dict(candidates[chosen][0]), candidates[chosen][1]
+                pair = [(col, texts[col]) for col in columns]
+                self.random.shuffle(pair)
+                if chosen:
+                    swap_positions(order, pool['moved'], position, position + chosen)
+        else:
+            translations, duplicates = self.dataset.distinct_translations(order[position])
+            pair = self.random.sample(translations, 2) if len(translations) >= 2 else None
+        return dict(self.describe_row(order[position]), pair=pair, duplicates=duplicates, round=rounds)
+    
+    # Results
+    
+    def count_result(self, kind, row):
+        self.leaderboard.add_row(row)
+        if kind == 'pair' and self.scheduler is not None:
+            self.scheduler.update_groups([col for col, value in row.items() if value == 'better'],
+                                         [col for col, value in row.items() if value == 'worse'])
+    
+    async def add_result(self, evaluator, row_id, judgments):
+        """Validate and store one saved question; returns the stored id."""
+        if not isinstance(evaluator, str) or not evaluator.strip():
+            raise RequestError(HTTPStatus.BAD_REQUEST, "evaluator is required")
+        if not isinstance(row_id, int) or not 0 <= row_id < len(self.dataset):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "row_id is out of range")
+        if not isinstance(judgments, dict):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "judgments must be an object")
+        judgments = {col: value for col, value in judgments.items() if value}
+        unknown = [col for col in judgments if col not in self.column_set]
+        if unknown:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"unknown translation columns: {', '.join(unknown)}")
+        if any(value not in RANK_VALUES and value not in COMPARISON_VALUES for value in judgments.values()):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "judgments must be ranks or better/worse")
+        
+        row = self.describe_row(row_id)
+        row = result_row(evaluator.strip(), row['source'], row['corpus_type'], judgments)
+        classified = classify_row(row)
+        if classified is None:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "expected ranks, or at least one better and one worse")
+        kind = classified[0]
+        
+        self.store.set_meta_later('pools', self.pool_state())
+        result_id = await self.store.add(row['evaluator'], kind, row_id, row['source'], row['corpus_type'], judgments)
+        self.count_result(kind, row)
+        return result_id
+    
+    # HTTP
+    
+    def info(self):
+        return {
+            'columns': self.columns,
+            'corpus_types': sorted(c for c in self.dataset.filter_index.corpus_types if c),
+            'dataset_rows': len(self.dataset),
+            'adaptive': self.scheduler is not None,
+        }
+    
+    async def dispatch(self, method, path, body):
+        """Route one request; returns (status, JSON-serializable payload)."""
+        try:
+            request = json.loads(body) if body else {}
+        except ValueError:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "body is not valid JSON")
+        if not isinstance(request, dict):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "body must be a JSON object")
+        filters = (request.get('tab'), request.get('source_lang'), request.get('corpus_type'))
+        
+        if method == 'GET' and path == '/info':
+            return HTTPStatus.OK, self.info()
+        if method == 'POST' and path == '/pool':
+            return HTTPStatus.OK, {'size': len(self.pool(*filters)['order'])}
+        if method == 'POST' and path == '/next':
+            item = self.next_item(*filters, pair_mode=request.get('pair_mode'))
+            if item is None:
+                raise RequestError(HTTPStatus.NOT_FOUND, "no segments match the filters")
+            return HTTPStatus.OK, item
+        if method == 'GET' and path.startswith('/rows/'):
+            try:
+                row_id = int(path[len('/rows/'):])
+                return HTTPStatus.OK, dict(self.describe_row(row_id),
+                                           translations=self.dataset.available_translations(row_id))
+            except (ValueError, IndexError):
+                raise RequestError(HTTPStatus.NOT_FOUND, "no such row")
+        if method == 'POST' and path == '/results':
+            result_id = await self.add_result(request.get('evaluator'), request.get('row_id'), request.get('judgments'))
+            return HTTPStatus.OK, {'id': result_id}
+        if method == 'GET' and path == '/leaderboard':
+            return HTTPStatus.OK, self.leaderboard.state()
+        raise RequestError(HTTPStatus.NOT_FOUND, f"no route for {method} {path}")
+    
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one keep-alive connection."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length') or 0)
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                
+                if length > MAX_BODY_BYTES:
+                    status, payload = HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': "request body too large"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    try:
+                        status, payload = await self.dispatch(method, target.split('?')[0], body)
+                    except RequestError as e:
+                        status, payload = e.status, {'error': str(e)}
+                    except sqlite3.Error as e:
+                        status, payload = HTTPStatus.SERVICE_UNAVAILABLE, {'error': f"could not store the result: {e}"}
+                
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                        f"Content-Type: application/json; charset=utf-8\r\n"
+                        f"Content-Length: {len(data)}\r\n")
+                if not keep_alive:
+                    head += "Connection: close\r\n"
+                writer.write(head.encode('latin-1') + b"\r\n" + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass  # Malformed request or the client went away
+        except asyncio.CancelledError:
+            pass  # Server shutting down with the connection idle
+        finally:
+            writer.close()
+
+
+async def serve(survey, host='127.0.0.1', port=DEFAULT_PORT):
+    server = await asyncio.start_server(survey.handle_connection, host, port)
+    for sock in server.sockets:
+        address = sock.getsockname()
+        print(f"Serving {len(survey.dataset)} segments on http://{address[0]}:{address[1]}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def export_results(db_path, output_path):
+    """Write the stored results as a results CSV with an evaluator column; returns the row count."""
+    store = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    columns = {}
+    for (judgments,) in store.execute("SELECT judgments FROM results"):
+        columns.update(dict.fromkeys(json.loads(judgments)))
+    fieldnames = ['source', *columns, 'corpus_type', 'evaluator']
+    
+    count = 0
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, restval='')
+        writer.writeheader()
+        for evaluator, source, corpus_type, judgments in store.execute(
+                "SELECT evaluator, source, corpus_type, judgments FROM results ORDER BY id"):
+            writer.writerow(result_row(evaluator, source, corpus_type, json.loads(judgments)))
+            count += 1
+    store.close()
+    return count
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve one shared survey to many evaluators.")
+    parser.add_argument('--host', default='127.0.0.1',
+                        help="Address to listen on; 0.0.0.0 serves the LAN (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"Port; 0 picks a free one (default: {DEFAULT_PORT})")
+    parser.add_argument('--db', default=DB_PATH, help=f"SQLite results store (default: {DB_PATH})")
+    parser.add_argument('--data', default=CSV_PATH, help=f"Merged translation CSV (default: {CSV_PATH})")
+    parser.add_argument('--data-sqlite', default=SQLITE_PATH,
+                        help=f"Indexed store used instead of the CSV when present (default: {SQLITE_PATH})")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Most results committed per transaction (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument('--export', default=None, metavar='CSV',
+                        help="Write the stored results to a CSV and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.export:
+        if not os.path.exists(args.db):
+            print(f"{args.db} not found!")
+            sys.exit(1)
+        print(f"Exported {export_results(args.db, args.export)} results to {args.export}")
+        return
+    if not os.path.exists(args.data) and not os.path.exists(args.data_sqlite):
+        print(f"{args.data} not found!")
+        sys.exit(1)
+    
+    survey = SurveyServer(open_dataset(args.data, args.data_sqlite), ResultStore(args.db, args.batch_size))
+    try:
+        asyncio.run(serve(survey, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        survey.close()
+        print(f"Stopped; {survey.store.committed} results committed in {survey.store.batches} transactions")
+
+
+if __name__ == "__main__":
+    main()
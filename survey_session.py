@@ -0,0 +1,455 @@
+"""
+Headless survey engine.
+
+SurveySession is the survey without its widgets: the dataset, each tab's
+filters, seeded question order and position, the current question's
+translations and rankings, the current comparison pair and choice, result
+rows saved through the result writer (or sent to a survey server) and the
+resumable session file. A text that several models produced (up to
+whitespace) is shown once, and its judgment is written for every one of
+those models. TranslationSurveyApp drives a SurveySession from its
+widgets; benchmark_session.py drives one from a script.
+"""
+
+import random
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+import pair_scheduler
+import survey_client
+from results_writer import RESULTS_PATH, ResultWriter
+from session_state import (default_session_path, load_session, new_seed, pending_moves, replay_moves, save_session,
+                           shuffled_order, swap_positions)
+from survey_data import LANGUAGE_CODES, open_dataset
+
+ALL_CORPORA = "All"
+LANGUAGE_FILTERS = ["Both", "English", "French"]
+
+# Comparison pair selection: random pairs, or adaptive (needs NumPy, see pair_scheduler.py)
+RANDOM_PAIRS = "Random"
+ADAPTIVE_PAIRS = "Adaptive"
+PAIR_MODES = [RANDOM_PAIRS, ADAPTIVE_PAIRS]
+
+RANKING_OPTIONS = ['', 'good', 'bad', 'best', 'unknown']
+
+
+class SurveySession:
+    """Filters, question order, current items and saved results of the ranking and comparison tabs."""
+    
+    def __init__(self, dataset=None, server=None, results_path: str = RESULTS_PATH,
+                 session_path: Optional[str] = None, result_writer: Optional[ResultWriter] = None):
+        # Items come from a shared survey server when one is given (see survey_client.py),
+        # otherwise from the indexed SQLite store if present, otherwise the CSV
+        self.server = server
+        if dataset is None:
+            dataset = server.dataset() if server is not None else open_dataset()
+        self.dataset = dataset
+        self.corpus_options = [ALL_CORPORA] + sorted(c for c in dataset.filter_index.corpus_types if c)
+        
+        # Dynamically determine translation columns from CSV headers
+        # (every column except source, source_lang and corpus_type)
+        self.translation_columns = dataset.translation_columns
+        self.result_listeners: List[Callable[[Dict[str, str]], None]] = []  # Called with every saved row
+        
+        # Resume the previous session's order, filters and positions if there is one
+        self.session_path = session_path or default_session_path(results_path)
+        session = load_session(self.session_path, len(dataset)) or {}
+        self.session_seed = session.get('seed', new_seed())
+        ranking = self.restore_tab_state(session.get('ranking'))
+        comparison = self.restore_tab_state(session.get('comparison'))
+        
+        self.current_language_filter, self.current_corpus_filter = ranking[:2]
+        
+        # Apply initial filter and rebuild the seeded question order
+        self.apply_filters()
+        self.current_position = min(ranking[2], max(len(self.question_indices) - 1, 0))
+        self.prefetched = None  # Next question, prepared in idle time
+        self.current_index = None
+        self.current_source = ''
+        self.rankings = {}  # Column name -> rank for the current question
+        self.duplicates = {}  # Shown column -> other columns with the same text
+        
+        # Initialize comparison mode variables
+        self.comp_current_language_filter, self.comp_current_corpus_filter = comparison[:2]
+        self.apply_comp_filters()
+        comparison_state = session.get('comparison') if isinstance(session.get('comparison'), dict) else {}
+        if self.server is None and (comparison_state.get('language'), comparison_state.get('corpus')) == comparison[:2]:
+            self.replay_comp_moves(comparison_state)
+        self.comp_current_position = min(comparison[2], max(len(self.comp_question_indices) - 1, 0))
+        self.comp_prefetched = None
+        self.comp_current_index = None
+        self.comp_current_source = ''
+        self.comp_pair = None  # The 2 (column, text) translations shown, A first
+        self.comp_duplicates = {}
+        self.comp_choice = None  # 1 or 2 once the evaluator has picked the better one
+        
+        # Online Bradley-Terry model behind adaptive pair selection, kept across sessions
+        # (a survey server keeps one model shared by every evaluator instead)
+        self.pair_scheduler = None
+        self.comp_pair_mode = RANDOM_PAIRS
+        if self.server is None and pair_scheduler.available():
+            self.pair_scheduler = pair_scheduler.PairScheduler(self.translation_columns, session.get('pair_model'))
+        adaptive = self.pair_scheduler is not None or (self.server is not None and self.server.adaptive)
+        self.pair_modes = PAIR_MODES if adaptive else [RANDOM_PAIRS]
+        if comparison_state.get('pair_mode') in self.pair_modes:
+            self.comp_pair_mode = comparison_state['pair_mode']
+        
+        # Saves are journaled locally and appended to the results CSV in the background
+        self.result_writer = result_writer or ResultWriter(results_path)
+        if self.result_writer.recovered:
+            print(f"Recovered {self.result_writer.recovered} unsaved result rows from the last session")
+        if self.result_writer.deferred:
+            print(f"Could not write {len(self.result_writer.deferred)} unsaved result rows from the last session "
+                  f"to {self.result_writer.path} ({self.result_writer.last_error}); retrying in the background")
+    
+    def restore_tab_state(self, tab_state):
+        """(language filter, corpus filter, position) from a saved session tab, or the defaults"""
+        tab_state = tab_state if isinstance(tab_state, dict) else {}
+        language_filter = tab_state.get('language')
+        corpus_filter = tab_state.get('corpus')
+        position = tab_state.get('position')
+        if language_filter not in LANGUAGE_FILTERS or corpus_filter not in self.corpus_options:
+            return "Both", ALL_CORPORA, 0
+        return language_filter, corpus_filter, position if isinstance(position, int) and position > 0 else 0
+    
+    def save_session_state(self):
+        """
+        Record the seed, filters and positions so the next launch resumes here
+        
+        The file is written by the result writer's thread, so the Next path
+        only builds this small dict.
+        """
+        self.result_writer.save_later(partial(save_session, self.session_path, {
+            'seed': self.session_seed,
+            'dataset_rows': len(self.dataset),
+            'ranking': {
+                'language': self.current_language_filter,
+                'corpus': self.current_corpus_filter,
+                'position': self.current_position,
+            },
+            'comparison': {
+                'language': self.comp_current_language_filter,
+                'corpus': self.comp_current_corpus_filter,
+                'position': self.comp_current_position,
+                'pair_mode': self.comp_pair_mode,
+                'moves': pending_moves(self.comp_moved, self.comp_current_position),
+            },
+            'pair_model': self.pair_scheduler.state() if self.pair_scheduler is not None else None,
+        }))
+    
+    def filter_codes(self, language_filter, corpus_filter):
+        """(source_lang, corpus_type) for the filter labels; None matches every value"""
+        return LANGUAGE_CODES.get(language_filter), None if corpus_filter == ALL_CORPORA else corpus_filter
+    
+    def filtered_row_ids(self, language_filter, corpus_filter):
+        """Row ids matching the language and corpus filter labels (an index lookup, no row copies)"""
+        return self.dataset.row_ids(*self.filter_codes(language_filter, corpus_filter))
+    
+    def apply_filters(self):
+        """Filter data based on selected language and corpus and randomize question order"""
+        if self.server is not None:
+            # The server hands out items from its shared pool; positions only count them
+            self.question_indices = range(self.server.pool_size(
+                'ranking', *self.filter_codes(self.current_language_filter, self.current_corpus_filter)))
+            return
+        # Question indices are row ids in the dataset, shuffled by the session seed
+        self.question_indices = shuffled_order(
+            self.filtered_row_ids(self.current_language_filter, self.current_corpus_filter),
+            self.session_seed, 'ranking', self.current_language_filter, self.current_corpus_filter)
+    
+    def apply_comp_filters(self):
+        """Filter data based on selected language and corpus for comparison tab"""
+        self.comp_moved = {}  # Position -> row id moved there by adaptive selection
+        if self.server is not None:
+            self.comp_question_indices = range(self.server.pool_size(
+                'comparison', *self.filter_codes(self.comp_current_language_filter, self.comp_current_corpus_filter)))
+            return
+        # Only rows with at least two distinct translations can be compared
+        self.comp_question_indices = shuffled_order(
+            self.dataset.comparable_row_ids(
+                *self.filter_codes(self.comp_current_language_filter, self.comp_current_corpus_filter)),
+            self.session_seed, 'comparison', self.comp_current_language_filter, self.comp_current_corpus_filter)
+    
+    def replay_comp_moves(self, comparison_state):
+        """Reapply the item moves adaptive selection made to the saved comparison order"""
+        order = self.comp_question_indices
+        if isinstance(comparison_state.get('moves'), list):
+            replay_moves(order, comparison_state['moves'], self.comp_moved)
+            return
+        # Session files from before moves were saved hold the whole swap history instead
+        swaps = comparison_state.get('swaps')
+        for swap in swaps if isinstance(swaps, list) else []:
+            if (isinstance(swap, list) and len(swap) == 2 and all(isinstance(p, int) for p in swap)
+                    and 0 <= min(swap) and max(swap) < len(order)):
+                swap_positions(order, self.comp_moved, *swap)
+    
+    # Ranking
+    
+    def set_filters(self, language_filter, corpus_filter):
+        """Switch the ranking filters, saving the current rankings first; False if nothing changed"""
+        if (language_filter, corpus_filter) == (self.current_language_filter, self.current_corpus_filter):
+            return False
+        self.save_current_rankings()
+        self.current_language_filter, self.current_corpus_filter = language_filter, corpus_filter
+        self.apply_filters()
+        self.current_position = 0
+        return True
+    
+    def has_question(self):
+        return self.current_position < len(self.question_indices)
+    
+    def has_next_question(self):
+        return self.current_position < len(self.question_indices) - 1
+    
+    def prepare_question(self, position):
+        """Decode a row and pick and shuffle its translations"""
+        if self.server is not None:
+            item = self.server.next_item(
+                'ranking', *self.filter_codes(self.current_language_filter, self.current_corpus_filter))
+            return dict(item, order=self.question_indices, position=position)
+        row_id = self.question_indices[position]
+        translations, duplicates = self.dataset.distinct_translations(row_id)
+        
+        # Randomize the order
+        random.shuffle(translations)
+        return {
+            'order': self.question_indices,
+            'position': position,
+            'row_id': row_id,
+            'source': self.dataset.row(row_id)['source'],
+            'translations': translations,
+            'duplicates': duplicates,
+        }
+    
+    def is_current_item(self, item, position):
+        return item is not None and item['order'] is self.question_indices and item['position'] == position
+    
+    def prefetch_next_question(self):
+        """Prepare the next question while the evaluator reads this one"""
+        if self.server is not None:
+            return  # Asking the server claims an item from the shared pool, which a dropped prefetch would skip
+        next_position = self.current_position + 1
+        if next_position < len(self.question_indices) and not self.is_current_item(self.prefetched, next_position):
+            self.prefetched = self.prepare_question(next_position)
+    
+    def load_question(self):
+        """Make the question at the current position current (prefetched if possible) and return it"""
+        item = self.prefetched
+        if not self.is_current_item(item, self.current_position):
+            item = self.prepare_question(self.current_position)
+        self.prefetched = None
+        
+        self.current_index = item['row_id']
+        self.current_source = item['source']
+        # Rankings are tracked by original column name, whichever card shows them
+        self.rankings = {col_name: '' for col_name, _ in item['translations']}
+        self.duplicates = item.get('duplicates') or {}
+        self.save_session_state()
+        return item
+    
+    def save_current_rankings(self):
+        """Save current rankings if any rankings exist; returns the saved row or None"""
+        current_rankings = self.rankings
+        
+        # Only save if any rankings were made
+        if not any(ranking for ranking in current_rankings.values()):
+            return None
+        
+        # Create result row matching original CSV structure
+        current_row = self.dataset.row(self.current_index)
+        result_row = {
+            'source': current_row['source'],
+            'corpus_type': current_row.get('corpus_type', '')
+        }
+        
+        # Add rankings for each translation column; a text shown once counts for every column that produced it
+        for col in self.translation_columns:
+            result_row[col] = current_rankings.get(col, '')
+        for col, duplicate_columns in self.duplicates.items():
+            for duplicate in duplicate_columns:
+                result_row[duplicate] = current_rankings.get(col, '')
+        
+        self.record_result(result_row, self.current_index)
+        return result_row
+    
+    def next_question(self):
+        """Save the current rankings and move on; False if this was the last question"""
+        self.save_current_rankings()
+        
+        if self.has_next_question():
+            self.current_position += 1
+            return True
+        return False
+    
+    # Comparison
+    
+    def set_comp_filters(self, language_filter, corpus_filter):
+        """Switch the comparison filters; False if nothing changed"""
+        if (language_filter, corpus_filter) == (self.comp_current_language_filter, self.comp_current_corpus_filter):
+            return False
+        self.comp_current_language_filter, self.comp_current_corpus_filter = language_filter, corpus_filter
+        self.apply_comp_filters()
+        self.comp_current_position = 0
+        return True
+    
+    def set_pair_mode(self, pair_mode):
+        """Switch between random and adaptive pairs from the next comparison on"""
+        self.comp_pair_mode = pair_mode
+        self.comp_prefetched = None
+        self.save_session_state()
+    
+    def has_comparison(self):
+        return self.comp_current_position < len(self.comp_question_indices)
+    
+    def has_next_comparison(self):
+        return self.comp_current_position < len(self.comp_question_indices) - 1
+    
+    def prepare_comparison(self, position):
+        """Decode a row and pick the 2 translations to compare"""
+        if self.server is not None:
+            item = self.server.next_item(
+                'comparison', *self.filter_codes(self.comp_current_language_filter, self.comp_current_corpus_filter),
+                pair_mode=self.comp_pair_mode.lower())
+            return dict(item, order=self.comp_question_indices, position=position)
+        if self.comp_pair_mode == ADAPTIVE_PAIRS and self.pair_scheduler is not None:
+            return self.prepare_adaptive_comparison(position)
+        row_id = self.comp_question_indices[position]
+        translations, duplicates = self.dataset.distinct_translations(row_id)
+        return {
+            'order': self.comp_question_indices,
+            'position': position,
+            'row_id': row_id,
+            'source': self.dataset.row(row_id)['source'],
+            # Select 2 random translations with different texts
+            'pair': random.sample(translations, 2) if len(translations) >= 2 else None,
+            'duplicates': duplicates,
+        }
+    
+    def prepare_adaptive_comparison(self, position):
+        """Pick the upcoming item and pair whose judgment is expected to be most informative"""
+        order = self.comp_question_indices
+        window = range(position, min(position + pair_scheduler.SELECTION_WINDOW, len(order)))
+        candidates = [self.dataset.distinct_translations(order[p]) for p in window]
+        chosen, pair = self.pair_scheduler.choose([[col for col, _ in translations] for translations, _ in candidates])
+        
+        selected = None
+        if chosen is None:
+            chosen = 0
+        else:
+            texts = dict(candidates[chosen][0])
+            selected = [(col, texts[col]) for col in pair]
+            random.shuffle(selected)  # Either translation may be shown as A
+        if chosen:
+            # Move the chosen item to this position so the tab still walks the order
+            swap_positions(order, self.comp_moved, position, position + chosen)
+        
+        row_id = order[position]
+        return {
+            'order': order,
+            'position': position,
+            'row_id': row_id,
+            'source': self.dataset.row(row_id)['source'],
+            'pair': selected,
+            'duplicates': candidates[chosen][1] if candidates else {},
+        }
+    
+    def prefetch_next_comparison(self):
+        """Prepare the next comparison while the evaluator reads this one"""
+        if self.comp_pair_mode == ADAPTIVE_PAIRS:
+            return  # The next pair depends on this judgment
+        if self.server is not None:
+            return  # As for questions, items are only claimed from the shared pool when shown
+        next_position = self.comp_current_position + 1
+        if next_position < len(self.comp_question_indices):
+            self.comp_prefetched = self.prepare_comparison(next_position)
+    
+    def load_comparison(self):
+        """Make the comparison at the current position current (prefetched if possible) and return it"""
+        item = self.comp_prefetched
+        if not (item is not None and item['order'] is self.comp_question_indices
+                and item['position'] == self.comp_current_position):
+            item = self.prepare_comparison(self.comp_current_position)
+        self.comp_prefetched = None
+        self.comp_current_index = item['row_id']
+        self.comp_current_source = item['source']
+        self.comp_pair = item['pair']
+        self.comp_duplicates = item.get('duplicates') or {}
+        self.comp_choice = None
+        self.save_session_state()
+        return item
+    
+    def save_current_comparison(self):
+        """Save the comparison result if a choice was made; returns the saved row or None"""
+        if self.comp_pair is None or self.comp_choice is None:
+            return None  # No choice made
+        
+        current_row = self.dataset.row(self.comp_current_index)
+        # Each side stands for every column that produced its text
+        translation1_cols, translation2_cols = (
+            [col] + self.comp_duplicates.get(col, []) for col, _ in self.comp_pair)
+        if self.comp_choice == 1:
+            better_cols, worse_cols = translation1_cols, translation2_cols
+        else:
+            better_cols, worse_cols = translation2_cols, translation1_cols
+        
+        # Create result row
+        result_row = {
+            'source': current_row['source'],
+            'corpus_type': current_row.get('corpus_type', '')
+        }
+        
+        # Set better/worse based on choice
+        for col in self.translation_columns:
+            if col in better_cols:
+                result_row[col] = 'better'
+            elif col in worse_cols:
+                result_row[col] = 'worse'
+            else:
+                result_row[col] = ''
+        
+        # Write to same results file as ranking mode
+        self.record_result(result_row, self.comp_current_index)
+        
+        # Every judgment, random or adaptive, refines the pair model
+        if self.pair_scheduler is not None:
+            self.pair_scheduler.update_groups(better_cols, worse_cols)
+        
+        # Clear choice for next comparison
+        self.comp_choice = None
+        return result_row
+    
+    def comp_next_question(self):
+        """Save the current comparison and move on; False if this was the last one"""
+        self.save_current_comparison()
+        
+        if self.has_next_comparison():
+            self.comp_current_position += 1
+            return True
+        return False
+    
+    def choose_better(self, choice):
+        """Record that translation A (1) or B (2) is better and move to the next comparison"""
+        self.comp_choice = choice
+        return self.comp_next_question()
+    
+    # Results
+    
+    def record_result(self, result_row, row_id):
+        """Save a result row and pass it to the result listeners"""
+        submitted = False
+        if self.server is not None:
+            try:
+                self.server.submit(row_id, result_row)
+                submitted = True
+            except survey_client.ServerError as e:
+                print(f"Could not send the result to the survey server, saving it locally: {e}")
+        if not submitted:
+            # Journal the row; the writer thread appends it to the results CSV
+            self.result_writer.submit(['source'] + self.translation_columns + ['corpus_type'], result_row)
+        
+        for listener in self.result_listeners:
+            listener(result_row)
+    
+    def close(self):
+        """Wait for queued results to reach the CSV; False if some could not be written"""
+        return self.result_writer.close()
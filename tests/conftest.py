@@ -0,0 +1,64 @@
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+# The survey modules live at the top of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from results_writer import ResultWriter  # noqa: E402
+from survey_client import SurveyClient  # noqa: E402
+from survey_data import CompactTable  # noqa: E402
+from survey_server import ResultStore, SurveyServer  # noqa: E402
+
+MODELS = ['model_a', 'model_b', 'model_c']
+
+
+@pytest.fixture
+def dataset_csv(tmp_path):
+    """A small merged CSV: 12 segments in two languages and two corpora, every third with a duplicate text."""
+    lines = ['source,source_lang,corpus_type,' + ','.join(MODELS)]
+    for n in range(12):
+        texts = [f"{model} says {n}" for model in MODELS]
+        if n % 3 == 0:
+            texts[2] = texts[0]
+        lines.append(f"segment {n},{'en' if n % 2 else 'fr'},{'news' if n < 6 else 'web'}," + ','.join(texts))
+    path = tmp_path / 'merged_translation_data.csv'
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return str(path)
+
+
+@pytest.fixture
+def result_writer(tmp_path):
+    writer = ResultWriter(str(tmp_path / 'translation_quality_results.csv'), str(tmp_path / 'journal'),
+                          flush_interval=0.01)
+    yield writer
+    writer.close()
+
+
+@pytest.fixture
+def served_survey(tmp_path, dataset_csv):
+    """(SurveyServer, SurveyClient) with the server answering HTTP on a thread's event loop."""
+    survey = SurveyServer(CompactTable(dataset_csv), ResultStore(str(tmp_path / 'survey_results.sqlite')))
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server = asyncio.run_coroutine_threadsafe(
+        asyncio.start_server(survey.handle_connection, '127.0.0.1', 0), loop).result()
+    port = server.sockets[0].getsockname()[1]
+    yield survey, SurveyClient(f"http://127.0.0.1:{port}", 'alice', timeout=5)
+    server.close()
+    asyncio.run_coroutine_threadsafe(_cancel_connections(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+    survey.close()
+
+
+async def _cancel_connections():
+    tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from analyze_results import ChunkParser, analyze, bootstrap_chunk, chunk_indices, keep_latest
+
+HEADER = ['source', 'model_a', 'model_b', 'model_c', 'model_d', 'corpus_type']
+
+
+def parse(rows):
+    parser = ChunkParser(HEADER)
+    return parser, parser.parse([row.split(',') for row in rows], 0)
+
+
+def latest(chunk):
+    latest_rank = dict(zip(chunk['rank_keys'].tolist(), chunk['rank_rows'].tolist()))
+    latest_pair = dict(zip(chunk['pair_keys'].tolist(), chunk['pair_rows'].tolist()))
+    return keep_latest(chunk, latest_rank, latest_pair)
+
+
+def test_keep_latest_counts_the_last_save_of_each_question():
+    _, chunk = parse([
+        's1,good,bad,,,news',
+        's2,best,,,,news',
+        's1,bad,,,,news',
+        's1,better,worse,,,news',
+        's1,worse,better,,,news',
+        's1,,,better,worse,news',
+    ])
+    kept = latest(chunk)
+    assert kept['rank_rows'].tolist() == [1, 2]
+    # The second comparison of model_a and model_b replaces the first; model_c v model_d is its own question
+    assert kept['pair_rows'].tolist() == [4, 5]
+    assert kept['pair_winner'].tolist() == [1, 2]
+    assert kept['superseded'] == 2
+
+
+def test_bootstrap_weights_the_verdicts_of_one_comparison_row_together():
+    _, chunk = parse(['s1,better,better,worse,worse,news', 's2,better,worse,,,news'])
+    judgment_rows, rank_flat, verdict_rows, pair_flat = chunk_indices(chunk, 4)
+    assert verdict_rows.tolist() == [0, 0, 0, 0, 1]
+    
+    _, wins = bootstrap_chunk((0, 0, 50, 1, 4, judgment_rows, 0, rank_flat, verdict_rows, 2, pair_flat,
+                               chunk['pair_weight']))
+    fanned_out = wins[:, 0, [0, 0, 1, 1], [2, 3, 2, 3]]
+    assert (fanned_out == fanned_out[:, :1]).all()
+    assert len(np.unique(fanned_out[:, 0])) > 1  # Replicates differ
+
+
+
+def test_a_fanned_out_comparison_row_counts_one_win(tmp_path):
+    path = tmp_path / 'results.csv'
+    path.write_text(','.join(HEADER) + '\n'
+                    + 's1,better,better,worse,worse,news\n'
+                    + 's2,worse,,better,,news\n', encoding='utf-8')
+    report = analyze(str(path), bootstrap=0)
+    assert report['totals']['comparisons'] == 2
+    assert report['overall']['model_a']['wins'] == 0.5
+    assert report['overall']['model_a']['losses'] == 1
+    assert report['overall']['model_c']['wins'] == 1
+    assert report['overall']['model_c']['losses'] == 0.5
+
+def test_analyze_keeps_only_the_latest_save_by_default(tmp_path):
+    path = tmp_path / 'results.csv'
+    path.write_text(','.join(HEADER) + '\n'
+                    + 's1,good,bad,,,news\n'
+                    + 's1,best,,,,news\n'
+                    + 's2,better,worse,,,web\n', encoding='utf-8')
+    report = analyze(str(path), bootstrap=20)
+    assert report['totals']['superseded'] == 1
+    assert report['overall']['model_a']['ranked'] == 1
+    assert report['overall']['model_a']['distribution']['best'] == 1
+    assert report['overall']['model_b']['ranked'] == 0
+    assert report['by_corpus']['web']['model_a']['win_rate'] == 1
+    assert report['overall']['model_a']['win_rate_ci'][0] == pytest.approx(1)
+    
+    every_row = analyze(str(path), bootstrap=0, keep='all')
+    assert every_row['overall']['model_a']['ranked'] == 2
+
+
+def test_analyze_reads_a_file_saved_with_a_byte_order_mark(tmp_path):
+    path = tmp_path / 'results.csv'
+    path.write_text(','.join(HEADER) + '\n' + 's1,good,bad,,,news\n' + 's1,best,,,,news\n', encoding='utf-8-sig')
+    report = analyze(str(path), bootstrap=0)
+    assert list(report['overall']) == HEADER[1:5]
+    assert report['totals']['superseded'] == 1
@@ -0,0 +1,66 @@
+import csv
+import shutil
+
+from consolidate_results import consolidate_results
+
+
+def write_results(path, lines):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(''.join(line + '\n' for line in lines), encoding='utf-8')
+
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def test_duplicate_rows_of_one_evaluator_are_dropped(tmp_path):
+    inputs = tmp_path / 'evaluators'
+    alice = inputs / 'alice' / 'translation_quality_results.csv'
+    write_results(alice, ['source,model_a,model_b,corpus_type', 's1,good,bad,news', 's2,best,,news',
+                          's1,good,bad,news'])
+    # The same file collected a second time, named after its evaluator
+    backup = inputs / 'backup' / 'alice_translation_quality_results.csv'
+    backup.parent.mkdir()
+    shutil.copy(alice, backup)
+    # Another evaluator's identical judgment is kept
+    write_results(inputs / 'bob' / 'translation_quality_results.csv',
+                  ['source,model_a,model_b,corpus_type', 's1,good,bad,news'])
+    
+    output = tmp_path / 'out' / 'consolidated.csv'
+    summary = consolidate_results([str(inputs)], str(output), workers=1, evaluator_source='filename')
+    
+    rows = read_rows(output)
+    assert [(row['evaluator'], row['source']) for row in rows] == [('alice', 's1'), ('alice', 's2'), ('bob', 's1')]
+    assert summary['rows'] == 3
+    assert summary['duplicates'] == 4
+    assert summary['evaluators'] == {'alice': 2, 'bob': 1}
+    assert summary['identical_files'] == [[str(alice), str(backup)]]
+
+
+def test_files_with_different_columns_are_aligned_before_comparing(tmp_path):
+    write_results(tmp_path / 'in' / 'carol' / 'old_translation_quality_results.csv',
+                  ['source,model_a,corpus_type', 's1,good,news'])
+    write_results(tmp_path / 'in' / 'carol' / 'new_translation_quality_results.csv',
+                  ['source,model_b,model_a,corpus_type', 's1,,good,news', 's1,bad,good,news'])
+    
+    output = tmp_path / 'consolidated.csv'
+    summary = consolidate_results([str(tmp_path / 'in')], str(output), workers=1, partitions=2)
+    
+    assert summary['columns'] == ['source', 'model_b', 'model_a', 'corpus_type', 'evaluator', 'file_id']
+    assert [(row['model_a'], row['model_b']) for row in read_rows(output)] == [('good', ''), ('good', 'bad')]
+    assert summary['duplicates'] == 1
+
+
+def test_a_file_saved_with_a_byte_order_mark_keeps_its_source_column(tmp_path):
+    (tmp_path / 'in' / 'dave').mkdir(parents=True)
+    (tmp_path / 'in' / 'dave' / 'translation_quality_results.csv').write_text(
+        'source,model_a,corpus_type\ns1,good,news\n', encoding='utf-8-sig')
+    write_results(tmp_path / 'in' / 'erin' / 'translation_quality_results.csv',
+                  ['source,model_a,corpus_type', 's2,bad,news'])
+    
+    output = tmp_path / 'consolidated.csv'
+    summary = consolidate_results([str(tmp_path / 'in')], str(output), workers=1)
+    
+    assert summary['columns'] == ['source', 'model_a', 'corpus_type', 'evaluator', 'file_id']
+    assert [(row['source'], row['evaluator']) for row in read_rows(output)] == [('s1', 'dave'), ('s2', 'erin')]
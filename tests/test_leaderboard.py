@@ -0,0 +1,73 @@
+import pytest
+
+from leaderboard import Leaderboard, classify_row
+
+
+def ranking(source, **ranks):
+    return {'source': source, 'corpus_type': 'news', 'model_a': '', 'model_b': '', **ranks}
+
+
+def test_a_later_ranking_of_the_same_question_replaces_the_earlier_one():
+    leaderboard = Leaderboard()
+    leaderboard.add_row(ranking('s1', model_a='good', model_b='bad'))
+    leaderboard.add_row(ranking('s2', model_a='best'))
+    leaderboard.add_row(ranking('s1', model_a='bad'))
+    
+    assert leaderboard.rows == 3
+    assert leaderboard.superseded == 1
+    assert leaderboard.rank_counts['model_a'] == {'good': 0, 'bad': 1, 'best': 1, 'unknown': 0}
+    assert leaderboard.rank_counts['model_b'] == {'good': 0, 'bad': 0, 'best': 0, 'unknown': 0}
+
+
+def test_a_later_verdict_on_the_same_pair_replaces_the_earlier_one():
+    leaderboard = Leaderboard()
+    leaderboard.add_row(ranking('s1', model_a='better', model_b='worse'))
+    leaderboard.add_row(ranking('s1', model_a='worse', model_b='better'))
+    leaderboard.add_row(ranking('s2', model_a='better', model_b='worse'))
+    
+    assert leaderboard.superseded == 1
+    assert leaderboard.wins == {('model_a', 'model_b'): 1, ('model_b', 'model_a'): 1}
+
+
+
+def test_a_fanned_out_comparison_counts_one_win_between_its_verdicts():
+    leaderboard = Leaderboard()
+    leaderboard.add_row(ranking('s1', model_a='better', model_b='better', model_c='worse'))
+    
+    assert leaderboard.wins == {('model_a', 'model_c'): 0.5, ('model_b', 'model_c'): 0.5}
+    assert {entry['column']: entry['losses'] for entry in leaderboard.summary()}['model_c'] == 1
+    
+    leaderboard.add_row(ranking('s1', model_a='worse', model_c='better'))
+    assert leaderboard.superseded == 1
+    assert leaderboard.state()['wins'] == [['model_b', 'model_c', 0.5], ['model_c', 'model_a', 1]]
+
+def test_questions_are_kept_apart_by_evaluator():
+    leaderboard = Leaderboard()
+    leaderboard.add_row(ranking('s1', model_a='good', evaluator='alice'))
+    leaderboard.add_row(ranking('s1', model_a='bad', evaluator='bob'))
+    
+    assert leaderboard.superseded == 0
+    assert leaderboard.rank_counts['model_a']['good'] == leaderboard.rank_counts['model_a']['bad'] == 1
+
+
+def test_from_csv_matches_adding_rows(tmp_path):
+    path = tmp_path / 'results.csv'
+    path.write_text("source,model_a,model_b,corpus_type\n"
+                    "s1,good,bad,news\n"
+                    "s1,best,,news\n"
+                    "s2,better,worse,news\n", encoding='utf-8')
+    leaderboard = Leaderboard.from_csv(str(path))
+    
+    assert leaderboard.rows == 3 and leaderboard.superseded == 1
+    assert leaderboard.rank_counts['model_a']['best'] == 1
+    assert leaderboard.rank_counts['model_b']['bad'] == 0
+    assert leaderboard.wins == {('model_a', 'model_b'): 1}
+
+
+@pytest.mark.parametrize('row', [
+    ranking('s1'),
+    ranking('s1', model_a='better'),
+    ranking('s1', model_a='excellent'),
+])
+def test_rows_without_judgments_are_not_counted(row):
+    assert classify_row(row) is None
@@ -0,0 +1,60 @@
+import csv
+
+import pytest
+
+from benchmark_merge import generate_dataset
+from merge_csv import merge_csv_folder
+
+
+def merged_bytes(inputs, output, **options):
+    merge_csv_folder(str(inputs), str(output), **options)
+    return output.read_bytes()
+
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.mark.parametrize('options', [
+    {'streaming': True},
+    {'workers': 2},
+    {'streaming': True, 'workers': 2},
+    {'incremental': True},
+    {'incremental': True, 'streaming': True},
+    {'grouping': 'any'},
+])
+def test_every_merge_mode_writes_the_same_bytes(tmp_path, options):
+    generate_dataset(str(tmp_path / 'in'), sources=40, translators=3, corpora=3, text_length=30)
+    expected = merged_bytes(tmp_path / 'in', tmp_path / 'serial.csv')
+    
+    assert merged_bytes(tmp_path / 'in', tmp_path / 'merged.csv', **options) == expected
+    if options.get('incremental'):
+        # A second run with nothing changed leaves the output as it was
+        assert merged_bytes(tmp_path / 'in', tmp_path / 'merged.csv', **options) == expected
+
+
+def test_incremental_merge_reparses_only_the_changed_file(tmp_path, capsys):
+    generate_dataset(str(tmp_path / 'in'), sources=20, translators=2, corpora=2, text_length=30)
+    merge_csv_folder(str(tmp_path / 'in'), str(tmp_path / 'merged.csv'), incremental=True)
+    
+    # Replace one corpus with new texts and a new translator column
+    generate_dataset(str(tmp_path / 'new'), sources=10, translators=3, corpora=1, text_length=30, seed=1)
+    changed = 'synthetic_translation_comparison_corpus0.csv'
+    (tmp_path / 'in' / changed).write_bytes((tmp_path / 'new' / changed).read_bytes())
+    capsys.readouterr()
+    merge_csv_folder(str(tmp_path / 'in'), str(tmp_path / 'merged.csv'), incremental=True)
+    
+    assert "Reparsing 1 changed file(s)" in capsys.readouterr().out
+    assert (tmp_path / 'merged.csv').read_bytes() == merged_bytes(tmp_path / 'in', tmp_path / 'fresh.csv')
+
+
+def test_any_grouping_collects_the_rows_of_a_source_wherever_they_are(tmp_path):
+    generate_dataset(str(tmp_path / 'sorted'), sources=30, translators=3, corpora=1, text_length=30)
+    generate_dataset(str(tmp_path / 'shuffled'), sources=30, translators=3, corpora=1, text_length=30, shuffled=True)
+    merge_csv_folder(str(tmp_path / 'sorted'), str(tmp_path / 'sorted.csv'))
+    # A budget of one byte spills every row to its own run; spilled groups come out sorted by source
+    merge_csv_folder(str(tmp_path / 'shuffled'), str(tmp_path / 'shuffled.csv'), grouping='any', memory_budget=1)
+    
+    key = lambda row: row['source']
+    assert read_rows(tmp_path / 'shuffled.csv') == sorted(read_rows(tmp_path / 'sorted.csv'), key=key)
@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+import pair_scheduler
+import survey_session
+from pair_scheduler import PRIOR_VARIANCE, PairScheduler
+from results_writer import ResultWriter
+from survey_data import CompactTable
+from survey_session import ADAPTIVE_PAIRS, SurveySession
+
+pytestmark = pytest.mark.skipif(not pair_scheduler.available(), reason="NumPy is not installed")
+
+
+def test_a_judgment_moves_the_winner_above_the_loser_and_narrows_both():
+    scheduler = PairScheduler(['a', 'b', 'c'])
+    scheduler.update('a', 'b')
+    
+    assert scheduler.mean[0] > 0 > scheduler.mean[1]
+    assert scheduler.mean[2] == 0
+    assert scheduler.variance[0] < PRIOR_VARIANCE and scheduler.variance[1] < PRIOR_VARIANCE
+    assert [col for col, _, _ in scheduler.ranking()] == ['a', 'c', 'b']
+
+
+def test_a_fanned_out_judgment_weighs_as_much_as_a_single_one():
+    single = PairScheduler(['a', 'b', 'c'])
+    single.update('a', 'c')
+    grouped = PairScheduler(['a', 'b', 'c'])
+    grouped.update_groups(['a', 'b'], ['c'])
+    
+    assert grouped.judgments == single.judgments == 1
+    # The loser takes about one loss; the two winners share about one win
+    assert grouped.mean[2] == pytest.approx(single.mean[2], rel=0.1)
+    assert grouped.mean[0] + grouped.mean[1] == pytest.approx(single.mean[0], rel=0.1)
+
+
+def test_choose_prefers_the_pair_whose_outcome_is_least_certain():
+    scheduler = PairScheduler(['strong', 'weak', 'new'])
+    for _ in range(30):
+        scheduler.update('strong', 'weak')
+    
+    item, pair = scheduler.choose([['strong', 'weak'], ['weak'], ['strong', 'new', 'unknown']])
+    assert item == 2
+    assert set(pair) == {'strong', 'new'}
+    assert scheduler.choose([['weak'], ['unknown', 'new']]) == (None, None)
+
+
+def test_state_is_restored_by_column_name():
+    scheduler = PairScheduler(['a', 'b'])
+    scheduler.update('a', 'b')
+    
+    restored = PairScheduler(['b', 'c', 'a'], scheduler.state())
+    assert restored.judgments == 1
+    assert restored.mean.tolist() == [scheduler.mean[1], 0, scheduler.mean[0]]
+    assert restored.variance[1] == PRIOR_VARIANCE
+    assert PairScheduler(['a'], {'columns': 'junk'}).mean.tolist() == [0]
+
+
+def test_adaptive_moves_and_the_model_survive_a_restart(tmp_path, dataset_csv, monkeypatch):
+    dataset = CompactTable(dataset_csv)
+    # A fixed question order and A/B sides, for which adaptive selection moves items
+    monkeypatch.setattr(survey_session, 'new_seed', lambda: 1)
+    random.seed(1)
+    
+    def open_session():
+        writer = ResultWriter(str(tmp_path / 'results.csv'), str(tmp_path / 'journal'), flush_interval=0.01)
+        return SurveySession(dataset=dataset, session_path=str(tmp_path / 'session.json'), result_writer=writer)
+    
+    first = open_session()
+    first.set_pair_mode(ADAPTIVE_PAIRS)
+    for _ in range(3):
+        first.load_comparison()
+        first.choose_better(1)
+    first.load_comparison()
+    assert max(first.comp_moved) > first.comp_current_position
+    assert first.close()
+    
+    second = open_session()
+    assert second.comp_pair_mode == ADAPTIVE_PAIRS
+    assert second.comp_current_position == first.comp_current_position
+    position = second.comp_current_position
+    assert list(second.comp_question_indices)[position:] == list(first.comp_question_indices)[position:]
+    assert second.pair_scheduler.state() == first.pair_scheduler.state()
+    assert second.close()
@@ -0,0 +1,89 @@
+import csv
+import json
+import os
+import time
+
+from results_writer import ResultWriter
+
+FIELDNAMES = ['source', 'model_a', 'corpus_type']
+
+
+def write_journal(path, lines):
+    with open(path, 'w', encoding='utf-8') as journal:
+        journal.write(''.join(lines))
+
+
+def record(seq, source):
+    row = {'source': source, 'model_a': 'good', 'corpus_type': 'news'}
+    return json.dumps({'seq': seq, 'fieldnames': FIELDNAMES, 'row': row}) + '\n'
+
+
+def read_sources(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return [row['source'] for row in csv.DictReader(f)]
+
+
+def test_submitted_rows_reach_the_csv(tmp_path):
+    results = tmp_path / 'results.csv'
+    writer = ResultWriter(str(results), str(tmp_path / 'journal'), flush_interval=0.01)
+    for source in ('a', 'b', 'c'):
+        writer.submit(FIELDNAMES, {'source': source, 'model_a': 'best', 'corpus_type': 'news'})
+    assert writer.close()
+    assert read_sources(results) == ['a', 'b', 'c']
+    assert not os.path.exists(tmp_path / 'journal')
+
+
+def test_recover_replays_uncommitted_rows_and_ignores_a_torn_last_line(tmp_path):
+    results = tmp_path / 'results.csv'
+    journal = tmp_path / 'journal'
+    write_journal(journal, [
+        record(1, 'committed'),
+        json.dumps({'committed': 1}) + '\n',
+        record(2, 'pending 1'),
+        record(3, 'pending 2'),
+        record(4, 'torn')[:25],
+    ])
+    
+    writer = ResultWriter(str(results), str(journal), flush_interval=0.01)
+    assert writer.recovered == 2
+    assert writer.deferred == []
+    assert writer.close()
+    assert read_sources(results) == ['pending 1', 'pending 2']
+
+
+def test_recover_keeps_rows_journaled_when_the_csv_cannot_be_written(tmp_path):
+    results = tmp_path / 'results.csv'
+    results.mkdir()  # Opening a folder for append fails like a locked file
+    journal = tmp_path / 'journal'
+    write_journal(journal, [record(5, 'first'), record(6, 'second')])
+    
+    writer = ResultWriter(str(results), str(journal), flush_interval=0.01)
+    assert writer.recovered == 0
+    assert [r['row']['source'] for r in writer.deferred] == ['first', 'second']
+    assert not writer.close(timeout=0.1)
+    
+    # The rows were renumbered into a fresh journal that the next launch replays
+    results.rmdir()
+    writer = ResultWriter(str(results), str(journal), flush_interval=0.01)
+    assert writer.recovered == 2
+    assert writer.close()
+    assert read_sources(results) == ['first', 'second']
+
+
+def test_start_size_is_the_csv_before_the_deferred_rows(tmp_path):
+    results = tmp_path / 'results.csv'
+    results.mkdir()
+    journal = tmp_path / 'journal'
+    write_journal(journal, [record(1, 'first')])
+    
+    writer = ResultWriter(str(results), str(journal), flush_interval=0.01)
+    assert [r['row']['source'] for r in writer.deferred] == ['first']
+    writer.last_error = None
+    while writer.last_error is None:  # The background thread's first retry fails too
+        time.sleep(0.01)
+    # The CSV becomes writable and the next retry commits the deferred row
+    results.rmdir()
+    writer.submit(FIELDNAMES, {'source': 'second', 'model_a': 'bad', 'corpus_type': 'news'})
+    assert writer.close()
+    assert read_sources(results) == ['first', 'second']
+    assert writer.start_size == 0
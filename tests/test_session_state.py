@@ -0,0 +1,49 @@
+import random
+
+from session_state import (load_session, pending_moves, replay_moves, save_session, shuffled_order,
+                           swap_positions)
+
+
+def test_shuffled_order_depends_on_the_seed_tab_and_filters():
+    order = shuffled_order(list(range(50)), 7, 'ranking', 'Both', 'All')
+    
+    assert sorted(order) == list(range(50))
+    assert shuffled_order(list(range(50)), 7, 'ranking', 'Both', 'All') == order
+    assert shuffled_order(list(range(50)), 7, 'comparison', 'Both', 'All') != order
+    assert shuffled_order(list(range(50)), 8, 'ranking', 'Both', 'All') != order
+
+
+def test_replayed_moves_rebuild_the_order_the_session_left():
+    rng = random.Random(1)
+    order = shuffled_order(list(range(30)), 3, 'comparison', 'Both', 'All')
+    moved = {}
+    for position in range(10):
+        swap_positions(order, moved, position, position + rng.randrange(8))
+    saved = pending_moves(moved, 10)
+    assert all(position >= 10 for position, _ in saved)
+    
+    rebuilt = shuffled_order(list(range(30)), 3, 'comparison', 'Both', 'All')
+    replayed = {}
+    replay_moves(rebuilt, saved, replayed)
+    
+    assert rebuilt[10:] == order[10:]
+    assert sorted(rebuilt) == list(range(30))
+    assert pending_moves(replayed, 10) == saved
+
+
+def test_replay_skips_moves_that_do_not_fit_the_order():
+    order = [0, 1, 2, 3]
+    moved = {}
+    replay_moves(order, [[1, 3], [9, 0], [2, 'x'], 'junk', [0, 99]], moved)
+    
+    assert order == [0, 3, 2, 1]
+    assert moved == {1: 3, 3: 1}
+
+
+def test_a_session_saved_for_another_dataset_is_ignored(tmp_path):
+    path = str(tmp_path / 'session.json')
+    assert save_session(path, {'seed': 5, 'dataset_rows': 12})
+    
+    assert load_session(path, 12)['seed'] == 5
+    assert load_session(path, 13) is None
+    assert load_session(str(tmp_path / 'missing.json'), 12) is None
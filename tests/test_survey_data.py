@@ -0,0 +1,77 @@
+import os
+import sqlite3
+
+import pytest
+
+from survey_data import CompactTable, LazyCsvDataset, SqliteDataset, build_sqlite_store, open_dataset
+
+CSV_TEXT = ("\ufeffsource,source_lang,corpus_type,model_a,model_b\n"
+            "Hello, EN ,news,Bonjour,Salut\n"
+            "Bonjour,fr,news,Hello,Hello \n"
+            "Hi,en,web,,Salut\n")
+
+
+def open_backend(kind, tmp_path):
+    csv_path = tmp_path / 'merged.csv'
+    csv_path.write_text(CSV_TEXT, encoding='utf-8')
+    if kind == 'compact':
+        return CompactTable(str(csv_path))
+    if kind == 'lazy':
+        return LazyCsvDataset(str(csv_path))
+    build_sqlite_store(str(csv_path), str(tmp_path / 'merged.sqlite'))
+    return SqliteDataset(str(tmp_path / 'merged.sqlite'))
+
+
+@pytest.mark.parametrize('kind', ['compact', 'lazy', 'sqlite'])
+def test_backends_read_a_bom_csv_alike(tmp_path, kind):
+    dataset = open_backend(kind, tmp_path)
+    
+    assert len(dataset) == 3
+    assert dataset.row(0)['source'] == 'Hello'
+    assert [dataset.row(row_id)['source_lang'] for row_id in range(3)] == ['en', 'fr', 'en']
+    assert list(dataset.row_ids('en')) == [0, 2]
+    assert list(dataset.row_ids('en', 'web')) == [2]
+    assert list(dataset.comparable_row_ids()) == [0]
+    assert dataset.available_translations(2) == [('model_b', 'Salut')]
+    assert dataset.distinct_translations(1) == ([('model_a', 'Hello')], {'model_a': ['model_b']})
+
+
+def write_store_next_to_csv(tmp_path, write_store):
+    csv_path = tmp_path / 'merged.csv'
+    csv_path.write_text(CSV_TEXT, encoding='utf-8')
+    db_path = tmp_path / 'merged.sqlite'
+    write_store(db_path)
+    os.utime(csv_path, (0, 0))  # The store is newer, so it is tried first
+    return str(csv_path), str(db_path)
+
+
+def partial_copy(db_path):
+    db_path.write_bytes(b'SQLite format 3\0' + b'\0' * 100)
+
+
+def not_a_database(db_path):
+    db_path.write_bytes(b'not a database at all' * 100)
+
+
+def no_format_version(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    conn.commit()
+    conn.close()
+
+
+@pytest.mark.parametrize('write_store', [partial_copy, not_a_database, no_format_version])
+def test_an_unusable_store_falls_back_to_the_csv(tmp_path, write_store):
+    csv_path, db_path = write_store_next_to_csv(tmp_path, write_store)
+    with pytest.raises(ValueError):
+        SqliteDataset(db_path)
+    dataset = open_dataset(csv_path, db_path)
+    assert isinstance(dataset, CompactTable)
+    assert len(dataset) == 3
+
+
+def test_an_unusable_store_without_a_csv_is_an_error(tmp_path):
+    db_path = tmp_path / 'merged.sqlite'
+    not_a_database(db_path)
+    with pytest.raises(ValueError):
+        open_dataset(str(tmp_path / 'missing.csv'), str(db_path))
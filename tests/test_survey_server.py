@@ -0,0 +1,68 @@
+import asyncio
+import random
+
+import pytest
+
+import pair_scheduler
+import survey_server
+from survey_client import ServerError
+from survey_data import CompactTable
+from survey_server import ResultStore, SurveyServer
+
+
+def start_server(tmp_path, dataset_csv):
+    return SurveyServer(CompactTable(dataset_csv), ResultStore(str(tmp_path / 'survey_results.sqlite')))
+
+
+def save_verdict(survey, item):
+    """Store that the first translation of a comparison item beat the second."""
+    (winner, _), (loser, _) = item['pair']
+    return asyncio.run(survey.add_result('alice', item['row_id'], {winner: 'better', loser: 'worse'}))
+
+
+def test_a_pool_hands_out_each_matching_row_once_per_round(tmp_path, dataset_csv):
+    survey = start_server(tmp_path, dataset_csv)
+    french = survey.dataset.row_ids('fr', None)
+    
+    items = [survey.next_item('ranking', 'fr', None) for _ in range(len(french) + 1)]
+    assert sorted(item['row_id'] for item in items[:-1]) == sorted(french)
+    assert all(item['source_lang'] == 'fr' and item['round'] == 0 for item in items[:-1])
+    assert items[-1]['row_id'] == items[0]['row_id'] and items[-1]['round'] == 1
+    assert survey.next_item('ranking', 'de', None) is None
+    survey.close()
+
+
+def test_results_are_stored_counted_and_validated(served_survey):
+    survey, client = served_survey
+    item = client.next_item('ranking', None, None)
+    column = item['translations'][0][0]
+    
+    assert client.submit(item['row_id'], {'source': item['source'], column: 'best'}) == 1
+    assert client.leaderboard().rank_counts[column]['best'] == 1
+    assert [row[:3] for row in survey.store.rows()] == [('alice', 'rank', item['row_id'])]
+    with pytest.raises(ServerError):
+        client.submit(item['row_id'], {'model_a': 'excellent'})
+    with pytest.raises(ServerError):
+        client.submit(item['row_id'], {'model_a': 'better'})
+
+
+@pytest.mark.skipif(not pair_scheduler.available(), reason="NumPy is not installed")
+def test_pools_resume_with_their_moves_after_the_server_was_killed(tmp_path, dataset_csv, monkeypatch):
+    # A fixed pool order and A/B sides, for which adaptive selection moves items
+    monkeypatch.setattr(survey_server, 'new_seed', lambda: 2)
+    survey = start_server(tmp_path, dataset_csv)
+    survey.random = random.Random(0)
+    for _ in range(4):
+        save_verdict(survey, survey.next_item('comparison', None, None, pair_mode='adaptive'))
+    pool = survey.pools['comparison::']
+    assert max(pool['moved']) >= pool['cursor']
+    # Killed: the pools are only as saved with the last batch of results
+    survey.store.close()
+    
+    restarted = start_server(tmp_path, dataset_csv)
+    replayed = restarted.pool('comparison', None, None)
+    assert replayed['cursor'] == pool['cursor'] == 4
+    assert replayed['order'][4:] == pool['order'][4:]
+    assert restarted.leaderboard.rows == 4
+    assert restarted.scheduler.state() == survey.scheduler.state()
+    restarted.close()
@@ -0,0 +1,47 @@
+from results_writer import ResultWriter
+from survey_data import CompactTable
+from survey_session import SurveySession
+
+
+def open_session(tmp_path, result_writer, **kwargs):
+    return SurveySession(session_path=str(tmp_path / 'session.json'), result_writer=result_writer, **kwargs)
+
+
+def new_writer(tmp_path):
+    return ResultWriter(str(tmp_path / 'results.csv'), str(tmp_path / 'journal'), flush_interval=0.01)
+
+
+def test_a_new_session_resumes_the_order_filters_and_position(tmp_path, dataset_csv):
+    dataset = CompactTable(dataset_csv)
+    first = open_session(tmp_path, new_writer(tmp_path), dataset=dataset)
+    first.set_filters('French', 'All')
+    first.load_question()
+    first.next_question()
+    first.load_question()
+    first.set_comp_filters('Both', 'news')
+    first.load_comparison()
+    assert first.close()
+    
+    second = open_session(tmp_path, new_writer(tmp_path), dataset=dataset)
+    assert (second.current_language_filter, second.current_corpus_filter) == ('French', 'All')
+    assert list(second.question_indices) == list(first.question_indices)
+    assert second.current_position == 1
+    assert second.load_question()['row_id'] == first.current_index
+    assert second.comp_current_corpus_filter == 'news'
+    assert list(second.comp_question_indices) == list(first.comp_question_indices)
+    assert second.close()
+
+
+def test_prefetch_does_not_claim_items_from_a_survey_server(tmp_path, result_writer, served_survey):
+    survey, client = served_survey
+    session = open_session(tmp_path, result_writer, server=client)
+    
+    session.load_question()
+    session.load_comparison()
+    cursors = {key: pool['cursor'] for key, pool in survey.pools.items()}
+    assert cursors == {'ranking::': 1, 'comparison::': 1}
+    
+    session.prefetch_next_question()
+    session.prefetch_next_comparison()
+    assert session.prefetched is None and session.comp_prefetched is None
+    assert {key: pool['cursor'] for key, pool in survey.pools.items()} == cursors
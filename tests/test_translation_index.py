@@ -0,0 +1,88 @@
+import random
+from array import array
+
+import pytest
+
+import survey_data
+from survey_data import (MAX_TRANSLATION_COLUMNS, NO_TRANSLATION, TranslationIndex, decode_mask,
+                         get_translation_columns, group_translations, translation_groups)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+requires_numpy = pytest.mark.skipif(numpy is None, reason="NumPy is not installed")
+
+
+def index_groups(rows):
+    return b''.join(translation_groups(texts) for texts in rows)
+
+
+def random_groups(rows, width, seed):
+    rng = random.Random(seed)
+    vocabulary = ['', 'a', 'b', ' b', 'c']
+    return index_groups([rng.choice(vocabulary) for _ in range(width)] for _ in range(rows))
+
+
+def test_translation_groups_point_at_the_first_column_with_the_same_text():
+    texts = ['Bonjour', '', 'Bonjour ', 'Salut', 'bonjour', '  ']
+    assert list(translation_groups(texts)) == [0, NO_TRANSLATION, 0, 3, 4, NO_TRANSLATION]
+
+
+def test_too_many_translation_columns_are_rejected():
+    columns = ['source', 'source_lang', 'corpus_type'] + [f"model_{i}" for i in range(MAX_TRANSLATION_COLUMNS)]
+    assert len(get_translation_columns(columns)) == MAX_TRANSLATION_COLUMNS
+    with pytest.raises(ValueError):
+        get_translation_columns(columns + ['one_more'])
+
+
+def test_group_translations_show_each_text_once_and_list_its_other_columns():
+    columns = ['model_a', 'model_b', 'model_c', 'model_d']
+    row = {'model_a': 'Salut', 'model_b': '', 'model_c': 'Bonjour', 'model_d': ' Salut'}
+    groups = translation_groups([row[col] for col in columns])
+    assert group_translations(columns, row, groups) == (
+        [('model_a', 'Salut'), ('model_c', 'Bonjour')], {'model_a': ['model_d']})
+
+
+@requires_numpy
+@pytest.mark.parametrize('width', [1, 3, 8, 9, 17, MAX_TRANSLATION_COLUMNS])
+def test_numpy_and_pure_python_indexes_agree(monkeypatch, width):
+    groups = random_groups(200, width, seed=width)
+    row_ids = array('I', range(199, -1, -2))
+    vectorised = TranslationIndex(groups, width)
+    vectorised_comparable = vectorised.comparable(row_ids)
+    
+    monkeypatch.setattr(survey_data, 'np', None)
+    fallback = TranslationIndex(groups, width)
+    assert vectorised.masks == fallback.masks
+    assert vectorised.distinct_counts == fallback.distinct_counts
+    assert vectorised_comparable == fallback.comparable(row_ids)
+
+
+@pytest.mark.parametrize('vectorised', [pytest.param(True, marks=requires_numpy), False])
+def test_masks_and_counts_follow_the_groups(monkeypatch, vectorised):
+    if not vectorised:
+        monkeypatch.setattr(survey_data, 'np', None)
+    width = 12
+    groups = random_groups(50, width, seed=1)
+    index = TranslationIndex(groups, width)
+    for row_id in range(50):
+        row_groups = index.row_groups(row_id)
+        assert index.present(row_id) == [group != NO_TRANSLATION for group in row_groups]
+        assert index.distinct_counts[row_id] == sum(group == i for i, group in enumerate(row_groups))
+    assert decode_mask(index.masks[:index.mask_width], width) == index.present(0)
+
+
+@pytest.mark.parametrize('vectorised', [pytest.param(True, marks=requires_numpy), False])
+def test_comparable_keeps_rows_with_two_distinct_translations_in_order(monkeypatch, vectorised):
+    if not vectorised:
+        monkeypatch.setattr(survey_data, 'np', None)
+    index = TranslationIndex(index_groups([
+        ['a', 'b', ''],
+        ['a', 'a', ''],
+        ['', '', 'c'],
+        ['a', ' a', 'b'],
+    ]), 3)
+    assert list(index.comparable(array('I', [3, 2, 1, 0]))) == [3, 0]
+    assert list(index.comparable(array('I'))) == []